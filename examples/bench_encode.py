@@ -0,0 +1,49 @@
+"""
+Micro-benchmark for the per-frame overhead of creating objects.
+
+Measures how many times per second a command encoder can be created, a
+(trivial) render pass be encoded, and the encoder be finished. This is
+dominated by the Python-side cost of creating the GPU objects.
+"""
+
+import time
+
+import wgpu
+
+
+def bench_encode(device, view, duration=1.0):
+    """Return the number of encode-cycles per second."""
+    color_attachments = [
+        {"view": view, "load_op": "clear", "store_op": "store"},
+    ]
+    count = 0
+    t0 = time.perf_counter()
+    etime = t0 + duration
+    while True:
+        for _ in range(100):
+            encoder = device.create_command_encoder()
+            render_pass = encoder.begin_render_pass(color_attachments=color_attachments)
+            render_pass.end()
+            encoder.finish()
+        count += 100
+        t1 = time.perf_counter()
+        if t1 > etime:
+            break
+    return count / (t1 - t0)
+
+
+def main(duration=1.0):
+    adapter = wgpu.gpu.request_adapter_sync(power_preference="high-performance")
+    device = adapter.request_device_sync()
+    texture = device.create_texture(
+        size=(64, 64, 1), format="rgba8unorm", usage="RENDER_ATTACHMENT"
+    )
+    view = texture.create_view()
+
+    bench_encode(device, view, 0.1)  # warmup
+    rate = bench_encode(device, view, duration)
+    print(f"encoder + render pass + finish: {rate:,.0f} per second")
+
+
+if __name__ == "__main__":
+    main()
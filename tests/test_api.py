@@ -68,6 +68,18 @@ def test_logging():
     assert level[0] == 30
 
 
+def test_logging_object_creation(caplog):
+    logger = logging.getLogger("wgpu")
+    wgpu.GPUSampler("foo", None, None)
+    assert "Creating" not in caplog.text
+    logger.setLevel("INFO")
+    try:
+        wgpu.GPUSampler("foo", None, None)
+    finally:
+        logger.setLevel("WARNING")
+    assert "Creating GPUSampler foo" in caplog.text
+
+
 def test_enums_and_flags_and_structs():
     # Enums are str
     assert isinstance(wgpu.BufferBindingType.storage, str)
@@ -1,3 +1,6 @@
+import time
+import threading
+
 import anyio
 
 from pytest import mark, raises
@@ -5,7 +8,7 @@ from pytest import mark, raises
 import wgpu.utils
 from testutils import can_use_wgpu_lib, run_tests
 from wgpu import GPUDevice, MapMode, TextureFormat
-from wgpu._async import GPUPromise as BaseGPUPromise
+from wgpu._async import GPUPromise as BaseGPUPromise, PollThread, PollTask, _PENDING
 
 
 class GPUPromise(BaseGPUPromise):
@@ -23,7 +26,7 @@ class SillyLoop:
 
     def process_events(self):
         for p in list(GPUPromise._UNRESOLVED):
-            if p._title == "test" and p._state == "pending":
+            if p._title == "test" and p._state == _PENDING:
                 p._wgpu_set_input(7)
         while self._pending_calls:
             f, args = self._pending_calls.pop(0)
@@ -70,6 +73,29 @@ def test_promise_basics():
     assert "rejected" in repr(promise)
 
 
+def test_promise_lightweight():
+    loop = SillyLoop()
+    promise = GPUPromise("foobar", None, loop=loop)
+
+    # No per-instance dict, and callback lists and lock are created when needed
+    assert wgpu.GPUPromise.__dictoffset__ == 0
+    assert promise._lock is None
+    assert promise._done_callbacks is None
+    promise.then(lambda r: None)
+    assert len(promise._done_callbacks) == 1
+    assert promise._lock is None
+
+    # Setting the input from another thread creates the lock
+    t = threading.Thread(target=promise._wgpu_set_input, args=(42,))
+    t.start()
+    t.join()
+    assert promise._lock is not None
+    assert "pending-fulfilled" in repr(promise)
+    loop.process_events()
+    assert "fulfilled" in repr(promise)
+    assert "pending" not in repr(promise)
+
+
 # %%%%% Promise using sync_wait
 
 
@@ -149,6 +175,60 @@ def test_promise_sync_fail2():
         promise.sync_wait()
 
 
+def test_promise_sync_poll_thread():
+    # The poll thread blocks until the "work" is done, and the waiting
+    # thread is woken up when the promise resolves.
+    work_done = threading.Event()
+    poll_threads = set()
+
+    def poll_wait():
+        poll_threads.add(threading.current_thread())
+        work_done.wait()
+        for promise in promises:
+            if promise._state == _PENDING:
+                promise._wgpu_set_input(42)
+
+    poll_thread = PollThread(poll_wait, "test-poll")
+    promises = [
+        GPUPromise(
+            "test", lambda x: x * 2, poller=lambda: None, poll_thread=poll_thread
+        )
+        for _ in range(3)
+    ]
+
+    # Multiple threads can wait for promises that are resolved by the same poll thread
+    results = []
+    waiters = [
+        threading.Thread(target=lambda p=p: results.append(p.sync_wait()))
+        for p in promises[1:]
+    ]
+    for t in waiters:
+        t.start()
+    threading.Timer(0.05, work_done.set).start()
+    t0 = time.perf_counter()
+    assert promises[0].sync_wait() == 84
+    assert 0.04 < time.perf_counter() - t0 < 1
+    for t in waiters:
+        t.join()
+    assert results == [84, 84]
+    assert [t.name for t in poll_threads] == ["test-poll"]
+
+    # The thread stops when idle, and starts again when needed. Notify the
+    # thread, because it may already be waiting with the old idle timeout.
+    with poll_thread._condition:
+        poll_thread._idle_timeout = 0.01
+        poll_thread._condition.notify()
+    deadline = time.perf_counter() + 5
+    while poll_thread._thread is not None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert poll_thread._thread is None
+    promises.append(
+        GPUPromise("test", None, poller=lambda: None, poll_thread=poll_thread)
+    )
+    assert promises[-1].sync_wait() == 42
+    assert len(poll_threads) == 2
+
+
 # %% Promise using await with poll and loop
 
 
@@ -575,6 +655,162 @@ def test_promise_decorator():
     assert promise(decorated) is decorated
 
 
+class CountingPoller:
+    # A poller that resolves its promises after a given number of polls
+    def __init__(self):
+        self.count = 0
+        self.promises = {}
+
+    def add(self, polls, value):
+        promise = GPUPromise("test", None, poller=self.poll)
+        self.promises[promise] = polls, value
+        return promise
+
+    def poll(self):
+        self.count += 1
+        for promise, (polls, value) in list(self.promises.items()):
+            if self.count >= polls:
+                self.promises.pop(promise)
+                if isinstance(value, Exception):
+                    promise._wgpu_set_error(value)
+                else:
+                    promise._wgpu_set_input(value)
+
+
+def test_wait_all():
+    poller1, poller2 = CountingPoller(), CountingPoller()
+    promises = [poller1.add(i, i) for i in range(1, 10)]
+    promises += [poller2.add(3, "a"), poller2.add(4, "b")]
+
+    # Each poller is polled once per iteration, not once per promise
+    assert wgpu.wait_all(promises) == [1, 2, 3, 4, 5, 6, 7, 8, 9, "a", "b"]
+    assert poller1.count == 9
+    assert poller2.count == 4
+
+    # Resolved promises are fine too
+    assert wgpu.wait_all(promises[:2]) == [1, 2]
+    assert wgpu.wait_all([]) == []
+
+    # Errors are raised
+    with raises(ZeroDivisionError):
+        wgpu.wait_all([poller1.add(0, 1), poller1.add(0, ZeroDivisionError())])
+
+    # Timeout
+    with raises(TimeoutError):
+        wgpu.wait_all([poller1.add(10**9, 1)], timeout=0.05)
+
+    # Need a poller
+    with raises(RuntimeError):
+        wgpu.wait_all([GPUPromise("test", None)])
+
+
+def test_gather_sync():
+    poller1, poller2 = CountingPoller(), CountingPoller()
+    promises = [poller1.add(i, i) for i in range(1, 10)] + [poller2.add(2, "a")]
+
+    gathered = wgpu.gather(*promises)
+    assert isinstance(gathered, GPUPromise)
+    assert gathered.sync_wait() == [1, 2, 3, 4, 5, 6, 7, 8, 9, "a"]
+    assert poller1.count == 9
+
+    assert wgpu.gather().sync_wait() == []
+
+    gathered = wgpu.gather(poller1.add(0, 1), poller2.add(5, ZeroDivisionError()))
+    with raises(ZeroDivisionError):
+        gathered.sync_wait()
+
+
+@mark.anyio
+async def test_gather_async():
+    poller1, poller2 = CountingPoller(), CountingPoller()
+    promises = [poller1.add(i, i) for i in range(1, 10)] + [poller2.add(2, "a")]
+
+    assert await wgpu.gather(*promises) == [1, 2, 3, 4, 5, 6, 7, 8, 9, "a"]
+    assert poller1.count == 9
+
+
+@mark.anyio
+async def test_gather_loop_await():
+    loop = SillyLoop()
+    promises = [GPUPromise("test", None, loop=loop) for _ in range(2)]
+    promises.append(GPUPromise("test", lambda x: x * 2, loop=loop))
+
+    gathered = wgpu.gather(*promises)
+    assert gathered._loop is loop
+
+    # The promises are resolved by the loop, without polling
+    loop.process_events()
+    with anyio.fail_after(1):
+        assert await gathered == [7, 7, 14]
+
+
+def test_gather_loop_then():
+    loop = SillyLoop()
+    promises = [GPUPromise("test", None, loop=loop) for _ in range(3)]
+
+    results = []
+    wgpu.gather(*promises).then(results.append)
+    loop.process_events()
+    assert results == [[7, 7, 7]]
+    assert not loop.errors
+
+    # An error in one of the promises rejects the gathered promise
+    promises = [GPUPromise("test", None, loop=loop) for _ in range(2)]
+    promises.append(GPUPromise("test", lambda x: x / 0, loop=loop))
+    errors = []
+    wgpu.gather(*promises).catch(errors.append)
+    loop.process_events()
+    assert len(errors) == 1
+    assert isinstance(errors[0], ZeroDivisionError)
+
+
+@mark.anyio
+@mark.parametrize("anyio_backend", ["asyncio", "trio"])
+async def test_promise_async_poll_task(anyio_backend):
+    poller = CountingPoller()
+    poll_task = PollTask(poller.poll)
+    n = 1000
+
+    promises = []
+    for i in range(n):
+        promise = poller.add(1 + i % 20, i)
+        promise._poller = lambda: None  # only the poll task polls
+        promise._poll_task = poll_task
+        promises.append(promise)
+
+    results = []
+
+    async def waiter(promise):
+        results.append(await promise)
+
+    # All waiters share a single poll task, that polls at most once per loop iteration
+    async with anyio.create_task_group() as tg:
+        for promise in promises:
+            tg.start_soon(waiter, promise)
+
+    assert sorted(results) == list(range(n))
+    assert 20 <= poller.count < 100
+
+    # The task stops when there's nothing to wait for
+    await anyio.sleep(0.01)
+    assert poll_task._task is None
+
+
+@mark.anyio
+@mark.parametrize("anyio_backend", ["asyncio", "trio"])
+async def test_promise_async_resolved_from_other_thread(anyio_backend):
+    # A promise resolved from another thread (e.g. a PollThread) must wake up
+    # the awaiting task, also when nothing else is happening in the event loop.
+    loop = SillyLoop()  # its call_soon() never runs anything
+    for _ in range(10):
+        promise = GPUPromise("test", None, loop=loop)
+        timer = threading.Timer(0.01, promise._wgpu_set_input, (42,))
+        timer.start()
+        with anyio.fail_after(2):
+            assert await promise == 42
+        timer.join()
+
+
 # %%%%% Test the async methods
 
 
@@ -619,6 +855,56 @@ async def test_buffer_map_async():
     assert bytes(data2) == data
 
 
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+@mark.anyio
+async def test_buffer_map_gather():
+    device = wgpu.utils.get_default_device()
+
+    buffers = []
+    for i in range(10):
+        buffer = device.create_buffer(size=16, usage="MAP_READ|COPY_DST")
+        device.queue.write_buffer(buffer, 0, bytes([i]) * 16)
+        buffers.append(buffer)
+
+    await wgpu.gather(*[buffer.map_async(MapMode.READ) for buffer in buffers])
+    for i, buffer in enumerate(buffers):
+        assert bytes(buffer.read_mapped()) == bytes([i]) * 16
+        buffer.unmap()
+
+    wgpu.wait_all([buffer.map_async(MapMode.READ) for buffer in buffers])
+    assert all(buffer.map_state == "mapped" for buffer in buffers)
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+@mark.anyio
+@mark.parametrize("anyio_backend", ["asyncio", "trio"])
+async def test_buffer_map_async_concurrent(anyio_backend):
+    device = wgpu.utils.get_default_device()
+    n = 1000
+
+    source = device.create_buffer_with_data(data=bytes(range(256)), usage="COPY_SRC")
+    buffers = [
+        device.create_buffer(size=256, usage="MAP_READ|COPY_DST") for _ in range(n)
+    ]
+    command_encoder = device.create_command_encoder()
+    for buffer in buffers:
+        command_encoder.copy_buffer_to_buffer(source, 0, buffer, 0, 256)
+    device.queue.submit([command_encoder.finish()])
+
+    results = [None] * n
+
+    async def map_and_read(i):
+        await buffers[i].map_async(MapMode.READ)
+        results[i] = bytes(buffers[i].read_mapped())
+        buffers[i].unmap()
+
+    async with anyio.create_task_group() as tg:
+        for i in range(n):
+            tg.start_soon(map_and_read, i)
+
+    assert results == [bytes(range(256))] * n
+
+
 @mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
 @mark.anyio
 async def make_pipeline_async():
@@ -5,7 +5,7 @@ import wgpu
 # from rendercanvas import BaseRenderCanvas
 from rendercanvas.offscreen import RenderCanvas
 
-from pytest import skip
+from pytest import skip, raises
 from testutils import run_tests, can_use_wgpu_lib
 
 
@@ -64,6 +64,72 @@ def test_rendercanvas():
     assert m.shape == (200, 300, 4)
 
 
+class OffscreenCanvasContext(wgpu.GPUCanvasContext):
+    """A canvas context that renders to plain textures, to test the base class."""
+
+    def _get_capabilities_screen(self, adapter):
+        return {
+            "usages": wgpu.TextureUsage.RENDER_ATTACHMENT,
+            "formats": ["rgba8unorm"],
+            "alpha_modes": ["opaque"],
+        }
+
+    def _configure_screen(self, **kwargs):
+        pass
+
+    def _unconfigure_screen(self):
+        pass
+
+    def _create_texture_screen(self):
+        device = self._config["device"]
+        return device.create_texture(
+            size=(64, 64, 1), format="rgba8unorm", usage=self._config["usage"]
+        )
+
+    def _present_screen(self):
+        pass
+
+
+def test_max_frames_in_flight():
+    device = wgpu.utils.get_default_device()
+    context = OffscreenCanvasContext({})
+
+    with raises(ValueError):
+        context.configure(device=device, format=None, max_frames_in_flight=0)
+
+    context.configure(device=device, format=None, max_frames_in_flight=2)
+    assert context.get_configuration()["max_frames_in_flight"] == 2
+
+    for _ in range(5):
+        texture = context.get_current_texture()
+        assert context.frame_wait_time >= 0
+        assert len(context._frames_in_flight) < 2
+        encoder = device.create_command_encoder()
+        render_pass = encoder.begin_render_pass(
+            color_attachments=[
+                {
+                    "view": texture.create_view(),
+                    "load_op": "clear",
+                    "store_op": "store",
+                    "clear_value": (0, 0, 0, 0),
+                }
+            ]
+        )
+        render_pass.end()
+        index = device.queue.submit([encoder.finish()])
+        context.present()
+        assert context._frames_in_flight[-1] == index
+        assert len(context._frames_in_flight) <= 2
+
+    # Without a limit, nothing is tracked
+    context.configure(device=device, format=None)
+    context._frames_in_flight.clear()
+    context.get_current_texture()
+    context.present()
+    assert context.frame_wait_time == 0
+    assert not context._frames_in_flight
+
+
 def _get_draw_function(device, present_context):
     # Bindings and layout
     pipeline_layout = device.create_pipeline_layout(bind_group_layouts=[])
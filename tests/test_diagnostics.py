@@ -322,6 +322,32 @@ def test_object_tracker():
     assert counts == {"FooBar": 0, "SpamEggs": 0}
 
 
+def test_object_tracker_slots():
+    tracker = ObjectTracker()
+    counts = tracker.counts
+
+    slot1 = tracker.get_slot("FooBar")
+    slot2 = tracker.get_slot("SpamEggs")
+    assert tracker.get_slot("FooBar") == slot1 != slot2
+    assert counts == {"FooBar": 0, "SpamEggs": 0}
+
+    tracker.increase_slot(slot1)
+    tracker.increase_slot(slot2, 100)
+    tracker.increase("SpamEggs", 10)
+    assert counts == {"FooBar": 1, "SpamEggs": 2}
+    assert tracker.amounts == {"SpamEggs": 110}
+
+    tracker.decrease_slot(slot2, 100)
+    assert counts["SpamEggs"] == 1
+    assert tracker.amounts == {"SpamEggs": 10}
+
+    # The counts behave like a dict
+    counts["XYZ"] = 0
+    assert list(counts) == ["FooBar", "SpamEggs", "XYZ"]
+    assert counts.get("nope", 42) == 42
+    assert dict(counts.items()) == {"FooBar": 1, "SpamEggs": 1, "XYZ": 0}
+
+
 def test_int_repr():
     assert int_repr(0) == "0"
     assert int_repr(7) == "7"
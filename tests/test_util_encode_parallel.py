@@ -0,0 +1,125 @@
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import wgpu
+from wgpu.utils.encode_parallel import encode_parallel
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+SHADER_SOURCE = """
+    @group(0) @binding(0) var<storage, read_write> data: array<u32>;
+
+    @compute @workgroup_size(64)
+    fn main(@builtin(global_invocation_id) index: vec3<u32>) {
+        data[index.x] += 1u;
+    }
+"""
+
+
+def create_pipeline(device):
+    layout = device.create_bind_group_layout(
+        entries=[
+            {"binding": 0, "visibility": "COMPUTE", "buffer": {"type": "storage"}},
+        ]
+    )
+    pipeline_layout = device.create_pipeline_layout(bind_group_layouts=[layout])
+    pipeline = device.create_compute_pipeline(
+        layout=pipeline_layout,
+        compute={"module": device.create_shader_module(code=SHADER_SOURCE)},
+    )
+    return pipeline, layout
+
+
+def test_encode_parallel():
+    device = wgpu.utils.get_default_device()
+    pipeline, layout = create_pipeline(device)
+
+    n_views = 8
+    buffers = [
+        device.create_buffer(size=256, usage="STORAGE|COPY_SRC") for _ in range(n_views)
+    ]
+    bind_groups = [
+        device.create_bind_group(
+            layout=layout, entries=[{"binding": 0, "resource": {"buffer": buffer}}]
+        )
+        for buffer in buffers
+    ]
+    thread_names = set()
+
+    def encode_view(i):
+        def encode(encoder):
+            thread_names.add(threading.current_thread().name)
+            compute_pass = encoder.begin_compute_pass()
+            compute_pass.set_pipeline(pipeline)
+            compute_pass.set_bind_group(0, bind_groups[i])
+            for _ in range(i + 1):
+                compute_pass.dispatch_workgroups(1)
+            compute_pass.end()
+
+        return encode
+
+    command_buffers = encode_parallel(
+        device, [encode_view(i) for i in range(n_views)], label="view"
+    )
+    assert len(command_buffers) == n_views
+    assert all(isinstance(cb, wgpu.GPUCommandBuffer) for cb in command_buffers)
+    assert [cb.label for cb in command_buffers] == [f"view{i}" for i in range(8)]
+    assert all(name.startswith("wgpu-encode") for name in thread_names)
+
+    device.queue.submit(command_buffers)
+    for i, buffer in enumerate(buffers):
+        data = np.frombuffer(device.queue.read_buffer(buffer), np.uint32)
+        assert np.all(data == i + 1)
+
+
+def test_encode_parallel_error():
+    device = wgpu.utils.get_default_device()
+    done = []
+
+    def good(encoder):
+        done.append(1)
+
+    def bad(encoder):
+        raise ZeroDivisionError()
+
+    with raises(ZeroDivisionError):
+        encode_parallel(device, [good, bad, good])
+    assert len(done) == 2
+
+    # A custom executor can be given
+    with ThreadPoolExecutor(2) as executor:
+        assert len(encode_parallel(device, [good] * 4, executor=executor)) == 4
+
+
+def test_encode_concurrently_object_counts():
+    # Objects are created from multiple threads at the same time; the
+    # object counts (used for diagnostics) must stay correct.
+    device = wgpu.utils.get_default_device()
+    counts = wgpu.diagnostics.object_counts.tracker.counts
+    names = "GPUCommandEncoder", "GPUComputePassEncoder", "GPUCommandBuffer"
+    gc.collect()
+    counts_before = [counts.get(name, 0) for name in names]
+
+    def encode(encoder):
+        for _ in range(50):
+            compute_pass = encoder.begin_compute_pass()
+            compute_pass.end()
+
+    with ThreadPoolExecutor(8) as executor:
+        for _ in range(5):
+            encode_parallel(device, [encode] * 16, executor=executor)
+
+    gc.collect()
+    assert [counts.get(name, 0) for name in names] == counts_before
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,116 @@
+import numpy as np
+
+import wgpu
+from wgpu.utils.managed_buffer import ManagedBuffer
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def read(mb):
+    device = wgpu.utils.get_default_device()
+    return np.frombuffer(device.queue.read_buffer(mb.buffer, 0, mb.nbytes), np.float32)
+
+
+def test_managed_buffer_dirty_ranges():
+    device = wgpu.utils.get_default_device()
+
+    data = np.arange(1000, dtype=np.float32)
+    mb = ManagedBuffer(device, data, format="f")
+    assert mb.nbytes == 4000
+    assert len(mb) == 1000
+    assert mb.buffer.usage & wgpu.BufferUsage.STORAGE
+    assert mb.sync() == 4000
+    assert np.all(read(mb) == data)
+
+    # Nothing changed
+    assert mb.sync() == 0
+    assert mb.stats["bytes_saved"] == 4000
+
+    # Set items and slices. Nearby ranges are merged.
+    mb[1] = -1
+    mb[3] = -3
+    mb[500:510] = np.full(10, -5, np.float32)
+    mb[-1] = -9
+    data[1], data[3], data[500:510], data[-1] = -1, -3, -5, -9
+    assert mb[3] == -3
+    assert mb.sync() == 12 + 40 + 4
+    assert mb.stats["writes"] == 1 + 3
+    assert np.all(read(mb) == data)
+
+    # Write bytes, and mark direct modifications
+    mb.write(np.array([7, 8], np.float32), 100 * 4)
+    np.frombuffer(mb.data, np.float32)[900] = 42
+    mb.mark_dirty(900 * 4, 901 * 4)
+    data[100:102], data[900] = (7, 8), 42
+    assert mb.sync() == 12
+    assert np.all(read(mb) == data)
+
+    stats = mb.stats
+    assert stats["syncs"] == 4
+    assert stats["bytes_uploaded"] == 4000 + 56 + 12
+    assert stats["bytes_saved"] == 4000 + (4000 - 56) + (4000 - 12)
+
+    with raises(ValueError):
+        mb.write(b"xxxx", 3998)
+
+
+def test_managed_buffer_slice_bounds():
+    device = wgpu.utils.get_default_device()
+    data = np.arange(1000, dtype=np.float32)
+    mb = ManagedBuffer(device, data, format="f")
+    mb.sync()
+
+    # Strided, reversed and empty slices mark the covered range
+    mb[10:20:3] = np.full(4, -1, np.float32)
+    data[10:20:3] = -1
+    assert mb._dirty[-1] == (10 * 4, 20 * 4)
+    mb[600:500:-4] = np.full(25, -2, np.float32)
+    data[600:500:-4] = -2
+    assert mb._dirty[-1] == (504 * 4, 601 * 4)
+    n_dirty = len(mb._dirty)
+    mb[5:5] = np.zeros(0, np.float32)
+    assert len(mb._dirty) == n_dirty
+
+    mb.sync()
+    assert np.all(read(mb) == data)
+
+
+def test_managed_buffer_resize():
+    device = wgpu.utils.get_default_device()
+
+    data = np.arange(100, dtype=np.float32)
+    mb = ManagedBuffer(device, data, format="f")
+    mb.sync()
+    buffer1 = mb.buffer
+
+    # Resizing within the capacity keeps the buffer. The size is in bytes.
+    mb.resize(200)
+    assert mb.buffer is buffer1
+    assert len(mb) == 50
+    mb.resize(400)
+    assert mb.buffer is buffer1
+    assert mb[50] == 0
+
+    # Growing beyond doubles the capacity, and copies on the GPU
+    mb.resize(404)
+    assert mb.buffer is not buffer1
+    assert mb.capacity == 800
+    assert mb.stats["reallocations"] == 1
+    assert np.all(read(mb)[:50] == data[:50])
+
+    # Pending changes and the new (zeroed) parts are uploaded on sync
+    mb[100] = 1
+    mb.sync()
+    expected = np.array([*data[:50], *[0] * 50, 1], np.float32)
+    assert np.all(read(mb) == expected)
+
+    with raises(ValueError):
+        mb.resize(3)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,120 @@
+import gc
+import weakref
+
+import numpy as np
+
+import wgpu
+from wgpu.utils.mipmaps import generate_mipmaps
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def create_texture(device, data, format, usage=None):
+    layers, height, width = data.shape[:3]
+    if usage is None:
+        usage = (
+            wgpu.TextureUsage.TEXTURE_BINDING
+            | wgpu.TextureUsage.RENDER_ATTACHMENT
+            | wgpu.TextureUsage.COPY_DST
+            | wgpu.TextureUsage.COPY_SRC
+        )
+    texture = device.create_texture(
+        size=(width, height, layers),
+        format=format,
+        usage=usage,
+        mip_level_count=4,
+    )
+    device.queue.write_texture(
+        {"texture": texture},
+        data,
+        {"bytes_per_row": width * 4, "rows_per_image": height},
+        (width, height, layers),
+    )
+    return texture
+
+
+def read_level(device, texture, level, layer=0):
+    width, height = max(1, texture.size[0] >> level), max(1, texture.size[1] >> level)
+    return device.queue.read_texture(
+        {"texture": texture, "mip_level": level, "origin": (0, 0, layer)},
+        {"bytes_per_row": width * 4},
+        (width, height, 1),
+        as_array=True,
+    )
+
+
+def test_generate_mipmaps_array():
+    device = wgpu.utils.get_default_device()
+
+    # Two layers of 8x8, with random values
+    data = np.random.default_rng(0).integers(0, 256, (2, 8, 8, 4), np.uint8)
+    texture = create_texture(device, data, "rgba8unorm")
+    generate_mipmaps(device, texture)
+
+    for layer in range(2):
+        expected = data[layer].astype(np.float64)
+        for level in range(1, 4):
+            # Each texel is the average of 2x2 texels of the previous level
+            expected = expected.reshape(expected.shape[0] // 2, 2, -1, 2, 4)
+            expected = expected.mean(axis=(1, 3))
+            result = read_level(device, texture, level, layer)
+            assert result.shape == expected.shape
+            # Allow for rounding in each level
+            assert np.abs(result - expected).max() <= level + 0.5
+
+    # The pipeline is cached
+    cache = device._mipmaps_cache["2d-array"]
+    assert list(cache["pipelines"]) == ["rgba8unorm"]
+    generate_mipmaps(device, texture)
+    assert list(cache["pipelines"]) == ["rgba8unorm"]
+
+
+def test_generate_mipmaps_srgb():
+    device = wgpu.utils.get_default_device()
+
+    # Alternating black and white. Averaging is done in linear space.
+    data = np.zeros((1, 8, 8, 4), np.uint8)
+    data[0, :, ::2] = 255
+    texture = create_texture(device, data, "rgba8unorm-srgb")
+    generate_mipmaps(device, texture)
+
+    result = read_level(device, texture, 1)
+    assert np.all(np.abs(result[..., :3].astype(int) - 188) <= 1)
+    assert np.all(np.abs(result[..., 3].astype(int) - 128) <= 1)
+
+
+def test_generate_mipmaps_errors():
+    device = wgpu.utils.get_default_device()
+
+    data = np.zeros((1, 8, 8, 4), np.uint8)
+    texture = create_texture(
+        device, data, "rgba8unorm", usage=wgpu.TextureUsage.COPY_DST
+    )
+    with raises(ValueError):
+        generate_mipmaps(device, texture)
+
+    texture = create_texture(device, data, "rgba8uint")
+    with raises(ValueError):
+        generate_mipmaps(device, texture)
+
+
+def test_generate_mipmaps_does_not_leak_device():
+    adapter = wgpu.utils.get_default_device().adapter
+    device = adapter.request_device_sync()
+    data = np.zeros((1, 8, 8, 4), np.uint8)
+    texture = create_texture(device, data, "rgba8unorm")
+    generate_mipmaps(device, texture)
+    assert device._mipmaps_cache
+
+    device_ref = weakref.ref(device)
+    del device, texture
+    gc.collect()
+    assert device_ref() is None
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -0,0 +1,166 @@
+import time
+
+import wgpu
+from wgpu.utils.profiler import GpuProfiler
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+FEATURES = (
+    "timestamp-query",
+    "timestamp-query-inside-encoders",
+    "timestamp-query-inside-passes",
+)
+
+SHADER_SOURCE = """
+    @group(0) @binding(0) var<storage, read_write> data: array<u32>;
+
+    @compute @workgroup_size(64)
+    fn main(@builtin(global_invocation_id) index: vec3<u32>) {
+        data[index.x] = data[index.x] * 3u + 1u;
+    }
+"""
+
+
+def get_device():
+    adapter = wgpu.utils.get_default_device().adapter
+    if "timestamp-query" not in adapter.features:
+        skip("Needs the timestamp-query feature")
+    features = [f for f in FEATURES if f in adapter.features]
+    return adapter.request_device_sync(required_features=features)
+
+
+def setup_compute(device):
+    buffer = device.create_buffer(size=64 * 1024 * 4, usage="STORAGE")
+    pipeline = device.create_compute_pipeline(
+        layout="auto",
+        compute={"module": device.create_shader_module(code=SHADER_SOURCE)},
+    )
+    bind_group = device.create_bind_group(
+        layout=pipeline.get_bind_group_layout(0),
+        entries=[{"binding": 0, "resource": {"buffer": buffer}}],
+    )
+
+    def dispatch(compute_pass):
+        compute_pass.set_pipeline(pipeline)
+        compute_pass.set_bind_group(0, bind_group)
+        compute_pass.dispatch_workgroups(1024)
+
+    return dispatch
+
+
+def wait_for_results(profiler, n_frames=1):
+    all_results = []
+    etime = time.perf_counter() + 5
+    while len(all_results) < n_frames and time.perf_counter() < etime:
+        all_results += profiler.get_results()
+        time.sleep(0.001)
+    return all_results
+
+
+def test_profiler_needs_feature():
+    device = wgpu.utils.get_default_device()
+    if "timestamp-query" in device.features:
+        skip("The default device has the timestamp-query feature")
+    with raises(RuntimeError):
+        GpuProfiler(device)
+
+
+def test_profiler_passes():
+    device = get_device()
+    dispatch = setup_compute(device)
+    texture = device.create_texture(
+        size=(64, 64, 1), format="rgba8unorm", usage="RENDER_ATTACHMENT"
+    )
+    profiler = GpuProfiler(device)
+
+    for _ in range(3):
+        encoder = device.create_command_encoder()
+        compute_pass = profiler.begin_compute_pass(encoder, label="simulate")
+        dispatch(compute_pass)
+        compute_pass.end()
+        compute_pass = profiler.begin_compute_pass(encoder)
+        compute_pass.end()
+        render_pass = profiler.begin_render_pass(
+            encoder,
+            color_attachments=[
+                {"view": texture.create_view(), "load_op": "clear", "store_op": "store"}
+            ],
+        )
+        render_pass.end()
+        profiler.resolve(encoder)
+        profiler.end_frame(device.queue.submit([encoder.finish()]))
+
+    all_results = wait_for_results(profiler, 3)
+    assert len(all_results) == 3
+    for results in all_results:
+        assert [name for name, _ in results] == ["simulate", "compute", "render"]
+        assert all(isinstance(duration, float) for _, duration in results)
+        assert all(duration >= 0 for _, duration in results)
+    assert profiler.dropped == 0
+
+    # The query sets and buffers are re-used
+    assert profiler._nslots <= 3
+    assert len(profiler._free_slots) == profiler._nslots
+
+
+def test_profiler_scopes():
+    device = get_device()
+    if "timestamp-query-inside-encoders" not in device.features:
+        skip("Needs the timestamp-query-inside-encoders feature")
+    dispatch = setup_compute(device)
+    profiler = GpuProfiler(device)
+
+    encoder = device.create_command_encoder()
+    with profiler.scope(encoder, "physics"):
+        for label in ("a", "b"):
+            compute_pass = profiler.begin_compute_pass(encoder, label=label)
+            dispatch(compute_pass)
+            compute_pass.end()
+    profiler.resolve(encoder)
+    profiler.end_frame(device.queue.submit([encoder.finish()]))
+
+    [results] = wait_for_results(profiler)
+    names = [name for name, _ in results]
+    assert names == ["physics", "physics/a", "physics/b"]
+
+
+def test_profiler_limits():
+    device = get_device()
+    dispatch = setup_compute(device)
+    profiler = GpuProfiler(device, max_queries=4, max_frames_in_flight=2)
+
+    # Too many passes in one frame
+    encoder = device.create_command_encoder()
+    for _ in range(3):
+        compute_pass = profiler.begin_compute_pass(encoder)
+        dispatch(compute_pass)
+        compute_pass.end()
+    profiler.resolve(encoder)
+    profiler.end_frame(device.queue.submit([encoder.finish()]))
+    assert profiler.dropped == 1
+
+    # Too many frames in flight, without collecting results
+    for _ in range(2):
+        encoder = device.create_command_encoder()
+        profiler.begin_compute_pass(encoder).end()
+        profiler.resolve(encoder)
+        profiler.end_frame(device.queue.submit([encoder.finish()]))
+    assert profiler.dropped == 2
+
+    all_results = wait_for_results(profiler, 2)
+    assert [len(results) for results in all_results] == [2, 1]
+
+    # Frames without passes are fine too
+    encoder = device.create_command_encoder()
+    profiler.resolve(encoder)
+    profiler.end_frame(device.queue.submit([encoder.finish()]))
+    assert profiler.get_results() == []
+
+
+if __name__ == "__main__":
+    run_tests(globals())
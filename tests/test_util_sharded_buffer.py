@@ -0,0 +1,81 @@
+import numpy as np
+
+import wgpu
+from wgpu.utils.sharded_buffer import ShardedBuffer
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def test_sharded_buffer_small():
+    device = wgpu.utils.get_default_device()
+
+    data = np.arange(100, dtype=np.float32)
+    sb = ShardedBuffer(device, data)
+    assert sb.nbytes == 400
+    assert sb.item_size == 4
+    assert len(sb.shards) == 1
+    assert sb.offsets == [0]
+    assert sb.sizes == [400]
+    assert sb.shards[0].usage & wgpu.BufferUsage.STORAGE
+
+    result = np.frombuffer(sb.read(), np.float32)
+    assert np.all(result == data)
+
+
+def test_sharded_buffer_split():
+    device = wgpu.utils.get_default_device()
+
+    # Items of 12 bytes, so shards are multiples of 12 *and* 4
+    data = np.arange(300, dtype=np.float32).reshape(100, 3)
+    sb = ShardedBuffer(device, data, item_size=12, max_shard_size=250)
+    assert sb.offsets == [0, 240, 480, 720, 960]
+    assert sb.sizes == [240, 240, 240, 240, 240]
+    assert [b.size for b in sb.shards] == [240] * 5
+
+    # Read into a new memoryview, or into a given array
+    result = np.frombuffer(sb.read(), np.float32).reshape(100, 3)
+    assert np.all(result == data)
+    out = np.zeros_like(data)
+    assert sb.read(out) is out
+    assert np.all(out == data)
+
+    # Write across shard boundaries
+    sb.write(np.full(30, -1, np.float32), 200)
+    sb.read(out)
+    expected = data.flatten()
+    expected[50:80] = -1
+    assert np.all(out.flatten() == expected)
+
+    entries = sb.get_bind_group_entries(2)
+    assert [e["binding"] for e in entries] == [2, 3, 4, 5, 6]
+    assert entries[0]["resource"]["buffer"] is sb.shards[0]
+
+
+def test_sharded_buffer_without_data():
+    device = wgpu.utils.get_default_device()
+
+    sb = ShardedBuffer(device, size=1001, max_shard_size=500)
+    assert sb.sizes == [500, 500, 1]
+    assert [b.size for b in sb.shards] == [500, 500, 4]
+    assert bytes(sb.read()) == bytes(1001)
+
+    with raises(ValueError):
+        ShardedBuffer(device)
+    with raises(ValueError):
+        ShardedBuffer(device, b"abcd", size=8)
+    with raises(ValueError):
+        ShardedBuffer(device, size=100, item_size=64, max_shard_size=32)
+    with raises(ValueError):
+        sb.read(bytes(1001))  # readonly
+    with raises(ValueError):
+        sb.read(bytearray(1000))  # too small
+    with raises(ValueError):
+        sb.write(bytes(8), 1000)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
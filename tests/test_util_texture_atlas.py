@@ -0,0 +1,98 @@
+import numpy as np
+
+import wgpu
+from wgpu.utils.texture_atlas import TextureAtlas
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def read_region(atlas, region):
+    device = wgpu.utils.get_default_device()
+    return device.queue.read_texture(
+        {"texture": atlas.texture, "origin": (region.x, region.y, region.layer)},
+        {"bytes_per_row": region.width * 4},
+        (region.width, region.height, 1),
+        as_array=True,
+    )
+
+
+def random_image(rng, width, height):
+    return rng.integers(0, 256, (height, width, 4), np.uint8)
+
+
+def test_texture_atlas_pack():
+    device = wgpu.utils.get_default_device()
+    rng = np.random.default_rng(0)
+
+    atlas = TextureAtlas(device, size=64)
+    assert atlas.layers == 1
+    assert atlas.texture.size == (64, 64, 1)
+
+    images = [random_image(rng, 10 + i, 8 + i % 3) for i in range(8)]
+    regions = [atlas.add(im) for im in images]
+    assert atlas.layers == 1
+    assert atlas.version == 1
+
+    # Regions do not overlap, and include padding
+    for i, r1 in enumerate(regions):
+        for r2 in regions[i + 1 :]:
+            assert (
+                r1.x + r1.width < r2.x
+                or r2.x + r2.width < r1.x
+                or r1.y + r1.height < r2.y
+                or r2.y + r2.height < r1.y
+            )
+
+    for image, region in zip(images, regions, strict=True):
+        assert np.all(read_region(atlas, region) == image)
+
+    u0, v0, u1, v1 = regions[0].uv_rect
+    assert (u0, v0) == (1 / 64, 1 / 64)
+    assert (u1, v1) == (11 / 64, 9 / 64)
+
+    with raises(ValueError):
+        atlas.allocate(64, 10)
+    with raises(ValueError):
+        atlas.add(images[0], 5, 5)
+
+
+def test_texture_atlas_grow_and_defragment():
+    device = wgpu.utils.get_default_device()
+    rng = np.random.default_rng(1)
+
+    atlas = TextureAtlas(device, size=64, max_layers=4)
+    images = [random_image(rng, 30, 30) for i in range(5)]
+    regions = [atlas.add(im) for im in images]
+
+    # The fifth image does not fit, so the layers are doubled on the GPU
+    assert atlas.layers == 2
+    assert atlas.version == 2
+    assert [r.layer for r in regions] == [0, 0, 0, 0, 1]
+    for image, region in zip(images, regions, strict=True):
+        assert np.all(read_region(atlas, region) == image)
+
+    # After freeing, defragmenting packs the remaining regions in one layer
+    atlas.free(regions[1])
+    atlas.free(regions[2])
+    atlas.defragment()
+    assert atlas.layers == 1
+    assert len(atlas.regions) == 3
+    for i in (0, 3, 4):
+        assert regions[i].layer == 0
+        assert np.all(read_region(atlas, regions[i]) == images[i])
+
+    with raises(ValueError):
+        atlas.free(regions[1])
+
+    # The atlas does not grow beyond max_layers
+    with raises(RuntimeError):
+        for _ in range(20):
+            atlas.allocate(30, 30)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
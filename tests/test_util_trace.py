@@ -0,0 +1,159 @@
+import json
+
+import wgpu
+from wgpu.utils.trace import Tracer, get_active_tracer
+from wgpu.utils.profiler import GpuProfiler
+from pytest import mark, skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def get_class_dicts():
+    m = wgpu.backends.wgpu_native._api
+    classes = [
+        m.GPUDevice,
+        m.GPUTexture,
+        m.GPUCommandEncoder,
+        m.GPUComputePassEncoder,
+        m.GPURenderPassEncoder,
+        m.GPUQueue,
+        m.GPUPromise,
+    ]
+    return {cls.__name__: dict(cls.__dict__) for cls in classes}
+
+
+def test_tracer_start_stop():
+    before = get_class_dicts()
+    tracer = Tracer()
+    assert get_active_tracer() is None
+
+    with tracer:
+        assert tracer.active
+        assert get_active_tracer() is tracer
+        assert get_class_dicts() != before
+        with raises(RuntimeError):
+            Tracer().start()
+
+    assert not tracer.active
+    assert get_active_tracer() is None
+    assert get_class_dicts() == before
+
+    # Nothing is recorded when the tracer is not active
+    device = wgpu.utils.get_default_device()
+    device.create_buffer(size=16, usage="COPY_DST")
+    assert tracer.get_events() == []
+
+
+def test_tracer_cpu_spans(tmp_path):
+    device = wgpu.utils.get_default_device()
+    texture = device.create_texture(
+        size=(16, 16, 1), format="rgba8unorm", usage="RENDER_ATTACHMENT"
+    )
+
+    tracer = Tracer()
+    with tracer:
+        buffer = device.create_buffer(
+            label="readback", size=16, usage="MAP_READ | COPY_DST"
+        )
+        encoder = device.create_command_encoder()
+        encoder.begin_compute_pass(label="physics").end()
+        render_pass = encoder.begin_render_pass(
+            color_attachments=[
+                {"view": texture.create_view(), "load_op": "clear", "store_op": "store"}
+            ],
+        )
+        render_pass.end()
+        index = device.queue.submit([encoder.finish()])
+        buffer.map_sync("READ")
+        buffer.unmap()
+
+    events = tracer.get_events()
+    spans = [e for e in events if e["ph"] == "X"]
+    names = [e["name"] for e in spans]
+    for name in [
+        "create_buffer",
+        "create_command_encoder",
+        "create_view",
+        "physics",
+        "render_pass",
+        "submit",
+        "wait buffer.map",
+    ]:
+        assert name in names
+
+    span = spans[names.index("create_buffer")]
+    assert span["cat"] == "create"
+    assert span["args"] == {"label": "readback"}
+    assert span["dur"] >= 0
+    span = spans[names.index("physics")]
+    assert span["cat"] == "compute_pass"
+    span = spans[names.index("submit")]
+    assert span["args"] == {"submission_index": index}
+
+    # The main thread is named
+    meta = [e for e in events if e["ph"] == "M"]
+    assert any(e["tid"] == spans[0]["tid"] for e in meta)
+
+    filename = tmp_path / "trace.json"
+    tracer.save(filename)
+    with open(filename, "rb") as f:
+        data = json.load(f)
+    assert data["traceEvents"] == events
+
+    tracer.clear()
+    assert tracer.get_events() == []
+
+
+@mark.anyio
+async def test_tracer_await_spans():
+    device = wgpu.utils.get_default_device()
+    buffer = device.create_buffer(size=16, usage="MAP_READ | COPY_DST")
+
+    tracer = Tracer()
+    with tracer:
+        await buffer.map_async("READ")
+        buffer.unmap()
+
+    spans = [e for e in tracer.get_events() if e["ph"] == "X"]
+    names = [e["name"] for e in spans]
+    assert "await buffer.map" in names
+    span = spans[names.index("await buffer.map")]
+    assert span["cat"] == "wait"
+    assert span["dur"] >= 0
+
+
+def test_tracer_gpu_spans():
+    adapter = wgpu.utils.get_default_device().adapter
+    if "timestamp-query" not in adapter.features:
+        skip("Needs the timestamp-query feature")
+    device = adapter.request_device_sync(required_features=["timestamp-query"])
+    profiler = GpuProfiler(device)
+
+    tracer = Tracer()
+    with tracer:
+        for _ in range(2):
+            encoder = device.create_command_encoder()
+            profiler.begin_compute_pass(encoder, label="simulate").end()
+            profiler.resolve(encoder)
+            profiler.end_frame(device.queue.submit([encoder.finish()]))
+        device._poll_wait()
+        assert len(profiler.get_results()) == 2
+
+    events = tracer.get_events()
+    gpu_spans = [e for e in events if e.get("cat") == "gpu"]
+    assert [e["name"] for e in gpu_spans] == ["simulate", "simulate"]
+
+    # The GPU work starts after the corresponding submit
+    submits = {
+        e["args"]["submission_index"]: e for e in events if e["name"] == "submit"
+    }
+    for span in gpu_spans:
+        submit = submits[span["args"]["submission_index"]]
+        assert span["ts"] >= submit["ts"]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
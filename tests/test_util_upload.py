@@ -0,0 +1,99 @@
+import numpy as np
+
+import wgpu
+from wgpu.utils.upload import upload_file
+from pytest import skip, raises
+from testutils import run_tests, can_use_wgpu_lib
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+def test_upload_file_to_buffers(tmp_path):
+    device = wgpu.utils.get_default_device()
+
+    data = np.random.randint(0, 255, 1000, np.uint8).tobytes()
+    filename = tmp_path / "data.bin"
+    filename.write_bytes(data)
+
+    # Single buffer, with the default settings
+    buffers = upload_file(device, filename)
+    assert len(buffers) == 1
+    assert buffers[0].size == 1000
+    assert buffers[0].usage == wgpu.BufferUsage.STORAGE | wgpu.BufferUsage.COPY_DST
+
+    usage = wgpu.BufferUsage.COPY_SRC
+    buffers = upload_file(device, filename, usage=usage)
+    assert bytes(device.queue.read_buffer(buffers[0])) == data
+
+    for threaded in (False, True):
+        # Spread over multiple buffers, in multiple chunks
+        buffers = upload_file(
+            device,
+            filename,
+            offset=8,
+            size=990,
+            max_buffer_size=400,
+            chunk_size=64,
+            threaded=threaded,
+            usage=usage,
+        )
+        assert [b.size for b in buffers] == [400, 400, 192]
+        result = b"".join(bytes(device.queue.read_buffer(b)) for b in buffers)
+        assert result[:990] == data[8:998]
+
+
+def test_upload_file_to_texture(tmp_path):
+    device = wgpu.utils.get_default_device()
+
+    size = 20, 10, 6
+    data = np.random.randint(0, 255, (6, 10, 20, 4), np.uint8)
+    filename = tmp_path / "volume.bin"
+    filename.write_bytes(data.tobytes())
+
+    # Chunks of multiple images, and of multiple rows
+    for chunk_size in (2000, 500):
+        for threaded in (False, True):
+            texture = device.create_texture(
+                size=size,
+                dimension="3d",
+                format=wgpu.TextureFormat.rgba8unorm,
+                usage=wgpu.TextureUsage.COPY_DST | wgpu.TextureUsage.COPY_SRC,
+            )
+            result = upload_file(
+                device,
+                filename,
+                texture=texture,
+                chunk_size=chunk_size,
+                threaded=threaded,
+            )
+            assert result is texture
+            result = device.queue.read_texture(
+                {"texture": texture}, {}, size, as_array=True
+            )
+            assert np.all(result == data)
+
+
+def test_upload_file_errors(tmp_path):
+    device = wgpu.utils.get_default_device()
+
+    filename = tmp_path / "data.bin"
+    filename.write_bytes(bytes(100))
+
+    with raises(ValueError):
+        upload_file(device, filename, offset=200)
+    with raises(ValueError):
+        upload_file(device, filename, size=0)
+
+    texture = device.create_texture(
+        size=(4, 4, 1),
+        format=wgpu.TextureFormat.rgba8unorm,
+        usage=wgpu.TextureUsage.COPY_DST,
+    )
+    with raises(ValueError):  # size mismatch
+        upload_file(device, filename, texture=texture)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
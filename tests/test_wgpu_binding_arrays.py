@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+import wgpu.utils
+from testutils import can_use_wgpu_lib, run_tests
+
+if not can_use_wgpu_lib:
+    pytest.skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+SHADER_SOURCE = """
+    @group(0) @binding(0) var textures: binding_array<texture_2d<f32>>;
+    @group(0) @binding(1) var<storage, read_write> data: array<f32>;
+
+    @compute @workgroup_size(1)
+    fn main(@builtin(global_invocation_id) index: vec3<u32>) {
+        let i: u32 = index.x;
+        data[i] = textureLoad(textures[i], vec2<i32>(0, 0), 0).r;
+    }
+"""
+
+
+def create_textures(device, n):
+    textures = []
+    for i in range(n):
+        texture = device.create_texture(
+            size=(1, 1, 1),
+            format="r32float",
+            usage=wgpu.TextureUsage.TEXTURE_BINDING | wgpu.TextureUsage.COPY_DST,
+        )
+        data = np.array([i + 1], np.float32)
+        device.queue.write_texture(
+            {"texture": texture}, data, {"bytes_per_row": 4}, (1, 1, 1)
+        )
+        textures.append(texture)
+    return textures
+
+
+def test_binding_array_validation():
+    device = wgpu.utils.get_default_device()
+    views = [t.create_view() for t in create_textures(device, 3)]
+    entry = {"binding": 0, "visibility": "COMPUTE", "texture": {}}
+
+    # The count must be a positive int
+    for count in (0, 1.5, "3"):
+        with pytest.raises(ValueError):
+            device.create_bind_group_layout(entries=[{**entry, "count": count}])
+
+    # Resources in a binding array must be of the same kind
+    layout = device.create_bind_group_layout(entries=[entry])
+    sampler = device.create_sampler()
+    for resources in ([], [views[0], sampler], [views[0], 3]):
+        with pytest.raises((ValueError, TypeError)):
+            device.create_bind_group(
+                layout=layout, entries=[{"binding": 0, "resource": resources}]
+            )
+
+    # Buffers in a binding array cannot have an offset
+    buffer = device.create_buffer(size=16, usage="STORAGE")
+    with pytest.raises(ValueError):
+        device.create_bind_group(
+            layout=layout,
+            entries=[
+                {"binding": 0, "resource": [{"buffer": buffer, "offset": 4}]},
+            ],
+        )
+
+    # The extras are passed to wgpu-native, which validates them
+    if "texture-binding-array" not in device.features:
+        with pytest.raises(wgpu.GPUValidationError) as err:
+            device.create_bind_group_layout(entries=[{**entry, "count": 3}])
+        assert "TEXTURE_BINDING_ARRAY" in str(err.value)
+    with pytest.raises(wgpu.GPUValidationError) as err:
+        device.create_bind_group(
+            layout=layout, entries=[{"binding": 0, "resource": views}]
+        )
+    assert "array" in str(err.value)
+
+
+def test_binding_array_textures():
+    adapter = wgpu.gpu.request_adapter_sync()
+    if "texture-binding-array" not in adapter.features:
+        pytest.skip("Needs the 'texture-binding-array' feature")
+    device = adapter.request_device_sync(required_features=["texture-binding-array"])
+
+    n = 4
+    views = [t.create_view() for t in create_textures(device, n)]
+    out = device.create_buffer(size=n * 4, usage="STORAGE|COPY_SRC")
+
+    layout = device.create_bind_group_layout(
+        entries=[
+            {
+                "binding": 0,
+                "visibility": "COMPUTE",
+                "texture": {"sample_type": "unfilterable-float"},
+                "count": n,
+            },
+            {"binding": 1, "visibility": "COMPUTE", "buffer": {"type": "storage"}},
+        ]
+    )
+    bind_group = device.create_bind_group(
+        layout=layout,
+        entries=[
+            {"binding": 0, "resource": views},
+            {"binding": 1, "resource": {"buffer": out}},
+        ],
+    )
+    pipeline = device.create_compute_pipeline(
+        layout=device.create_pipeline_layout(bind_group_layouts=[layout]),
+        compute={"module": device.create_shader_module(code=SHADER_SOURCE)},
+    )
+
+    encoder = device.create_command_encoder()
+    compute_pass = encoder.begin_compute_pass()
+    compute_pass.set_pipeline(pipeline)
+    compute_pass.set_bind_group(0, bind_group)
+    compute_pass.dispatch_workgroups(n)
+    compute_pass.end()
+    device.queue.submit([encoder.finish()])
+
+    result = np.frombuffer(device.queue.read_buffer(out), np.float32)
+    assert list(result) == [1, 2, 3, 4]
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -364,6 +364,41 @@ def test_adapter_destroy():
     assert adapter._internal is None
 
 
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_submission_index():
+    device = wgpu.utils.get_default_device()
+    queue = device.queue
+
+    # Submit returns increasing indices
+    index1 = queue.submit([])
+    index2 = queue.submit([device.create_command_encoder().finish()])
+    assert isinstance(index1, int)
+    assert index2 > index1
+
+    # Wait for specific work
+    assert device.wait_for(index1)
+    assert device.is_done(index1)
+    assert device.wait_for(index2, timeout=5)
+    assert device.is_done(index2)
+
+    # Work that is done is done
+    queue.on_submitted_work_done_sync()
+    index3 = queue.submit([])
+    queue.on_submitted_work_done_sync()
+    assert device.is_done(index3)
+    assert device.wait_for(index3, timeout=0)
+
+    # Indices that were never returned by submit() are rejected, because
+    # wgpu-native would panic, and the work would never be done anyway.
+    for index in (0, -1, index3 + 100):
+        with raises(ValueError):
+            device.wait_for(index)
+        with raises(ValueError):
+            device.wait_for(index, timeout=0.01)
+        with raises(ValueError):
+            device.is_done(index)
+
+
 def test_get_memoryview_and_address():
     get_memoryview_and_address = (
         wgpu.backends.wgpu_native._helpers.get_memoryview_and_address
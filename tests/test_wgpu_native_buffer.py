@@ -1,4 +1,6 @@
+import gc
 import sys
+import weakref
 
 import pytest
 
@@ -574,5 +576,197 @@ def test_that_passes_when_bug_wgpu_native_305_is_fixed():
     assert data1 == data2
 
 
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_buffer_mapped_view():
+    device = wgpu.utils.get_default_device()
+
+    buf = device.create_buffer(
+        size=32, usage=wgpu.BufferUsage.MAP_WRITE | wgpu.BufferUsage.COPY_SRC
+    )
+
+    # Write data in place using numpy
+    buf.map_sync("write")
+    with buf.mapped_view(format="f", as_array=True) as array:
+        assert isinstance(array, np.ndarray)
+        assert array.dtype == np.float32
+        assert array.shape == (8,)
+        array[:] = np.arange(8)
+    with buf.mapped_view(16, 8) as view:
+        assert view.nbytes == 8
+        view[:] = b"abcdefgh"
+    del array  # the memoryview is released, but arrays must be deleted
+    buf.unmap()
+
+    data = device.queue.read_buffer(buf)
+    assert np.all(np.frombuffer(data, np.float32)[:4] == [0, 1, 2, 3])
+    assert bytes(data[16:24]) == b"abcdefgh"
+
+    # The view is released when the block exits
+    buf.map_sync("write")
+    with buf.mapped_view() as view:
+        pass
+    with raises(ValueError):
+        view[0]
+
+    # Cannot unmap while derived views are alive
+    with buf.mapped_view(format="f", as_array=True) as array:
+        sub_array = array[2:]
+    with raises(RuntimeError):
+        buf.unmap()
+    with raises(RuntimeError):
+        buf.destroy()
+    assert buf.map_state == "mapped"
+
+    # The views keep the buffer alive
+    buf_ref = weakref.ref(buf)
+    del buf
+    gc.collect()
+    buf = buf_ref()
+    assert buf is not None
+    assert sub_array[0] == 2
+
+    del array, sub_array
+    buf.unmap()
+
+    # The range must be mapped
+    with raises(RuntimeError):
+        with buf.mapped_view():
+            pass
+    buf.map_sync("write", 0, 16)
+    with raises(ValueError):
+        with buf.mapped_view(16, 16):
+            pass
+    buf.unmap()
+
+    # Readonly when mapped for reading
+    buf = device.create_buffer_with_data(
+        data=b"12345678", usage=wgpu.BufferUsage.MAP_READ
+    )
+    buf.map_sync("read")
+    with buf.mapped_view() as view:
+        assert view == b"12345678"
+        with raises(TypeError):
+            view[0] = 1
+    buf.unmap()
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_write_buffers():
+    device = wgpu.utils.get_default_device()
+    usage = wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+    buf1 = device.create_buffer(size=32, usage=usage)
+    buf2 = device.create_buffer(size=16, usage=usage)
+
+    # Tuples with data, the first three are coalesced
+    device.queue.write_buffers(
+        [
+            (buf1, 0, b"abcd"),
+            (buf1, 4, np.frombuffer(b"efgh", np.uint8)),
+            (buf1, 8, bytearray(b"ijkl")),
+            (buf1, 24, b"yzYZ"),
+            (buf2, 4, b"1234"),
+        ]
+    )
+    assert bytes(device.queue.read_buffer(buf1)[:12]) == b"abcdefghijkl"
+    assert bytes(device.queue.read_buffer(buf1)[24:28]) == b"yzYZ"
+    assert bytes(device.queue.read_buffer(buf2)[4:8]) == b"1234"
+
+    # Offsets into a packed blob
+    blob = b"0123456789ABCDEF"
+    device.queue.write_buffers(
+        [(buf2, 0, 0, 8), (buf2, 8, 8, 4), (buf2, 12, 0, 4)],
+        blob,
+    )
+    assert bytes(device.queue.read_buffer(buf2)) == b"0123456789AB0123"
+
+    # Items can also be a numpy structured array
+    dtype = [
+        ("buffer", object),
+        ("offset", "u8"),
+        ("data_offset", "u8"),
+        ("size", "u8"),
+    ]
+    items = np.array([(buf1, 0, 4, 4), (buf1, 4, 0, 4)], dtype=dtype)
+    device.queue.write_buffers(items, blob)
+    assert bytes(device.queue.read_buffer(buf1)[:8]) == b"45670123"
+
+    # Everything is validated before writing
+    with raises(ValueError):
+        device.queue.write_buffers([(buf2, 0, b"xxxx"), (buf2, 16, b"xxxx")])
+    with raises(ValueError):
+        device.queue.write_buffers([(buf2, 0, 12, 8)], blob)
+    assert bytes(device.queue.read_buffer(buf2)) == b"0123456789AB0123"
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_write_buffer_strided():
+    device = wgpu.utils.get_default_device()
+
+    data0 = np.arange(20 * 12, dtype=np.float32).reshape(20, 12)
+    data1 = data0[::2, 4:8]  # not contiguous
+    assert not data1.flags.c_contiguous
+    buf = device.create_buffer(
+        size=data1.nbytes, usage=wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+    )
+
+    # Gathered in chunks, also when the chunks do not align with the rows
+    for chunk_size in (1024 * 1024, 64, 24):
+        device.queue._strided_chunk_size = chunk_size
+        try:
+            device.queue.write_buffer(buf, 0, np.zeros_like(data1))
+            device.queue.write_buffer(buf, 0, data1)
+        finally:
+            del device.queue._strided_chunk_size
+        data2 = np.frombuffer(device.queue.read_buffer(buf), np.float32)
+        assert np.all(data2 == data1.flatten())
+
+    # Rows that are larger than the chunk size are split too
+    from wgpu.backends.wgpu_native import _helpers
+
+    data0 = np.arange(2 * 64 * 8, dtype=np.float32).reshape(2, 64, 8)
+    data1 = data0[:, ::2, 1:7]  # rows of 32 * 6 * 4 = 768 bytes
+    buf = device.create_buffer(
+        size=data1.nbytes, usage=wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+    )
+    chunks = list(
+        _helpers.iter_strided_chunks(memoryview(data1), 4, data1.nbytes - 8, 64)
+    )
+    assert max(chunk.nbytes for _, chunk in chunks) <= 64
+    assert b"".join(chunk for _, chunk in chunks) == data1.tobytes()[4:-8]
+    assert [pos for pos, _ in chunks] == sorted(pos for pos, _ in chunks)
+
+    # Without numpy, the chunks are bounded by the row size
+    ori_numpy = _helpers._numpy
+    _helpers._numpy = None
+    try:
+        chunks = list(_helpers.iter_strided_chunks(memoryview(data1), 0, 1600, 64))
+    finally:
+        _helpers._numpy = ori_numpy
+    assert max(chunk.nbytes for _, chunk in chunks) <= 768
+    assert b"".join(chunk for _, chunk in chunks) == data1.tobytes()[:1600]
+    for chunk_size in (1024 * 1024, 100, 24):
+        device.queue._strided_chunk_size = chunk_size
+        try:
+            device.queue.write_buffer(buf, 0, np.zeros_like(data1))
+            device.queue.write_buffer(buf, 0, data1)
+        finally:
+            del device.queue._strided_chunk_size
+        data2 = np.frombuffer(device.queue.read_buffer(buf), np.float32)
+        assert np.all(data2 == data1.flatten())
+
+    # With data offset and size
+    data0 = np.arange(20 * 12, dtype=np.float32).reshape(20, 12)
+    data1 = data0[::2, 4:8]
+    buf = device.create_buffer(
+        size=data1.nbytes, usage=wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+    )
+    device.queue.write_buffer(buf, 0, np.zeros_like(data1))
+    device.queue.write_buffer(buf, 16, data1, 32, 48)
+    data2 = np.frombuffer(device.queue.read_buffer(buf), np.float32)
+    assert np.all(data2[:4] == 0)
+    assert np.all(data2[4:16] == data1.flatten()[8:20])
+    assert np.all(data2[16:] == 0)
+
+
 if __name__ == "__main__":
     run_tests(globals())
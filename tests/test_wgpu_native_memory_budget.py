@@ -0,0 +1,111 @@
+import gc
+
+import wgpu.utils
+
+from testutils import run_tests, can_use_wgpu_lib
+from pytest import mark
+
+
+def get_fresh_device():
+    # Use a separate device, so the budget does not affect other tests
+    adapter = wgpu.utils.get_default_device().adapter
+    return adapter.request_device_sync()
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_memory_usage():
+    device = get_fresh_device()
+    assert device.memory_usage == 0
+
+    usage = wgpu.BufferUsage.COPY_DST
+    buf1 = device.create_buffer(size=1024, usage=usage)
+    buf2 = device.create_buffer(size=4096, usage=usage)
+    tex = device.create_texture(
+        size=(16, 16, 1), format="rgba8unorm", usage=wgpu.TextureUsage.COPY_DST
+    )
+    assert device.memory_usage == 1024 + 4096 + 16 * 16 * 4
+
+    # Other devices are not affected
+    assert get_fresh_device().memory_usage == 0
+
+    # Destroying and deleting both count, but only once
+    buf1.destroy()
+    assert device.memory_usage == 4096 + 16 * 16 * 4
+    del buf1
+    gc.collect()
+    assert device.memory_usage == 4096 + 16 * 16 * 4
+    tex.destroy()
+    del buf2
+    gc.collect()
+    assert device.memory_usage == 0
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_memory_budget_eviction():
+    device = get_fresh_device()
+    usage = wgpu.BufferUsage.COPY_DST
+
+    evicted = []
+    buffers = [device.create_buffer(size=1000, usage=usage) for i in range(4)]
+    for buffer in buffers[:3]:
+        device.register_evictable(buffer, evicted.append)
+    assert device.memory_usage == 4000
+
+    # Use buffer 0, so that buffer 1 is now least recently used
+    device.mark_used(buffers[0])
+
+    # Setting a budget evicts resources, least recently used first
+    device.set_memory_budget(3000)
+    assert evicted == [buffers[1]]
+    assert device.memory_usage == 3000
+
+    # Creating a resource evicts too, but not the new one
+    new_buffer = device.create_buffer(size=1500, usage=usage)
+    device.register_evictable(new_buffer)
+    assert evicted == [buffers[1], buffers[2], buffers[0]]
+    assert device.memory_usage == 2500
+
+    # Unregistered resources are not evicted, the budget is soft
+    device.unregister_evictable(new_buffer)
+    buffers.append(device.create_buffer(size=2000, usage=usage))
+    assert device.memory_usage == 4500
+    assert evicted == [buffers[1], buffers[2], buffers[0]]
+
+    # Without budget, nothing is evicted
+    device.set_memory_budget(None)
+    device.register_evictable(new_buffer)
+    buffers.append(device.create_buffer(size=2000, usage=usage))
+    assert len(evicted) == 3
+    assert device.memory_usage == 6500
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_memory_budget_eviction_fails(caplog):
+    device = get_fresh_device()
+    usage = wgpu.BufferUsage.COPY_DST
+
+    # A buffer with a live view of its mapped memory refuses to be destroyed
+    victim = device.create_buffer(size=1000, usage=usage, mapped_at_creation=True)
+    with victim.mapped_view(as_array=True) as array:
+        view = array[:]
+    del array
+    device.register_evictable(victim)
+    device.set_memory_budget(1500)
+
+    # Creating another buffer still works, and the error is logged
+    with caplog.at_level("ERROR", logger="wgpu"):
+        buffer = device.create_buffer(size=1000, usage=usage)
+    assert "Could not evict" in caplog.text
+    assert buffer.size == 1000
+    assert device.memory_usage == 2000
+
+    # The victim is still evictable, and is evicted once it can be destroyed
+    del view
+    gc.collect()
+    victim.unmap()
+    device.set_memory_budget(1000)
+    assert device.memory_usage == 1000
+
+
+if __name__ == "__main__":
+    run_tests(globals())
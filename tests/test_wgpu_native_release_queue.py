@@ -0,0 +1,155 @@
+import gc
+import time
+
+import wgpu.utils
+from wgpu.backends.wgpu_native import extras
+from wgpu.backends.wgpu_native._api import _release_queue
+from wgpu.backends.wgpu_native._helpers import ReleaseQueue
+
+from testutils import run_tests, can_use_wgpu_lib
+from pytest import skip
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+
+def test_release_queue():
+    logger = FakeLogger()
+    q = ReleaseQueue(logger)
+    released = []
+
+    for i in range(10):
+        q.push(released.append, i)
+    assert q.depth == 10
+    assert released == []
+
+    assert q.drain() == 10
+    assert released == list(range(10))
+    assert q.depth == 0
+    assert q.drain() == 0
+
+    # Objects pushed while draining are left for the next drain
+    def release_and_push(i):
+        released.append(i)
+        q.push(released.append, i + 100)
+
+    q.push(release_and_push, 20)
+    assert q.drain() == 1
+    assert q.depth == 1
+    assert q.drain() == 1
+    assert released[-2:] == [20, 120]
+
+    # Errors are logged, and do not stop the drain
+    q.push(lambda i: 1 / 0, 30)
+    q.push(released.append, 31)
+    assert q.drain() == 2
+    assert released[-1] == 31
+    assert len(logger.errors) == 1
+
+    # Metrics
+    assert q.max_depth == 10
+    assert q.drains == 4
+    assert q.released == 14
+    assert q.drain_time >= q.max_drain_time >= q.last_drain_time > 0
+    q.reset_stats()
+    assert q.released == 0
+
+
+def test_release_queue_thread():
+    q = ReleaseQueue(FakeLogger())
+    released = []
+
+    q.start_thread(0.001)
+    try:
+        for i in range(10):
+            q.push(released.append, i)
+        etime = time.perf_counter() + 2
+        while q.depth and time.perf_counter() < etime:
+            time.sleep(0.001)
+        assert released == list(range(10))
+    finally:
+        q.stop_thread()
+    assert q._thread is None
+
+
+def test_deferred_release():
+    device = wgpu.utils.get_default_device()
+    counts = wgpu.diagnostics.wgpu_native_counts
+    gc.collect()
+    extras.drain_release_queue()
+
+    extras.set_deferred_release(True)
+    try:
+        n_buffers_before = counts.get_dict()["Buffer"]["count"]
+        buffers = [device.create_buffer(size=64, usage="COPY_DST") for _ in range(100)]
+        assert counts.get_dict()["Buffer"]["count"] == n_buffers_before + 100
+
+        # Deleting the buffers does not release the native objects yet
+        del buffers
+        gc.collect()
+        assert _release_queue.depth == 100
+        assert counts.get_dict()["Buffer"]["count"] == n_buffers_before + 100
+
+        # Submitting drains the queue
+        _release_queue.reset_stats()
+        device.queue.submit([])
+        assert _release_queue.depth == 0
+        assert counts.get_dict()["Buffer"]["count"] == n_buffers_before
+
+        # Metrics are exposed via diagnostics
+        d = wgpu.diagnostics.wgpu_native_release_queue.get_dict()
+        assert d["enabled"] is True
+        assert d["depth"] == 0
+        assert d["max_depth"] == 100
+        assert d["released"] == 100
+
+        # Polling the device drains the queue too
+        buffer = device.create_buffer(size=64, usage="COPY_DST")
+        del buffer
+        assert _release_queue.depth == 1
+        device._poll()
+        assert _release_queue.depth == 0
+
+        # Disabling releases what's left in the queue
+        buffer = device.create_buffer(size=64, usage="COPY_DST")
+        del buffer
+        assert _release_queue.depth == 1
+    finally:
+        extras.set_deferred_release(False)
+    assert _release_queue.depth == 0
+    assert counts.get_dict()["Buffer"]["count"] == n_buffers_before
+
+    # When not enabled, objects are released directly
+    buffer = device.create_buffer(size=64, usage="COPY_DST")
+    del buffer
+    assert _release_queue.depth == 0
+
+
+def test_deferred_release_thread():
+    device = wgpu.utils.get_default_device()
+    extras.set_deferred_release(True, thread_interval=0.001)
+    try:
+        assert wgpu.diagnostics.wgpu_native_release_queue.get_dict()["thread"]
+        buffers = [device.create_buffer(size=64, usage="COPY_DST") for _ in range(10)]
+        del buffers
+        gc.collect()
+        etime = time.perf_counter() + 2
+        while _release_queue.depth and time.perf_counter() < etime:
+            time.sleep(0.001)
+        assert _release_queue.depth == 0
+    finally:
+        extras.set_deferred_release(False)
+    assert _release_queue._thread is None
+
+
+if __name__ == "__main__":
+    run_tests(globals())
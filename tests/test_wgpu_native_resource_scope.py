@@ -0,0 +1,168 @@
+import gc
+import threading
+
+import numpy as np
+import wgpu.utils
+from wgpu.utils.managed_buffer import ManagedBuffer
+from wgpu.utils.mipmaps import generate_mipmaps
+
+from testutils import run_tests, can_use_wgpu_lib
+from pytest import mark, raises
+
+
+def get_fresh_device():
+    # Use a separate device, so that the memory usage is not affected by other tests
+    adapter = wgpu.utils.get_default_device().adapter
+    return adapter.request_device_sync()
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_resource_scope():
+    device = get_fresh_device()
+    usage = wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+    persistent = device.create_buffer(size=100, usage=usage)
+
+    with device.resource_scope() as scope:
+        buffer = device.create_buffer(size=1000, usage=usage)
+        texture = device.create_texture(
+            size=(16, 16, 1), format="rgba8unorm", usage="TEXTURE_BINDING"
+        )
+        view = texture.create_view()
+        sampler = device.create_sampler()
+        kept = scope.keep(device.create_buffer(size=10, usage=usage))
+        # Only resources that can be destroyed are tracked
+        assert scope.objects == [buffer, texture]
+        assert device.memory_usage == 100 + 1000 + 16 * 16 * 4 + 10
+
+    # Memory is freed, without waiting for gc
+    assert device.memory_usage == 100 + 10
+    assert scope.objects == []
+
+    # The native objects are not released, so other objects remain valid
+    for ob in (buffer, texture, view, sampler):
+        assert ob._internal is not None
+    device.create_bind_group(
+        layout=device.create_bind_group_layout(
+            entries=[{"binding": 0, "visibility": "FRAGMENT", "sampler": {}}]
+        ),
+        entries=[{"binding": 0, "resource": sampler}],
+    )
+
+    # Objects created outside of the scope are not affected
+    for ob in (persistent, kept):
+        assert ob._internal is not None
+        device.queue.write_buffer(ob, 0, b"abcd")
+
+    # Deleting the objects still works
+    del buffer, texture, view, sampler
+    gc.collect()
+    assert device.memory_usage == 110
+
+    # No scopes are active anymore, so creating objects skips the lookup
+    assert device._active_resource_scopes == 0
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_resource_scope_nested_and_reuse():
+    device = get_fresh_device()
+    scope1 = device.resource_scope(release_all=True)
+    scope2 = device.resource_scope(release_all=True)
+
+    for _ in range(3):
+        with scope1:
+            sampler1 = device.create_sampler()
+            with scope2:
+                sampler2 = device.create_sampler()
+                assert scope2.objects == [sampler2]
+                with raises(RuntimeError):
+                    with scope2:
+                        pass
+            assert sampler2._internal is None
+            assert sampler1._internal is not None
+            assert scope1.objects == [sampler1]
+        assert sampler1._internal is None
+
+    # Objects created in other threads are not tracked
+    with scope1:
+        t = threading.Thread(target=device.create_sampler)
+        t.start()
+        t.join()
+        assert scope1.objects == []
+    assert device._active_resource_scopes == 0
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_resource_scope_recycle():
+    device = get_fresh_device()
+    usage = "STORAGE|COPY_SRC|COPY_DST"
+    scope = device.resource_scope(recycle=True)
+
+    with raises(RuntimeError):
+        scope.create_buffer(size=64, usage=usage)
+
+    # First use, creates resources
+    with scope:
+        buffer1 = scope.create_buffer(size=64, usage=usage)
+        buffer2 = scope.create_buffer(size=128, usage=usage)
+        texture1 = scope.create_texture(
+            size=(8, 8, 1), format="rgba8unorm", usage="COPY_DST"
+        )
+        assert scope.objects == []
+    assert device.memory_usage == 64 + 128 + 8 * 8 * 4
+
+    # Second use re-uses them, but buffer2 is not used, and thus destroyed
+    with scope:
+        buffer3 = scope.create_buffer(label="x", size=64, usage=usage)
+        texture2 = scope.create_texture(
+            size=(8, 8, 1), format="rgba8unorm", usage=wgpu.TextureUsage.COPY_DST
+        )
+        buffer4 = scope.create_buffer(size=64, usage=usage)
+        device.queue.write_buffer(buffer3, 0, np.arange(16, dtype=np.uint32))
+        data = device.queue.read_buffer(buffer3)
+        assert np.all(np.frombuffer(data, np.uint32) == np.arange(16))
+    assert buffer3 is buffer1
+    assert texture2 is texture1
+    assert buffer4 is not buffer1
+    assert buffer2 not in (buffer3, buffer4)
+    assert device.memory_usage == 64 + 64 + 8 * 8 * 4  # buffer2 is destroyed
+
+    # Buffers that are mapped at creation are not recycled
+    with scope:
+        buffer5 = scope.create_buffer(
+            size=64, usage="MAP_WRITE", mapped_at_creation=True
+        )
+        buffer5.unmap()
+        assert scope.objects == [buffer5]
+        assert device.memory_usage == 64 + 64 + 8 * 8 * 4 + 64
+    # buffer5 is destroyed, and so are the pooled resources that were not re-used
+    assert device.memory_usage == 0
+
+    # Closing destroys everything
+    scope.close()
+    assert device.memory_usage == 0
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_resource_scope_untracked():
+    # Objects that are cached internally must survive the scope
+    device = get_fresh_device()
+    texture = device.create_texture(
+        size=(16, 16, 1),
+        format="rgba8unorm",
+        usage="TEXTURE_BINDING|RENDER_ATTACHMENT|COPY_SRC",
+        mip_level_count=3,
+    )
+    managed_buffer = ManagedBuffer(device, size=16)
+
+    with device.resource_scope(release_all=True) as scope:
+        generate_mipmaps(device, texture)
+        managed_buffer.resize(1024)
+        assert managed_buffer.buffer not in scope.objects
+        assert len(scope.objects) > 0
+
+    generate_mipmaps(device, texture)
+    assert managed_buffer.buffer._internal is not None
+
+
+if __name__ == "__main__":
+    run_tests(globals())
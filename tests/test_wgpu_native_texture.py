@@ -281,5 +281,182 @@ def test_write_texture2():
     assert iters_equal(data0, data2)
 
 
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_read_texture_destride():
+    from wgpu.backends.wgpu_native import _helpers
+
+    device = wgpu.utils.get_default_device()
+
+    # A width of 33 texels gives 132 bytes per row, which needs de-striding
+    nx, ny, nz = 33, 7, 3
+    data0 = np.random.randint(0, 255, (nz, ny, nx, 4), np.uint8)
+
+    tex = device.create_texture(
+        size=(nx, ny, nz),
+        format=wgpu.TextureFormat.rgba8unorm,
+        usage=wgpu.TextureUsage.COPY_SRC | wgpu.TextureUsage.COPY_DST,
+    )
+    device.queue.write_texture(
+        {"texture": tex},
+        data0,
+        {"bytes_per_row": nx * 4, "rows_per_image": ny},
+        (nx, ny, nz),
+    )
+
+    for use_numpy in (True, False):
+        ori_numpy = _helpers._numpy
+        if not use_numpy:
+            _helpers._numpy = None
+        try:
+            data1 = device.queue.read_texture(
+                {"texture": tex}, {"bytes_per_row": nx * 4}, (nx, ny, nz)
+            )
+            data2 = device.queue.read_texture(
+                {"texture": tex},
+                {"bytes_per_row": nx * 4, "offset": 10},
+                (nx, ny, nz),
+            )
+        finally:
+            _helpers._numpy = ori_numpy
+
+        assert data1.nbytes == data0.nbytes
+        assert data1.tobytes() == data0.tobytes()
+        assert data2.nbytes == data0.nbytes + 10
+        assert data2.tobytes() == bytes(10) + data0.tobytes()
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_read_texture_as_array():
+    device = wgpu.utils.get_default_device()
+
+    def upload(data, format, size):
+        tex = device.create_texture(
+            size=size,
+            format=format,
+            usage=wgpu.TextureUsage.COPY_SRC | wgpu.TextureUsage.COPY_DST,
+        )
+        device.queue.write_texture(
+            {"texture": tex},
+            data,
+            {"bytes_per_row": data.nbytes // (size[1] * size[2])},
+            size,
+        )
+        return tex
+
+    # Raw rgba8, with a width that needs de-striding
+    data0 = np.random.randint(0, 255, (7, 33, 4), np.uint8)
+    tex = upload(data0, "rgba8unorm", (33, 7, 1))
+    array = device.queue.read_texture({"texture": tex}, {}, (33, 7, 1), as_array=True)
+    assert isinstance(array, np.ndarray)
+    assert array.dtype == np.uint8
+    assert array.shape == (7, 33, 4)
+    assert np.all(array == data0)
+
+    # Convert to float
+    array = device.queue.read_texture(
+        {"texture": tex}, {}, (33, 7, 1), as_array=True, convert="float"
+    )
+    assert array.dtype == np.float32
+    assert np.allclose(array, data0 / 255)
+
+    # A 3D texture gets an extra dimension
+    data0 = np.random.randint(0, 255, (3, 5, 6, 2), np.uint8)
+    tex = upload(data0, "rg8uint", (6, 5, 3))
+    array = device.queue.read_texture({"texture": tex}, {}, (6, 5, 3), as_array=True)
+    assert array.shape == (3, 5, 6, 2)
+    assert np.all(array == data0)
+
+    # The rows_per_image is ignored, because the array has packed images
+    array = device.queue.read_texture(
+        {"texture": tex}, {"rows_per_image": 8}, (6, 5, 3), as_array=True
+    )
+    assert np.all(array == data0)
+    array = device.queue.read_texture(
+        {"texture": tex, "origin": (1, 2, 1)},
+        {"bytes_per_row": 256, "rows_per_image": 16},
+        (5, 3, 2),
+        as_array=True,
+    )
+    assert array.shape == (2, 3, 5, 2)
+    assert np.all(array == data0[1:, 2:, 1:])
+
+    # Multiple layers of a 2D texture, with a multi-byte dtype
+    data0 = np.random.uniform(-10, 10, (4, 3, 7, 1)).astype(np.float32)
+    tex = upload(data0, "r32float", (7, 3, 4))
+    array = device.queue.read_texture(
+        {"texture": tex}, {"rows_per_image": 5}, (7, 3, 4), as_array=True
+    )
+    assert array.dtype == np.float32
+    assert np.all(array == data0)
+
+    # Half float
+    data0 = np.random.uniform(-10, 10, (4, 9, 4)).astype(np.float16)
+    tex = upload(data0, "rgba16float", (9, 4, 1))
+    array = device.queue.read_texture({"texture": tex}, {}, (9, 4, 1), as_array=True)
+    assert array.dtype == np.float16
+    assert np.all(array == data0)
+    array = device.queue.read_texture(
+        {"texture": tex}, {}, (9, 4, 1), as_array=True, convert="float"
+    )
+    assert array.dtype == np.float32
+    assert np.all(array == data0.astype(np.float32))
+
+    # sRGB to linear, alpha is not converted
+    data0 = np.zeros((1, 3, 4), np.uint8)
+    data0[0, :, :] = [[0, 0, 0, 0], [255, 255, 255, 255], [188, 188, 188, 188]]
+    tex = upload(data0, "rgba8unorm-srgb", (3, 1, 1))
+    array = device.queue.read_texture(
+        {"texture": tex}, {}, (3, 1, 1), as_array=True, convert="linear"
+    )
+    assert np.allclose(array[0, 0], [0, 0, 0, 0])
+    assert np.allclose(array[0, 1], [1, 1, 1, 1])
+    assert np.allclose(array[0, 2], [0.5029, 0.5029, 0.5029, 188 / 255], atol=1e-3)
+
+    # Invalid args
+    with raises(ValueError):
+        device.queue.read_texture(
+            {"texture": tex}, {}, (3, 1, 1), as_array=True, convert="foo"
+        )
+    with raises(ValueError):
+        device.queue.read_texture(
+            {"texture": tex}, {"bytes_per_row": 12}, (3, 1, 1), convert="float"
+        )
+
+
+@mark.skipif(not can_use_wgpu_lib, reason="Needs wgpu lib")
+def test_write_texture_strided():
+    device = wgpu.utils.get_default_device()
+
+    def roundtrip(data, size):
+        tex = device.create_texture(
+            size=size,
+            format=wgpu.TextureFormat.rgba8unorm,
+            usage=wgpu.TextureUsage.COPY_SRC | wgpu.TextureUsage.COPY_DST,
+        )
+        device.queue.write_texture(
+            {"texture": tex}, data, {"bytes_per_row": size[0] * 4}, size
+        )
+        return device.queue.read_texture(
+            {"texture": tex}, {}, size, as_array=True
+        ).reshape(data.shape)
+
+    image = np.random.randint(0, 255, (4, 40, 50, 4), np.uint8)
+
+    # Rows at a regular stride: the row stride becomes bytes_per_row
+    data = image[0, 5:25, 10:40]
+    assert not data.flags.c_contiguous
+    assert np.all(roundtrip(data, (30, 20, 1)) == data)
+
+    # Also works for multiple images
+    data = image[1:3, 5:25, 10:40]
+    assert np.all(roundtrip(data, (30, 20, 2)) == data)
+
+    # Irregular strides fall back to a contiguous copy
+    data = image[0, ::2, ::3]
+    assert np.all(roundtrip(data, (17, 20, 1)) == data)
+    data = memoryview(image[0, 5:25, 10:40])  # no array interface
+    assert np.all(roundtrip(data, (30, 20, 1)) == np.asarray(data))
+
+
 if __name__ == "__main__":
     run_tests(globals())
@@ -0,0 +1,175 @@
+import gc
+import threading
+
+import numpy as np
+
+import wgpu.utils
+from wgpu.backends.wgpu_native._api import new_struct_p
+from wgpu.backends.wgpu_native._helpers import StructRefs
+
+from testutils import run_tests, can_use_wgpu_lib
+from pytest import skip
+
+
+if not can_use_wgpu_lib:
+    skip("Skipping tests that need the wgpu lib", allow_module_level=True)
+
+
+SHADER_SOURCE = """
+    @group(0) @binding(0) var<storage, read_write> data: array<u32>;
+
+    @compute @workgroup_size(64)
+    fn main(@builtin(global_invocation_id) index: vec3<u32>) {
+        data[index.x] = data[index.x] * 2u + 1u;
+    }
+"""
+
+
+def run_in_threads(func, n_threads):
+    errors = []
+
+    def target(i):
+        try:
+            func(i)
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+def test_struct_refs():
+    refs = StructRefs(4)
+    structs = [new_struct_p("WGPUExtent3D *", width=i) for i in range(100)]
+    for i, struct in enumerate(structs):
+        refs[struct] = i
+    assert [refs.get(struct) for struct in structs] == list(range(100))
+    assert sum(len(shard) for shard in refs._shards) == 100
+    assert all(len(shard) > 0 for shard in refs._shards)
+    del struct
+
+    # Structs can be set and deleted from any thread
+    def func(i):
+        for struct in structs[i::4]:
+            refs[struct] = -1
+        structs[i::4] = [None] * len(structs[i::4])
+
+    run_in_threads(func, 4)
+    gc.collect()
+    assert sum(len(shard) for shard in refs._shards) == 0
+
+
+def test_done_submission_index_threaded():
+    # The index of the last finished submission is updated from the poll
+    # thread and from the caller's thread. It must never go down.
+    device = wgpu.utils.get_default_device()
+    queue = device.queue
+    n_threads, n_iters = 4, 20
+    observed = []
+    stop = threading.Event()
+
+    def observe():
+        while not stop.is_set():
+            observed.append(queue._done_submission_index)
+
+    observer = threading.Thread(target=observe)
+    observer.start()
+
+    def func(thread_index):
+        for i in range(n_iters):
+            index = queue.submit([device.create_command_encoder().finish()])
+            if i % 2:
+                device.wait_for(index)
+            else:
+                device.wait_for(index, timeout=5)
+            assert device.is_done(index)
+            # Reporting an older index must not move the index back
+            queue._set_done_submission_index(max(1, index - 3))
+            assert device.is_done(index)
+
+    try:
+        run_in_threads(func, n_threads)
+    finally:
+        stop.set()
+        observer.join()
+
+    assert observed == sorted(observed)
+    assert queue._done_submission_index >= queue._last_submission_index
+
+
+def test_create_and_encode_threaded():
+    # Stress test: create objects, encode and submit on multiple threads at once
+    device = wgpu.utils.get_default_device()
+    n_threads, n_iters, n = 8, 20, 64
+
+    counts = wgpu.diagnostics.object_counts.tracker.counts
+    names = "GPUBuffer", "GPUBindGroup", "GPUCommandEncoder", "GPUComputePassEncoder"
+    gc.collect()
+    counts_before = [counts.get(name, 0) for name in names]
+
+    def func(thread_index):
+        shader = device.create_shader_module(code=SHADER_SOURCE)
+        layout = device.create_bind_group_layout(
+            entries=[
+                {"binding": 0, "visibility": "COMPUTE", "buffer": {"type": "storage"}},
+            ]
+        )
+        pipeline = device.create_compute_pipeline(
+            layout=device.create_pipeline_layout(bind_group_layouts=[layout]),
+            compute={"module": shader},
+        )
+        for i in range(n_iters):
+            data = np.full(n, thread_index * 1000 + i, np.uint32)
+            buffer = device.create_buffer_with_data(data=data, usage="STORAGE|COPY_SRC")
+            bind_group = device.create_bind_group(
+                layout=layout, entries=[{"binding": 0, "resource": {"buffer": buffer}}]
+            )
+            encoder = device.create_command_encoder()
+            compute_pass = encoder.begin_compute_pass()
+            compute_pass.set_pipeline(pipeline)
+            compute_pass.set_bind_group(0, bind_group)
+            compute_pass.dispatch_workgroups(1)
+            compute_pass.end()
+            device.queue.submit([encoder.finish()])
+            result = np.frombuffer(device.queue.read_buffer(buffer), np.uint32)
+            assert np.all(result == data * 2 + 1)
+
+    run_in_threads(func, n_threads)
+
+    gc.collect()
+    assert [counts.get(name, 0) for name in names] == counts_before
+
+
+def test_read_present_texture_threaded():
+    # Reading the present texture reuses a copy buffer, which must not be
+    # used by multiple threads at the same time.
+    device = wgpu.utils.get_default_device()
+    size = 64, 64, 1
+    texture = device.create_texture(
+        label="present",
+        size=size,
+        format="rgba8unorm",
+        usage="COPY_SRC|COPY_DST",
+    )
+    data = np.random.randint(0, 255, (64, 64, 4), np.uint8)
+    device.queue.write_texture(
+        {"texture": texture}, data, {"bytes_per_row": 64 * 4}, size
+    )
+
+    def func(i):
+        for _ in range(10):
+            result = device.queue.read_texture(
+                {"texture": texture}, {"bytes_per_row": 64 * 4}, size
+            )
+            assert bytes(result) == data.tobytes()
+
+    run_in_threads(func, 4)
+
+
+if __name__ == "__main__":
+    run_tests(globals())
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import sys
 import time
+import contextlib
 import logging
 import threading
-from typing import Callable, Awaitable, Generator, Generic, TypeVar
+import weakref
+from typing import Callable, Awaitable, Generator, Generic, Iterable, TypeVar
 
 import sniffio
 
@@ -33,6 +35,38 @@ class AsyncEvent:
         return Event()
 
 
+def get_threadsafe_event_setter(event):
+    """Get a function that sets the given async event, and that can be called from any thread.
+
+    Must be called from the thread that runs the event loop. Async events are
+    not thread-safe: setting one from another thread does not wake up the
+    loop. Therefore, from another thread, the event is set via the loop.
+    """
+    libname = sniffio.current_async_library()
+    loop_thread_id = threading.get_ident()
+    if libname == "asyncio":
+        call_soon_threadsafe = (
+            sys.modules["asyncio"].get_running_loop().call_soon_threadsafe
+        )
+    elif libname == "trio":
+        call_soon_threadsafe = (
+            sys.modules["trio"].lowlevel.current_trio_token().run_sync_soon
+        )
+    else:
+        call_soon_threadsafe = None
+
+    def set_event():
+        if call_soon_threadsafe is None or threading.get_ident() == loop_thread_id:
+            event.set()
+        else:
+            try:
+                call_soon_threadsafe(event.set)
+            except RuntimeError:  # the loop is closed
+                event.set()
+
+    return set_event
+
+
 AwaitedType = TypeVar("AwaitedType")
 
 
@@ -46,6 +80,21 @@ class LoopInterface:
         raise NotImplementedError()
 
 
+# The states of a GPUPromise. Ints are faster to compare and assign than strings.
+_PENDING, _PENDING_FULFILLED, _PENDING_REJECTED, _FULFILLED, _REJECTED = range(5)
+_STATE_NAMES = (
+    "pending",
+    "pending-fulfilled",
+    "pending-rejected",
+    "fulfilled",
+    "rejected",
+)
+
+# Used to create the lock of a GPUPromise, and as its lock when only one thread is involved
+_lock_creation_lock = threading.Lock()
+_no_lock = contextlib.nullcontext()
+
+
 def get_backoff_time_generator() -> Generator[float, None, None]:
     """Generates sleep-times, start at 0 then increasing to 100Hz and sticking there."""
     for _ in range(5):
@@ -56,6 +105,160 @@ def get_backoff_time_generator() -> Generator[float, None, None]:
         yield 0.01
 
 
+class PollThread:
+    """A thread that polls (blocking) while promises are being sync-waited for.
+
+    The callbacks invoked during polling resolve the promises, which wake up
+    the waiting threads via a ``threading.Event``. Compared to polling and
+    sleeping in the waiting thread, this avoids the latency of the sleeps.
+    The thread is started when needed, and stops when it has been idle for
+    a while.
+
+    Arguments:
+        poll_wait (callable): A function that polls and blocks until the pending
+            work is done. If this is a bound method, a weak reference is used,
+            so that the thread does not keep the object alive.
+        name (str): The name of the thread.
+    """
+
+    _idle_timeout = 1.0
+
+    def __init__(self, poll_wait: Callable, name: str = "wgpu-poll"):
+        if hasattr(poll_wait, "__self__"):
+            self._poll_wait_ref = weakref.WeakMethod(poll_wait)
+        else:
+            self._poll_wait_ref = lambda: poll_wait
+        self._name = name
+        self._condition = threading.Condition()
+        self._waiting = set()
+        self._thread = None
+
+    def wait(self, promise: GPUPromise) -> None:
+        """Block until the given promise is no longer pending."""
+        event = promise._get_threading_event()
+        with self._condition:
+            self._waiting.add(promise)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        try:
+            event.wait()
+        finally:
+            with self._condition:
+                self._waiting.discard(promise)
+
+    def _run(self):
+        sleep_gen = get_backoff_time_generator()
+        while True:
+            with self._condition:
+                if not self._waiting:
+                    sleep_gen = get_backoff_time_generator()
+                    self._condition.wait(self._idle_timeout)
+                    if not self._waiting:
+                        self._thread = None
+                        return
+            poll_wait = self._poll_wait_ref()
+            if poll_wait is None:
+                with self._condition:
+                    self._thread = None
+                return
+            try:
+                poll_wait()
+            except Exception as err:
+                logger.error(f"Error in {self._name} thread: {err}")
+            del poll_wait
+            # If promises are still pending after a blocking poll, they are waiting
+            # for something other than GPU work. Back off to avoid spinning.
+            with self._condition:
+                pending = any(p._state == _PENDING for p in self._waiting)
+            if pending:
+                time.sleep(next(sleep_gen))
+            else:
+                sleep_gen = get_backoff_time_generator()
+
+
+class PollTask:
+    """An async task that polls while promises are being awaited.
+
+    The task is started in the running event loop when a promise is awaited,
+    and ends when no more promises are being awaited. The poll rate backs off
+    while nothing happens, and increases again when promises resolve.
+    Supported for asyncio and trio. For other async libraries (and when the
+    promise is awaited from another event loop than the one running the
+    task), the awaiting coroutine polls by itself.
+
+    Arguments:
+        poll (callable): A function that polls without blocking. If this is a bound
+            method, a weak reference is used, so that the task does not keep the
+            object alive.
+    """
+
+    def __init__(self, poll: Callable):
+        if hasattr(poll, "__self__"):
+            self._poll_ref = weakref.WeakMethod(poll)
+        else:
+            self._poll_ref = lambda: poll
+        self._waiting = set()
+        self._task = None
+        self._task_loop = None
+
+    async def wait(self, promise: GPUPromise) -> bool:
+        """Wait until the given promise is no longer pending.
+
+        Returns False (without waiting) if the task cannot be used from the current
+        event loop.
+        """
+        libname = sniffio.current_async_library()
+        if libname == "asyncio":
+            loop = sys.modules["asyncio"].get_running_loop()
+        elif libname == "trio":
+            loop = sys.modules["trio"].lowlevel.current_trio_token()
+        else:
+            return False
+        if self._task is None:
+            self._task_loop = loop
+            if libname == "asyncio":
+                self._task = loop.create_task(self._run())
+            else:
+                self._task = sys.modules["trio"].lowlevel.spawn_system_task(self._run)
+        elif self._task_loop is not loop:
+            return False
+
+        event = promise._get_async_event()
+        self._waiting.add(promise)
+        try:
+            await event.wait()
+        finally:
+            self._waiting.discard(promise)
+        return True
+
+    async def _run(self):
+        try:
+            sleep_gen = get_backoff_time_generator()
+            npending = 0
+            while self._waiting:
+                poll = self._poll_ref()
+                if poll is None:
+                    break
+                try:
+                    poll()
+                except Exception as err:
+                    logger.error(f"Error in async poll task: {err}")
+                del poll
+                # Poll faster again when promises resolve
+                npending_prev = npending
+                npending = sum(p._state == _PENDING for p in self._waiting)
+                if npending < npending_prev:
+                    sleep_gen = get_backoff_time_generator()
+                await async_sleep(next(sleep_gen))
+        finally:
+            self._task = None
+            self._task_loop = None
+
+
 class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
     """A GPUPromise represents the eventual result of an asynchronous wgpu operation.
 
@@ -81,6 +284,26 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
     * "rejected": meaning that the operation failed.
     """
 
+    __slots__ = (
+        "__weakref__",
+        "_done_callbacks",
+        "_error_callbacks",
+        "_event",
+        "_event_setter",
+        "_handler",
+        "_keepalive",
+        "_lock",
+        "_loop",
+        "_poll_task",
+        "_poll_thread",
+        "_poller",
+        "_state",
+        "_thread_event",
+        "_thread_id",
+        "_title",
+        "_value",
+    )
+
     # We keep a set of unresolved promises, because whith using .then, noone else holds a ref to the promise
     _UNRESOLVED = set()
 
@@ -91,6 +314,8 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         *,
         loop: LoopInterface | None = None,
         poller: Callable | None = None,
+        poll_thread: PollThread | None = None,
+        poll_task: PollTask | None = None,
         keepalive: object = None,
     ):
         """
@@ -102,6 +327,10 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
                 If not given, this promise does not support .then() or pronise-chaining.
             poller (callable, optional): A function to call on a regular interval to poll internal systems
                (most likely the wgpu backend).
+            poll_thread (PollThread, optional): A thread that polls in the background. If given,
+                ``sync_wait()`` waits for it to resolve the promise, instead of polling and sleeping.
+            poll_task (PollTask, optional): An async task that polls in the background. If given,
+                awaiting the promise waits for it to resolve the promise.
             keepalive (object, optional): Pass any data via this arg who's lifetime must be bound to the
                 resolving of this prommise.
 
@@ -111,18 +340,37 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
 
         self._loop = loop  # Event loop instance, can be None
         self._poller = poller  # call to poll (process events)
+        self._poll_thread = poll_thread  # thread to poll in the background
+        self._poll_task = poll_task  # async task to poll in the background
         self._keepalive = keepalive  # just to keep something alive
 
-        self._state = "pending"  # "pending", "pending-rejected", "pending-fulfilled", "rejected", "fulfilled"
+        self._state = _PENDING  # index into _STATE_NAMES
         self._value = None  # The incoming value, final value, or error
         self._event = None  # AsyncEvent for __await__
-        self._lock = threading.RLock()  # Allow threads to set the value
-        self._done_callbacks = []
-        self._error_callbacks = []
+        self._event_setter = None  # function to set the AsyncEvent from any thread
+        self._thread_event = None  # threading.Event for sync_wait
+        self._lock = None  # Allow threads to set the value, created when needed
+        self._thread_id = threading.get_ident()  # the thread that created the promise
+        self._done_callbacks = None  # lists created when .then() or .catch() is used
+        self._error_callbacks = None
         self._UNRESOLVED.add(self)
 
     def __repr__(self):
-        return f"<GPUPromise '{self._title}' {self._state} at {hex(id(self))}>"
+        return f"<GPUPromise '{self._title}' {_STATE_NAMES[self._state]} at {hex(id(self))}>"
+
+    def _get_lock(self):
+        # Avoid the cost of a lock when only the creating thread is involved.
+        # Note that code that syncs with other threads without the lock (like
+        # setting the events) relies on the order of operations.
+        lock = self._lock
+        if lock is None:
+            if threading.get_ident() == self._thread_id:
+                return _no_lock
+            with _lock_creation_lock:
+                if self._lock is None:
+                    self._lock = threading.RLock()
+                lock = self._lock
+        return lock
 
     def __call__(self, callback):
         # Create new promise that invokes the callback
@@ -149,13 +397,13 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
                 result._chain(self)
             return
 
-        with self._lock:
-            if self._state != "pending":
+        with self._get_lock():
+            if self._state != _PENDING:
                 logger.warning(
-                    f"Ignoring call to GPUPromise._set_input since promise state is {self._state!r}."
+                    f"Ignoring call to GPUPromise._set_input since promise state is {_STATE_NAMES[self._state]!r}."
                 )
                 return
-            self._state = "pending-fulfilled"
+            self._state = _PENDING_FULFILLED
             self._value = result
             self._set_pending_resolved(resolve_now=resolve_now)
 
@@ -167,15 +415,15 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         self._set_error(error, resolve_now=False)
 
     def _set_error(self, error: str | Exception, *, resolve_now=True) -> None:
-        with self._lock:
-            if self._state != "pending":
+        with self._get_lock():
+            if self._state != _PENDING:
                 logger.warning(
-                    f"Ignoring call to GPUPromise._wgpu_set_error since promise state is {self._state!r}."
+                    f"Ignoring call to GPUPromise._wgpu_set_error since promise state is {_STATE_NAMES[self._state]!r}."
                 )
                 return
             if not isinstance(error, Exception):
                 error = Exception(error)
-            self._state = "pending-rejected"
+            self._state = _PENDING_REJECTED
             self._value = error
             self._set_pending_resolved(resolve_now=resolve_now)
 
@@ -187,16 +435,24 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         if resolve_now:
             self._resolve_callback()
         elif self._loop is not None:
-            self._loop.call_soon(self._resolve_callback)
+            # This may be called from another thread, e.g. a PollThread
+            call_soon = getattr(
+                self._loop, "call_soon_threadsafe", self._loop.call_soon
+            )
+            call_soon(self._resolve_callback)
+        # Wake up a thread that is waiting in sync_wait()
+        if self._thread_event is not None:
+            self._thread_event.set()
         # Allow tasks that await this promise to continue. Do this last, since
         # it allows any waiting tasks to continue. These taks are assumed to be
-        # on the 'reference' thread, but *this* may be a different thread.
+        # on the 'reference' thread, but *this* may be a different thread
+        # (e.g. a PollThread), so the event is set via the loop if needed.
         if self._event is not None:
-            self._event.set()
+            self._event_setter()
 
     def _resolve_callback(self):
         # The callback may already be resolved
-        if self._state.startswith("pending-"):
+        if self._state == _PENDING_FULFILLED or self._state == _PENDING_REJECTED:
             self._resolve()
 
     def _resolve(self):
@@ -206,31 +462,38 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         # and after the _wgpu_set_xxx is done, which is a reasonable assumption.
 
         # Finalize the value
-        if self._state == "pending-fulfilled" and self._handler is not None:
+        state = self._state
+        if state == _PENDING_FULFILLED and self._handler is not None:
             try:
                 self._value = self._handler(self._value)
             except Exception as err:
-                self._state = "rejected"
+                state = _PENDING_REJECTED
                 self._value = err
         # Schedule the callbacks
-        if self._state.endswith("rejected"):
-            error = self._value
-            for cb in self._error_callbacks:
-                self._loop.call_soon(cb, error)
-        elif self._state.endswith("fulfilled"):
-            result = self._value
-            for cb in self._done_callbacks:
-                self._loop.call_soon(cb, result)
+        if state == _PENDING_REJECTED or state == _REJECTED:
+            callbacks = self._error_callbacks
+        elif state == _PENDING_FULFILLED or state == _FULFILLED:
+            callbacks = self._done_callbacks
+        else:
+            callbacks = None
+        if callbacks:
+            value = self._value
+            for cb in callbacks:
+                self._loop.call_soon(cb, value)
         # New state
-        self._state = self._state.replace("pending-", "")
+        if state == _PENDING_FULFILLED or state == _PENDING_REJECTED:
+            state += 2  # e.g. pending-fulfilled -> fulfilled
+        self._state = state
         # Clean up
-        self._error_callbacks = []
-        self._done_callbacks = []
+        self._error_callbacks = None
+        self._done_callbacks = None
         self._handler = None
         self._poller = None
+        self._poll_thread = None
+        self._poll_task = None
         self._keepalive = None
         # Resolve to the caller
-        if self._state == "rejected":
+        if state == _REJECTED:
             exception_in_promise = self._value
             raise exception_in_promise  # re-raising
         else:
@@ -246,7 +509,13 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         upcoming JavaScript/Pyodide one), and using it will make your code less
         portable.
         """
-        if self._state == "pending":
+        if self._state == _PENDING and self._poll_thread is not None:
+            # Poll once, and if needed, let the poll thread wake us when the promise resolves
+            if self._poller is not None:
+                self._poller()
+            if self._state == _PENDING:
+                self._poll_thread.wait(self)
+        elif self._state == _PENDING:
             if self._poller is None:
                 raise RuntimeError(
                     "Cannot GPUPromise.sync_wait(), if the polling function is not set."
@@ -255,17 +524,42 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
             # Note that time.sleep is accurate (does not suffer from the inaccuracy issue on Windows).
             sleep_gen = get_backoff_time_generator()
             self._poller()
-            while self._state == "pending":
+            while self._state == _PENDING:
                 time.sleep(next(sleep_gen))
                 self._poller()
 
         return self._resolve()  # returns result if fulfilled or raise error if rejected
 
+    def _get_threading_event(self):
+        # Set the event before checking the state, and _set_pending_resolved() does
+        # the reverse, so that one of the two sets the event.
+        with self._get_lock():
+            if self._thread_event is None:
+                self._thread_event = threading.Event()
+            if self._state != _PENDING:
+                self._thread_event.set()
+            return self._thread_event
+
+    def _get_async_event(self):
+        with self._get_lock():
+            if self._event is None:
+                event = AsyncEvent()
+                # Set the setter first, since _set_pending_resolved() checks the event
+                self._event_setter = get_threadsafe_event_setter(event)
+                self._event = event
+            if self._state != _PENDING:
+                self._event.set()
+            return self._event
+
     def _chain(self, to_promise: GPUPromise):
-        with self._lock:
+        with self._get_lock():
+            if self._done_callbacks is None:
+                self._done_callbacks = []
+            if self._error_callbacks is None:
+                self._error_callbacks = []
             self._done_callbacks.append(to_promise._set_input)
             self._error_callbacks.append(to_promise._set_error)
-            if not self._state.startswith("pending"):
+            if self._state >= _FULFILLED:
                 self._resolve()
 
     def then(
@@ -297,7 +591,12 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
 
         # Create new promise
         new_promise = self.__class__(
-            title, callback, loop=self._loop, poller=self._poller
+            title,
+            callback,
+            loop=self._loop,
+            poller=self._poller,
+            poll_thread=self._poll_thread,
+            poll_task=self._poll_task,
         )
         self._chain(new_promise)
 
@@ -323,13 +622,20 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
 
         # Create new promise
         new_promise = self.__class__(
-            title, callback, loop=self._loop, poller=self._poller
+            title,
+            callback,
+            loop=self._loop,
+            poller=self._poller,
+            poll_thread=self._poll_thread,
+            poll_task=self._poll_task,
         )
 
         # Custom chain
-        with self._lock:
+        with self._get_lock():
+            if self._error_callbacks is None:
+                self._error_callbacks = []
             self._error_callbacks.append(new_promise._set_input)
-            if not self._state.startswith("pending"):
+            if self._state >= _FULFILLED:
                 self._resolve()
 
         return new_promise
@@ -338,31 +644,145 @@ class GPUPromise(Awaitable[AwaitedType], Generic[AwaitedType]):
         if self._loop is None:
             # An async busy loop
             async def awaiter():
-                if self._state == "pending":
+                if self._state == _PENDING:
                     # backoff_time_generator = self._get_backoff_time_generator()
                     if self._poller is None:
                         raise RuntimeError(
                             "Cannot await a GPUPromise if neither the loop nor the poller are set."
                         )
+                    self._poller()
+                    # Let the poll task resolve the promise, if we can
+                    if self._state == _PENDING and self._poll_task is not None:
+                        await self._poll_task.wait(self)
                     # Do small incremental async naps. Other tasks and threads can run.
                     # Note that async sleep, with sleep_time > 0, is inaccurate on Windows.
                     sleep_gen = get_backoff_time_generator()
-                    self._poller()
-                    while self._state == "pending":
+                    while self._state == _PENDING:
                         await async_sleep(next(sleep_gen))
                         self._poller()
                 return self._resolve()
 
         else:
             # Using a signal
-            with self._lock:
-                if self._event is None:
-                    self._event = AsyncEvent()
-                    if self._state != "pending":
-                        self._event.set()
+            self._get_async_event()
 
             async def awaiter():
+                # Nobody may be polling for us, so let the poll task do that, if we can
+                if self._state == _PENDING and self._poll_task is not None:
+                    await self._poll_task.wait(self)
                 await self._event.wait()
                 return self._resolve()
 
         return (yield from awaiter().__await__())
+
+
+def _get_poll_all_function(promises: list[GPUPromise]) -> Callable:
+    """Get a function that polls each poller of the pending promises once."""
+
+    def poll_all():
+        # Pollers are grouped, so e.g. each device is polled only once. Bound
+        # methods of the same object compare equal.
+        pollers = {}
+        for promise in promises:
+            poller = promise._poller
+            if promise._state == _PENDING and poller is not None:
+                pollers[poller] = None
+        for poller in pollers:
+            poller()
+
+    return poll_all
+
+
+def _check_pollers(promises: list[GPUPromise]) -> None:
+    for promise in promises:
+        if promise._state == _PENDING and promise._poller is None:
+            raise RuntimeError(
+                f"Cannot wait for {promise!r}, if its polling function is not set."
+            )
+
+
+def wait_all(promises: Iterable[GPUPromise], timeout: float | None = None) -> list:
+    """Synchronously wait for multiple promises to resolve, and return their results.
+
+    Instead of waiting for each promise in turn, the pollers of the pending
+    promises (e.g. the devices) are each polled once per iteration, so that the
+    total wait time approaches that of the slowest promise. If one of the promises
+    is rejected, its error is raised. If ``timeout`` (in seconds) is given and
+    expires, a ``TimeoutError`` is raised.
+
+    Like ``GPUPromise.sync_wait()``, this makes code less portable.
+    """
+    promises = list(promises)
+    _check_pollers(promises)
+    poll_all = _get_poll_all_function(promises)
+    deadline = None if timeout is None else time.perf_counter() + timeout
+
+    # Do small incremental sync naps, like GPUPromise.sync_wait(). The backoff
+    # is reset when promises resolve, since the remaining ones may follow soon.
+    sleep_gen = get_backoff_time_generator()
+    poll_all()
+    npending = len(promises)
+    while True:
+        npending_prev = npending
+        npending = sum(promise._state == _PENDING for promise in promises)
+        if not npending:
+            break
+        elif npending < npending_prev:
+            sleep_gen = get_backoff_time_generator()
+            for _ in range(5):
+                next(sleep_gen)  # skip the initial zero naps
+        sleep_time = next(sleep_gen)
+        if deadline is not None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f"Waiting for {len(promises)} promises timed out after {timeout} s."
+                )
+            sleep_time = min(sleep_time, remaining)
+        time.sleep(sleep_time)
+        poll_all()
+
+    return [promise._resolve() for promise in promises]
+
+
+def gather(*promises: GPUPromise) -> GPUPromise[list]:
+    """Combine multiple promises into a single promise that resolves to a list of their results.
+
+    The returned promise can be awaited, or waited for with ``sync_wait()``.
+    It uses the loop of the first promise that has one, so that ``then()``
+    can be used if the given promises support it. While waiting, the pollers of the pending promises (e.g. the devices) are
+    each polled once per iteration. If one of the promises is rejected, the
+    returned promise is rejected with that error.
+    """
+    promise_class = type(promises[0]) if promises else GPUPromise
+    loop = next((p._loop for p in promises if p._loop is not None), None)
+
+    def handler(promises):
+        return [promise._resolve() for promise in promises]
+
+    def check_done(*args):
+        if gathered._state == _PENDING and not any(
+            promise._state == _PENDING for promise in promises
+        ):
+            gathered._set_input(promises, resolve_now=False)
+
+    def poller():
+        poll_all()
+        check_done()
+
+    poll_all = _get_poll_all_function(promises)
+    gathered = promise_class("gather", handler, loop=loop, poller=poller)
+    # With a loop, the promise can be awaited without being polled, so it
+    # must also resolve when the promises resolve by themselves.
+    for promise in promises:
+        if promise._loop is not None:
+            with promise._get_lock():
+                if promise._state == _PENDING:
+                    if promise._done_callbacks is None:
+                        promise._done_callbacks = []
+                    if promise._error_callbacks is None:
+                        promise._error_callbacks = []
+                    promise._done_callbacks.append(check_done)
+                    promise._error_callbacks.append(check_done)
+    poller()
+    return gathered
@@ -11,12 +11,15 @@ information.
 # Allow using class names in type annotations, without Ruff triggering F821
 from __future__ import annotations
 
+import time
 import logging
-from typing import Sequence
+from collections import deque
+from typing import Callable, ContextManager, Sequence
 
 from ._async import GPUPromise as BaseGPUPromise, LoopInterface
 from ._coreutils import ApiDiff, str_flag_to_int, ArrayLike, CanvasLike
-from ._diagnostics import diagnostics, texture_format_to_bpp
+from ._diagnostics import diagnostics, texture_format_to_bpp, MemoryTracker
+from ._resource_scope import ResourceScope, untracked
 from . import flags, enums, structs
 
 
@@ -229,7 +232,7 @@ gpu = GPU()
 
 @apidiff.add("Added for async support")
 class GPUPromise(BaseGPUPromise):
-    pass
+    __slots__ = ()
 
 
 class GPUCanvasContext:
@@ -266,6 +269,11 @@ class GPUCanvasContext:
         # The last used texture
         self._texture = None
 
+        # The submission indices of the presented frames that may be in flight,
+        # and the time waited for these in the last get_current_texture().
+        self._frames_in_flight = deque()
+        self._frame_wait_time = 0.0
+
     # IDL: readonly attribute (HTMLCanvasElement or OffscreenCanvas) canvas;
     @apidiff.hide("No unified concept of a canvas in Python, and avoid circular refs")
     @property
@@ -319,6 +327,7 @@ class GPUCanvasContext:
         return self._config
 
     # IDL: undefined configure(GPUCanvasConfiguration configuration); -> required GPUDevice device, required GPUTextureFormat format, GPUTextureUsageFlags usage = 0x10, sequence<GPUTextureFormat> viewFormats = [], PredefinedColorSpace colorSpace = "srgb", GPUCanvasToneMapping toneMapping = {}, GPUCanvasAlphaMode alphaMode = "opaque"
+    @apidiff.change("Support limiting the number of frames in flight")
     def configure(
         self,
         *,
@@ -329,6 +338,7 @@ class GPUCanvasContext:
         color_space: str = "srgb",
         tone_mapping: structs.CanvasToneMappingStruct | None = None,
         alpha_mode: enums.CanvasAlphaModeEnum = "opaque",
+        max_frames_in_flight: int | None = None,
     ) -> None:
         """Configures the presentation context for the associated canvas.
 
@@ -350,6 +360,12 @@ class GPUCanvasContext:
             alpha_mode (structs.CanvasAlphaMode): Determines the effect that alpha values
                 will have on the content of textures returned by ``get_current_texture()``
                 when read, displayed, or used as an image source. Default "opaque".
+            max_frames_in_flight (int, None): The maximum number of presented frames
+                that the GPU may still be working on. If set, ``get_current_texture()``
+                waits until the GPU has finished an earlier frame, which reduces
+                latency (and memory usage) when the CPU is faster than the GPU.
+                The value is also passed to the surface as the desired maximum
+                frame latency. Default None (no limit).
         """
         # Check types
         tone_mapping = {} if tone_mapping is None else tone_mapping
@@ -365,6 +381,11 @@ class GPUCanvasContext:
         if not isinstance(usage, int):
             usage = str_flag_to_int(flags.TextureUsage, usage)
 
+        if max_frames_in_flight is not None:
+            max_frames_in_flight = int(max_frames_in_flight)
+            if max_frames_in_flight < 1:
+                raise ValueError("Configure: max_frames_in_flight must be at least 1.")
+
         color_space  # noqa - not really supported, just assume srgb for now
         tone_mapping  # noqa - not supported yet
 
@@ -411,6 +432,7 @@ class GPUCanvasContext:
             "color_space": color_space,
             "tone_mapping": tone_mapping,
             "alpha_mode": alpha_mode,
+            "max_frames_in_flight": max_frames_in_flight,
         }
 
         self._configure_screen(**self._config)
@@ -425,6 +447,7 @@ class GPUCanvasContext:
         color_space,
         tone_mapping,
         alpha_mode,
+        max_frames_in_flight,
     ):
         raise NotImplementedError()
 
@@ -435,6 +458,7 @@ class GPUCanvasContext:
         """
         self._config = None
         self._drop_texture()
+        self._frames_in_flight.clear()
         self._unconfigure_screen()
 
     def _unconfigure_screen(self):
@@ -448,10 +472,32 @@ class GPUCanvasContext:
                 "Canvas context must be configured before calling get_current_texture()."
             )
         if self._texture is None:
-            self._texture = self._create_texture_screen()
+            self._wait_for_frames_in_flight()
+            with untracked(self._config["device"]):
+                self._texture = self._create_texture_screen()
 
         return self._texture
 
+    def _wait_for_frames_in_flight(self):
+        max_frames_in_flight = self._config["max_frames_in_flight"]
+        frames = self._frames_in_flight
+        if not max_frames_in_flight or len(frames) < max_frames_in_flight:
+            self._frame_wait_time = 0.0
+            return
+        device = self._config["device"]
+        t0 = time.perf_counter()
+        while len(frames) >= max_frames_in_flight:
+            device.wait_for(frames.popleft())
+        self._frame_wait_time = time.perf_counter() - t0
+
+    @apidiff.add("Allows tuning the number of frames in flight")
+    @property
+    def frame_wait_time(self) -> float:
+        """The time (in seconds) that the last ``get_current_texture()`` waited for
+        earlier frames to finish, as limited by ``max_frames_in_flight``.
+        """
+        return self._frame_wait_time
+
     def _create_texture_screen(self):
         raise NotImplementedError()
 
@@ -466,6 +512,9 @@ class GPUCanvasContext:
         if self._texture:
             self._present_screen()
             self._drop_texture()
+            if self._config and self._config["max_frames_in_flight"]:
+                queue = self._config["device"].queue
+                self._frames_in_flight.append(queue._last_submission_index)
 
     def _present_screen(self):
         raise NotImplementedError()
@@ -638,14 +687,28 @@ class GPUObjectBase:
     """
 
     _ot = object_tracker
+    _ot_slot = None
     _nbytes = 0
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Look up the counter once per class, to keep __init__ and __del__ fast
+        if not cls.__name__.endswith("Base"):
+            cls._ot_slot = cls._ot.get_slot(cls.__name__)
+
     def __init__(self, label, internal, device):
-        self._ot.increase(self.__class__.__name__, self._nbytes)
+        self._ot.increase_slot(self._ot_slot, self._nbytes)
         self._label = label
         self._internal = internal  # The native/raw/real GPU object
         self._device = device
-        logger.info(f"Creating {self.__class__.__name__} {label}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Creating %s %s", self.__class__.__name__, label)
+        if self._nbytes and device is not None:
+            device._memory.increase(self, self._nbytes)
+        if device is not None and device._active_resource_scopes:
+            scope_stack = getattr(device._resource_scope_local, "stack", None)
+            if scope_stack and scope_stack[-1] is not None:
+                scope_stack[-1]._track(self)
 
     # IDL: attribute USVString label;
     @property
@@ -664,7 +727,9 @@ class GPUObjectBase:
         pass
 
     def __del__(self):
-        self._ot.decrease(self.__class__.__name__, self._nbytes)
+        self._ot.decrease_slot(self._ot_slot, self._nbytes)
+        if self._nbytes and self._device is not None:
+            self._device._memory.decrease(self)
         self._release()
 
     # Public destroy() methods are implemented on classes as the WebGPU spec specifies.
@@ -683,7 +748,13 @@ class GPUDevice(GPUObjectBase):
     `GPUAdapter.request_device_async()`.
     """
 
+    _resource_scope_local = None
+    _active_resource_scopes = (
+        0  # in all threads; if 0, object creation skips the lookup
+    )
+
     def __init__(self, label, internal, adapter, features, limits, queue):
+        self._memory = MemoryTracker()
         super().__init__(label, internal, self)
 
         assert isinstance(adapter, GPUAdapter)
@@ -727,6 +798,124 @@ class GPUDevice(GPUObjectBase):
         """The adapter object corresponding to this device."""
         return self._adapter
 
+    @apidiff.add("Memory accounting helps prevent running out of GPU memory")
+    @property
+    def memory_usage(self) -> int:
+        """The (estimated) number of bytes used by the buffers and textures of this device.
+
+        Destroyed resources are not counted.
+        """
+        return self._memory.usage
+
+    @apidiff.add("Memory accounting helps prevent running out of GPU memory")
+    def set_memory_budget(self, budget: int | None) -> None:
+        """Set a soft memory budget (in bytes) for this device.
+
+        When creating a buffer or texture causes the `memory_usage` to exceed
+        the budget, resources that are registered with `register_evictable()`
+        are destroyed, least recently used first, until the usage is within
+        budget again. Resources that are not evictable are never destroyed,
+        so the budget can still be exceeded. Use None to disable the budget
+        (the default).
+        """
+        self._memory.budget = None if budget is None else int(budget)
+        self._memory.enforce_budget()
+
+    @apidiff.add("Memory accounting helps prevent running out of GPU memory")
+    def register_evictable(
+        self, resource: GPUBuffer | GPUTexture, callback: Callable | None = None
+    ) -> None:
+        """Register a buffer or texture as evictable, and mark it as most recently used.
+
+        When the memory budget is exceeded, the resource may be destroyed. If a
+        callback is given, it is called with the resource right before it is
+        destroyed, e.g. to drop references to it and schedule its re-creation.
+        """
+        self._memory.register_evictable(resource, callback)
+
+    @apidiff.add("Memory accounting helps prevent running out of GPU memory")
+    def unregister_evictable(self, resource: GPUBuffer | GPUTexture) -> None:
+        """Unregister a buffer or texture as evictable."""
+        self._memory.unregister_evictable(resource)
+
+    @apidiff.add("Memory accounting helps prevent running out of GPU memory")
+    def mark_used(self, resource: GPUBuffer | GPUTexture) -> None:
+        """Mark an evictable buffer or texture as most recently used.
+
+        Call this e.g. each time that the resource is used in a draw, to
+        make it less likely to be evicted.
+        """
+        self._memory.mark_used(resource)
+
+    @apidiff.add("Destroying transient objects in bulk keeps memory usage flat")
+    def resource_scope(
+        self, *, recycle: bool = False, release_all: bool = False
+    ) -> ResourceScope:
+        """Create a scope that tracks the resources created with this device.
+
+        The scope is used as a context manager. The buffers, textures and query
+        sets that are created with this device inside the ``with`` block (in
+        the same thread) are tracked, and destroyed at the end of the block,
+        so their memory is freed without waiting for the garbage collector.
+        This is useful for transient per-frame resources. Resources that must
+        survive the block can be passed to ``scope.keep(ob)``. Scopes can be nested.
+
+        Other objects (views, bind groups, pipelines, etc.) are not affected,
+        unless ``release_all`` is True. Then all objects created in the block
+        are tracked, and their native objects are released at the end of the
+        block. Only use this if no code in the block creates objects that are
+        used afterwards (e.g. cached pipelines), because using a released
+        object is an error.
+
+        .. code-block:: py
+
+            scope = device.resource_scope(recycle=True)
+
+            def draw_frame():
+                with scope:
+                    buffer = scope.create_buffer(size=1024, usage="UNIFORM|COPY_DST")
+                    bind_group = device.create_bind_group(...)
+                    ...
+                    device.queue.submit([encoder.finish()])
+
+        The scope can be re-used (e.g. every frame). If ``recycle`` is True,
+        the buffers and textures created via ``scope.create_buffer()`` and
+        ``scope.create_texture()`` are not destroyed at the end of the block,
+        but re-used when the same arguments are passed in the next use of the
+        scope (arena-style). Resources that were not re-used are destroyed
+        then. Call ``scope.close()`` to destroy all of them.
+
+        Resources must not be used after their scope has ended.
+        """
+        return ResourceScope(self, recycle=recycle, release_all=release_all)
+
+    @apidiff.add("Allows waiting for specific work, instead of all work")
+    def wait_for(self, submission_index: int, timeout: float | None = None) -> bool:
+        """Wait until the work of the given submission is done.
+
+        Arguments:
+            submission_index (int): The index returned by `GPUQueue.submit()`.
+            timeout (float, None): The maximum time to wait, in seconds. If None
+                (default), waits until the work is done.
+
+        Returns True if the work is done, and False if the timeout has passed.
+        Unlike ``queue.on_submitted_work_done_sync()``, this does not wait for
+        work that was submitted later. Raises ``ValueError`` if the index was
+        not returned by ``queue.submit()``.
+        """
+        raise NotImplementedError()
+
+    @apidiff.add("Allows waiting for specific work, instead of all work")
+    def is_done(self, submission_index: int) -> bool:
+        """Get whether the work of the given submission is done, without blocking.
+
+        Arguments:
+            submission_index (int): The index returned by `GPUQueue.submit()`.
+
+        Raises ``ValueError`` if the index was not returned by ``queue.submit()``.
+        """
+        raise NotImplementedError()
+
     # IDL: readonly attribute Promise<GPUDeviceLostInfo> lost;
     @apidiff.hide("Not a Pythonic API")
     @property
@@ -1451,6 +1640,49 @@ class GPUBuffer(GPUObjectBase):
         """
         raise NotImplementedError()
 
+    @apidiff.add("Replacement for get_mapped_range")
+    def mapped_view(
+        self,
+        buffer_offset: int | None = None,
+        size: int | None = None,
+        *,
+        format: str = "B",
+        as_array: bool = False,
+    ) -> ContextManager[ArrayLike]:
+        """Context manager to get a view on the mapped buffer data, without copying.
+
+        This method must only be called when the buffer is in a mapped state.
+        The view is writable if the buffer is mapped in write mode, and readonly
+        otherwise. The memoryview is released when the ``with`` block exits.
+        Numpy arrays cannot be released, so arrays (and any other views derived
+        from the view) must be deleted before the buffer is unmapped or destroyed.
+        To prevent access to invalid memory, ``unmap()`` and ``destroy()`` raise
+        an error if they are still alive, and the views keep the buffer alive.
+
+        .. code-block:: py
+
+            buffer.map_sync("WRITE")
+            with buffer.mapped_view(format="f", as_array=True) as array:
+                array[:] = np.linspace(0, 1, len(array))
+            del array
+            buffer.unmap()
+
+        Arguments:
+            buffer_offset (int, None): the buffer offset in bytes. Must be at
+                least as large as the offset specified in ``map()``. The default
+                is the offset of the mapped range.
+            size (int, None): the size of the view (in bytes). The resulting range
+                must fit into the range specified in ``map()``. The default is as
+                large as the mapped range allows.
+            format (str): the memoryview format to cast the view to, e.g. "f" for
+                float32. Default "B".
+            as_array (bool): whether to yield a numpy array instead of a memoryview.
+                Default False.
+
+        Alignment: the buffer offset must be a multiple of 8, the size must be a multiple of 4.
+        """
+        raise NotImplementedError()
+
     # IDL: ArrayBuffer getMappedRange(optional GPUSize64 offset = 0, optional GPUSize64 size);
     @apidiff.hide
     def get_mapped_range(self, offset: int = 0, size: int | None = None) -> ArrayLike:
@@ -2273,12 +2505,19 @@ class GPUQueue(GPUObjectBase):
     You can obtain a queue object via the :attr:`GPUDevice.queue` property.
     """
 
+    # The index of the last submission, set by the backend in submit()
+    _last_submission_index = 0
+
     # IDL: undefined submit(sequence<GPUCommandBuffer> commandBuffers);
-    def submit(self, command_buffers: Sequence[GPUCommandBuffer] | None = None) -> None:
+    @apidiff.change("Returns a submission index")
+    def submit(self, command_buffers: Sequence[GPUCommandBuffer] | None = None) -> int:
         """Submit a `GPUCommandBuffer` to the queue.
 
         Arguments:
             command_buffers (list): The `GPUCommandBuffer` objects to add.
+
+        Returns a submission index (int), that can be passed to
+        `GPUDevice.wait_for()` and `GPUDevice.is_done()`.
         """
         raise NotImplementedError()
 
@@ -2301,7 +2540,7 @@ class GPUQueue(GPUObjectBase):
             buffer_offset (int): The offset in the buffer to start writing at.
             data: The data to write to the buffer. Must be an object that supports
                 the buffer protocol, e.g. bytes, memoryview, numpy array, etc.
-                Must be contiguous.
+                Non-contiguous data is gathered in chunks of limited size.
             data_offset: The offset in the data, in elements. Default 0.
             size: The number of bytes to write. Default all minus offset.
 
@@ -2315,6 +2554,27 @@ class GPUQueue(GPUObjectBase):
         """
         raise NotImplementedError()
 
+    @apidiff.add("To reduce the overhead of many small uploads")
+    def write_buffers(self, items: Sequence, data: ArrayLike | None = None) -> None:
+        """Schedule multiple write operations, like calling `write_buffer()` for each item.
+
+        Arguments:
+            items: A sequence of ``(buffer, buffer_offset, data)`` tuples. If ``data``
+                is given, the items are ``(buffer, buffer_offset, data_offset, size)``
+                tuples instead, with the offset and size in bytes. A numpy structured
+                array or any other iterable of such tuples is also accepted.
+            data: An optional packed blob that contains the data for all items.
+                Must be an object that supports the buffer protocol, and be contiguous.
+
+        All items are validated before any data is written. Consecutive items
+        that write to adjacent ranges of the same buffer are coalesced into a
+        single write. When ``data`` is given this does not involve a copy;
+        otherwise the data of the coalesced items is concatenated first.
+
+        Alignment: each buffer offset must be a multiple of 4, the size of each write must be a multiple of 4 bytes.
+        """
+        raise NotImplementedError()
+
     @apidiff.add("For symmetry with queue.write_buffer")
     def read_buffer(
         self, buffer: GPUBuffer, buffer_offset: int = 0, size: int | None = None
@@ -2352,19 +2612,29 @@ class GPUQueue(GPUObjectBase):
                 "origin" (a 3-tuple), "mip_level" (an int, default 0).
             data: The data to write to the texture. Must be an object that supports
                 the buffer protocol, e.g. bytes, memoryview, numpy array, etc.
-                Must be contiguous.
             data_layout: A dict with fields: "offset" (an int, default 0),
                 "bytes_per_row" (an int), "rows_per_image" (an int, default 0).
             size: A 3-tuple of ints specifying the size to write.
 
         Unlike `GPUCommandEncoder.copyBufferToTexture()`, there is
         no alignment requirement on `bytes_per_row`.
+
+        The data does not have to be contiguous. If it consists of contiguous
+        rows (of ``bytes_per_row`` bytes) at a regular stride, like a
+        sliced numpy array, the rows are copied directly from the data.
+        Otherwise a contiguous copy is made first.
         """
         raise NotImplementedError()
 
     @apidiff.add("For symmetry, and to help work around the bytes_per_row constraint")
     def read_texture(
-        self, source: dict, data_layout: dict, size: tuple[int, int, int]
+        self,
+        source: dict,
+        data_layout: dict,
+        size: tuple[int, int, int],
+        *,
+        as_array: bool = False,
+        convert: str | None = None,
     ) -> ArrayLike:
         """Reads the contents of the texture and return them as a memoryview.
 
@@ -2374,12 +2644,23 @@ class GPUQueue(GPUObjectBase):
             data_layout: A dict with fields: "offset" (an int, default 0),
                 "bytes_per_row" (an int), "rows_per_image" (an int, default 0).
             size: A 3-tuple of ints specifying the size to write.
+            as_array (bool): If True, return a numpy array instead, with shape
+                (height, width, channels), or (depth, height, width, channels) if
+                ``size[2] > 1``. The dtype is derived from the texture format.
+                Packed formats are returned as uint32. The ``offset``,
+                ``bytes_per_row`` and ``rows_per_image`` in ``data_layout`` are
+                ignored. Default False.
+            convert (str | None): Only used when ``as_array`` is True. If "float",
+                the data is converted to float32, and normalized formats are
+                mapped to [0, 1] (unorm) or [-1, 1] (snorm). With "linear",
+                sRGB formats are also converted to linear color. The
+                conversion is done in a single pass over the mapped data.
 
         Unlike `GPUCommandEncoder.copyBufferToTexture()`, there is
-        no alignment requirement on `bytes_per_row`, although in the
-        current implementation there will be a performance penalty if
-        ``bytes_per_row`` is not a multiple of 256 (because we'll be
-        copying data row-by-row in Python).
+        no alignment requirement on `bytes_per_row`. If ``bytes_per_row``
+        is not a multiple of 256, the data must be de-strided, which
+        involves an extra copy. This copy is vectorized if numpy is
+        available, and done row-by-row in Python otherwise.
         """
         raise NotImplementedError()
 
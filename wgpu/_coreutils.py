@@ -172,7 +172,7 @@ class BaseEnum(metaclass=EnumType):
         raise RuntimeError("Cannot instantiate an enum.")
 
 
-_flag_cache = {}  # str -> int
+_flag_cache = {}  # str -> int, thread-safe, a race only means computing a value twice
 
 
 def str_flag_to_int(flag, s):
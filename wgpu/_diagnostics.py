@@ -4,7 +4,15 @@ Logic related to providing diagnostic info on wgpu.
 
 import os
 import sys
+import logging
+import weakref
 import platform
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+logger = logging.getLogger("wgpu")
 
 
 class DiagnosticsRoot:
@@ -122,23 +130,176 @@ class DiagnosticsBase:
 
 
 class ObjectTracker:
-    """Little object to help track object counts."""
+    """Little object to help track object counts.
+
+    Objects can be created (and deleted) from multiple threads, so the counts
+    are updated under a lock. It's reentrant, because ``decrease()`` is called
+    from ``__del__``, which may be invoked by the gc while the lock is held.
+
+    Each name gets a slot in a list of counters. Hot code paths obtain the
+    slot once, and use ``increase_slot()`` and ``decrease_slot()``, avoiding
+    lookups by name. The ``counts`` attribute is a live dict-like view.
+    """
 
     def __init__(self):
-        self.counts = {}
+        self._lock = threading.RLock()
+        self._slots = {}  # name -> index
+        self._names = []
+        self._counts = []
+        self.counts = ObjectCounts(self)
         self.amounts = {}
 
+    def get_slot(self, name):
+        """Get the slot index for the given name, creating it if needed."""
+        slot = self._slots.get(name)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.get(name)
+                if slot is None:
+                    slot = len(self._names)
+                    self._names.append(name)
+                    self._counts.append(0)
+                    self._slots[name] = slot
+        return slot
+
     def increase(self, name, amount=0):
         """Bump the counter."""
-        self.counts[name] = self.counts.get(name, 0) + 1
-        if amount:
-            self.amounts[name] = self.amounts.get(name, 0) + amount
+        self.increase_slot(self.get_slot(name), amount)
 
     def decrease(self, name, amount=0):
         """Bump the counter back."""
-        self.counts[name] -= 1
-        if amount:
-            self.amounts[name] -= amount
+        self.decrease_slot(self.get_slot(name), amount)
+
+    def increase_slot(self, slot, amount=0):
+        """Bump the counter at the given slot."""
+        with self._lock:
+            self._counts[slot] += 1
+            if amount:
+                name = self._names[slot]
+                self.amounts[name] = self.amounts.get(name, 0) + amount
+
+    def decrease_slot(self, slot, amount=0):
+        """Bump the counter at the given slot back."""
+        with self._lock:
+            self._counts[slot] -= 1
+            if amount:
+                self.amounts[self._names[slot]] -= amount
+
+
+class ObjectCounts(MutableMapping):
+    """A live dict-like view of the counts of an ObjectTracker."""
+
+    def __init__(self, tracker):
+        self._tracker = tracker
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __getitem__(self, name):
+        tracker = self._tracker
+        return tracker._counts[tracker._slots[name]]
+
+    def __setitem__(self, name, value):
+        tracker = self._tracker
+        slot = tracker.get_slot(name)
+        with tracker._lock:
+            tracker._counts[slot] = value
+
+    def __delitem__(self, name):
+        raise TypeError("Object counts cannot be deleted.")
+
+    def __iter__(self):
+        return iter(list(self._tracker._names))
+
+    def __len__(self):
+        return len(self._tracker._names)
+
+
+class MemoryTracker:
+    """Object to track the memory of the resources of a device.
+
+    Supports a soft budget: when the memory usage exceeds the budget,
+    resources that are registered as evictable are destroyed, least
+    recently used first.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()  # reentrant, see ObjectTracker
+        self._nbytes_per_resource = {}  # id -> nbytes
+        self._evictable = OrderedDict()  # id -> (weakref, callback), in LRU order
+        self.usage = 0
+        self.budget = None
+
+    def increase(self, resource, nbytes):
+        """Start tracking the memory of the given resource."""
+        key = id(resource)
+        with self._lock:
+            if key not in self._nbytes_per_resource:
+                self._nbytes_per_resource[key] = nbytes
+                self.usage += nbytes
+
+    def decrease(self, resource):
+        """Stop tracking the given resource. Safe to call multiple times."""
+        key = id(resource)
+        with self._lock:
+            self.usage -= self._nbytes_per_resource.pop(key, 0)
+            self._evictable.pop(key, None)
+
+    def register_evictable(self, resource, callback=None):
+        """Register the resource as evictable, marking it as most recently used."""
+        key = id(resource)
+        with self._lock:
+            if key in self._nbytes_per_resource:
+                self._evictable[key] = weakref.ref(resource), callback
+                self._evictable.move_to_end(key)
+
+    def unregister_evictable(self, resource):
+        """Unregister the resource as evictable."""
+        with self._lock:
+            self._evictable.pop(id(resource), None)
+
+    def mark_used(self, resource):
+        """Mark the resource as most recently used."""
+        with self._lock:
+            try:
+                self._evictable.move_to_end(id(resource))
+            except KeyError:
+                pass
+
+    def enforce_budget(self, exclude=None):
+        """Evict resources until the usage is within the budget. Returns
+        the number of evicted resources.
+        """
+        if self.budget is None or self.usage <= self.budget:
+            return 0
+        # Select the victims, least recently used first
+        victims = []
+        with self._lock:
+            usage = self.usage
+            for key, (ref, callback) in list(self._evictable.items()):
+                if usage <= self.budget:
+                    break
+                resource = ref()
+                if resource is None or resource is exclude:
+                    continue
+                del self._evictable[key]
+                usage -= self._nbytes_per_resource.get(key, 0)
+                victims.append((resource, callback))
+        # Evict them, outside of the lock, because the callbacks may call into us
+        count = 0
+        for resource, callback in victims:
+            try:
+                if callback is not None:
+                    callback(resource)
+                resource.destroy()
+            except Exception as err:
+                # Keep it evictable, so it can be evicted later
+                logger.error(f"Could not evict {resource}: {err}")
+                self.register_evictable(resource, callback)
+            else:
+                self.decrease(resource)
+                count += 1
+        return count
 
 
 def derive_header(dct):
@@ -0,0 +1,192 @@
+"""
+Resource scopes, to destroy transient GPU objects in bulk.
+"""
+
+import threading
+import contextlib
+
+from ._coreutils import str_flag_to_int
+from . import flags
+
+
+_lock = threading.Lock()
+
+
+def _get_scope_stack(device):
+    # Get the stack of active scopes for the device in the current thread
+    local = device._resource_scope_local
+    if local is None:
+        with _lock:
+            local = device._resource_scope_local
+            if local is None:
+                local = device._resource_scope_local = threading.local()
+    try:
+        return local.stack
+    except AttributeError:
+        local.stack = []
+        return local.stack
+
+
+@contextlib.contextmanager
+def untracked(device):
+    """Context manager to create objects that are not tracked by an active scope.
+
+    Used internally for objects that are cached or that outlive a frame.
+    """
+    if getattr(device, "_resource_scope_local", None) is None:
+        yield
+        return
+    stack = _get_scope_stack(device)
+    stack.append(None)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+def _to_key(kind, kwargs):
+    # Turn the arguments for create_buffer / create_texture into a hashable key
+    items = [kind]
+    for name, value in sorted(kwargs.items()):
+        if name == "label":
+            continue
+        elif name == "usage" and isinstance(value, str):
+            flag = flags.BufferUsage if kind == "buffer" else flags.TextureUsage
+            value = str_flag_to_int(flag, value)
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        elif isinstance(value, list):
+            value = tuple(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+class ResourceScope:
+    """Tracks the resources created in a ``with`` block, to destroy them in bulk.
+
+    Use `GPUDevice.resource_scope()` to create a scope. See its docs for details.
+    """
+
+    def __init__(self, device, *, recycle=False, release_all=False):
+        self._device = device
+        self._recycle = bool(recycle)
+        self._release_all = bool(release_all)
+        self._objects = []  # all objects created in the scope
+        self._recycled = []  # (key, resource) created via the scope, to recycle
+        self._pool = {}  # key -> list of resources, available for re-use
+        self._active = False
+
+    def __repr__(self):
+        return f"<ResourceScope with {len(self._objects)} objects at {hex(id(self))}>"
+
+    def __enter__(self):
+        if self._active:
+            raise RuntimeError("ResourceScope is already active.")
+        self._active = True
+        _get_scope_stack(self._device).append(self)
+        with _lock:
+            self._device._active_resource_scopes += 1
+        return self
+
+    def __exit__(self, type, value, tb):
+        stack = _get_scope_stack(self._device)
+        if stack and stack[-1] is self:
+            stack.pop()
+        elif self in stack:
+            stack.remove(self)
+        self._active = False
+        with _lock:
+            self._device._active_resource_scopes -= 1
+        self.close(_keep_pool=True)
+
+    def _track(self, ob):
+        # Only the resources that can be destroyed are tracked, unless the
+        # scope releases all objects.
+        if self._release_all or (
+            getattr(ob, "destroy", None) is not None and ob is not self._device
+        ):
+            self._objects.append(ob)
+
+    @property
+    def objects(self):
+        """The GPU objects that are tracked by this scope (a list)."""
+        return list(self._objects)
+
+    def keep(self, ob):
+        """Stop tracking the given object, so it survives the scope. Returns the object."""
+        objects = self._objects
+        for i in range(len(objects) - 1, -1, -1):
+            if objects[i] is ob:
+                objects.pop(i)
+                break
+        return ob
+
+    def create_buffer(self, **kwargs):
+        """Create a buffer, or re-use one from the previous use of the scope.
+
+        Accepts the same arguments as `GPUDevice.create_buffer()`. If the scope
+        was created with ``recycle=True``, a buffer that was created with the
+        same arguments (except the label) in the previous use of the scope is
+        returned if available. Note that its contents are then not zeroed.
+        """
+        return self._create("buffer", self._device.create_buffer, kwargs)
+
+    def create_texture(self, **kwargs):
+        """Create a texture, or re-use one from the previous use of the scope.
+
+        Accepts the same arguments as `GPUDevice.create_texture()`. See
+        `create_buffer()`.
+        """
+        return self._create("texture", self._device.create_texture, kwargs)
+
+    def _create(self, kind, create_func, kwargs):
+        if not self._active:
+            raise RuntimeError("Can only create resources while the scope is active.")
+        if not self._recycle or kwargs.get("mapped_at_creation", False):
+            return create_func(**kwargs)
+        key = _to_key(kind, kwargs)
+        pool = self._pool.get(key)
+        if pool:
+            resource = pool.pop()
+        else:
+            with untracked(self._device):
+                resource = create_func(**kwargs)
+        self._recycled.append((key, resource))
+        return resource
+
+    def close(self, *, _keep_pool=False):
+        """Destroy the resources tracked by this scope (and release all objects if ``release_all`` is set).
+
+        This is called automatically at the end of the ``with`` block. Call it
+        explicitly to also destroy the resources that are kept for recycling.
+        """
+        objects, self._objects = self._objects, []
+        recycled, self._recycled = self._recycled, []
+        old_pool, self._pool = self._pool, {}
+
+        # Recycled resources that are in a good state are kept for the next use
+        if _keep_pool:
+            for key, resource in recycled:
+                if getattr(resource, "map_state", "unmapped") == "unmapped":
+                    self._pool.setdefault(key, []).append(resource)
+                else:
+                    objects.append(resource)
+        else:
+            objects.extend(resource for _, resource in recycled)
+
+        # Resources that were available but not used are destroyed
+        for resources in old_pool.values():
+            objects.extend(resources)
+
+        # Destroy the buffers, textures and query sets, so their memory is freed
+        # even if there are still references to them.
+        for ob in objects:
+            destroy = getattr(ob, "destroy", None)
+            if destroy is not None and ob is not self._device:
+                destroy()
+
+        # Release the native objects, if the user opted in. Otherwise they are
+        # released when they are garbage collected, as usual.
+        if self._release_all:
+            for ob in reversed(objects):
+                ob._release()
@@ -18,12 +18,17 @@ Read the codegen/readme.md for more information.
 from __future__ import annotations
 
 import os
+import sys
 import time
+import ctypes
 import logging
-from weakref import WeakKeyDictionary
-from typing import NoReturn, Sequence
+import threading
+import contextlib
+from weakref import WeakKeyDictionary, ref as weakref_ref
+from typing import ContextManager, NoReturn, Sequence
 
-from ..._async import LoopInterface
+from ..._async import LoopInterface, PollThread, PollTask
+from ..._resource_scope import untracked
 from ..._coreutils import str_flag_to_int, ArrayLike, CanvasLike
 from ... import classes, flags, enums, structs
 
@@ -34,9 +39,18 @@ from ._helpers import (
     get_surface_id_from_info,
     get_memoryview_from_address,
     get_memoryview_and_address,
+    get_strided_rows_layout,
+    iter_strided_chunks,
+    copy_strided_rows,
+    get_numpy,
+    get_texture_array_info,
+    strided_texture_data_to_array,
     to_snake_case,
     ErrorHandler,
     SafeLibCalls,
+    ReleaseQueue,
+    ReleaseQueueDiagnostics,
+    StructRefs,
 )
 
 logger = logging.getLogger("wgpu")
@@ -52,8 +66,11 @@ __all__ = classes.__all__.copy()
 optional = None
 
 
-# Object to be able to bind the lifetime of objects to other objects
-_refs_per_struct = WeakKeyDictionary()
+# With the GIL, there is no contention, and a plain WeakKeyDictionary is faster.
+if getattr(sys, "_is_gil_enabled", lambda: True)():
+    _refs_per_struct = WeakKeyDictionary()
+else:
+    _refs_per_struct = StructRefs()
 
 # Some enum keys need a shortcut
 _cstructfield2enum_alt = {
@@ -432,6 +449,10 @@ def _get_features(id: int, device: bool = False, adapter: bool = False):
 error_handler = ErrorHandler(logger)
 libf = SafeLibCalls(lib, error_handler)
 
+# Deferred releases of GPU objects, disabled by default (see extras)
+_release_queue = ReleaseQueue(logger)
+ReleaseQueueDiagnostics("wgpu_native_release_queue", _release_queue)
+
 
 def find_surface_id_from_canvas(canvas_or_context):
     """Try to get the surface_id from a RenderCanvas, rendercanvas context, or GPUCanvasContect."""
@@ -703,6 +724,7 @@ class GPUCanvasContext(classes.GPUCanvasContext):
 
     _surface_id = ffi.NULL
     _wgpu_config = None
+    _wgpu_config_extras = None
     _skip_present_screen = False
 
     def __init__(self, present_info: dict):
@@ -803,6 +825,7 @@ class GPUCanvasContext(classes.GPUCanvasContext):
         color_space,
         tone_mapping,
         alpha_mode,
+        max_frames_in_flight,
     ):
         capabilities = self._get_capabilities(device.adapter)
 
@@ -844,12 +867,26 @@ class GPUCanvasContext(classes.GPUCanvasContext):
         present_mode = (present_modes or capabilities["present_modes"])[0]
         c_present_mode = getattr(lib, f"WGPUPresentMode_{present_mode.capitalize()}")
 
+        # Limit the number of frames that the surface queues up
+        c_config_next_in_chain = ffi.NULL
+        if max_frames_in_flight:
+            # H: chain: WGPUChainedStruct, desiredMaximumFrameLatency: int
+            c_config_extras = new_struct_p(
+                "WGPUSurfaceConfigurationExtras *",
+                desiredMaximumFrameLatency=max_frames_in_flight,
+                # not used: chain
+            )
+            c_config_extras.chain.sType = lib.WGPUSType_SurfaceConfigurationExtras
+            # Note that the object returned by ffi.cast() does not own the memory, so we must keep a ref to the uncast object, until wgpu-native has consumed it.
+            c_config_next_in_chain = ffi.cast("WGPUChainedStruct *", c_config_extras)
+            self._wgpu_config_extras = c_config_extras
+
         # Prepare config object
 
         # H: nextInChain: WGPUChainedStruct *, device: WGPUDevice, format: WGPUTextureFormat, usage: WGPUTextureUsage/int, width: int, height: int, viewFormatCount: int, viewFormats: WGPUTextureFormat *, alphaMode: WGPUCompositeAlphaMode, presentMode: WGPUPresentMode
         self._wgpu_config = new_struct_p(
             "WGPUSurfaceConfiguration *",
-            # not used: nextInChain
+            nextInChain=c_config_next_in_chain,
             device=device._internal,
             format=format,
             usage=usage,
@@ -1096,7 +1133,10 @@ class GPUObjectBase(classes.GPUObjectBase):
             # H: void wgpuRenderBundleRelease(WGPURenderBundle renderBundle)
             # H: void wgpuQuerySetRelease(WGPUQuerySet querySet)
             function = type(self)._release_function
-            function(internal)
+            if _release_queue.enabled:
+                _release_queue.push(function, internal)
+            else:
+                function(internal)
 
 
 class GPUAdapterInfo(classes.GPUAdapterInfo):
@@ -1415,17 +1455,70 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
     # they now exist in the header, but are still unimplemented: https://github.com/gfx-rs/wgpu-native/blob/f29ebee88362934f8f9fab530f3ccb7fde2d49a9/src/unimplemented.rs#L66-L82
     _CREATE_PIPELINE_ASYNC_IS_IMPLEMENTED = False
 
+    _poll_thread = None
+    _poll_task = None
+
+    def _get_poll_thread(self):
+        # Internal function. The thread is created lazily, and only runs while
+        # promises are being sync-waited for.
+        if self._poll_thread is None:
+            self._poll_thread = PollThread(self._poll_wait, "wgpu-device-poll")
+        return self._poll_thread
+
+    def _get_poll_task(self):
+        # Internal function. The task only runs while promises are being awaited.
+        if self._poll_task is None:
+            self._poll_task = PollTask(self._poll)
+        return self._poll_task
+
     def _poll(self):
         # Internal function
         if self._internal:
             # H: WGPUBool f(WGPUDevice device, WGPUBool wait, WGPUSubmissionIndex const * submissionIndex)
             libf.wgpuDevicePoll(self._internal, False, ffi.NULL)
+        _release_queue.drain()
 
     def _poll_wait(self):
         if self._internal:
             # H: WGPUBool f(WGPUDevice device, WGPUBool wait, WGPUSubmissionIndex const * submissionIndex)
             libf.wgpuDevicePoll(self._internal, True, ffi.NULL)
 
+    def _check_submission_index(self, submission_index):
+        # wgpu-native panics when polling for an index that was never submitted
+        submission_index = int(submission_index)
+        if not 0 < submission_index <= self._queue._last_submission_index:
+            raise ValueError(
+                f"Invalid submission index {submission_index}, it was not returned by queue.submit()."
+            )
+        return submission_index
+
+    def wait_for(self, submission_index: int, timeout: float | None = None) -> bool:
+        submission_index = self._check_submission_index(submission_index)
+        if self.is_done(submission_index):
+            return True
+        elif timeout is None:
+            c_index = ffi.new("WGPUSubmissionIndex *", submission_index)
+            # H: WGPUBool f(WGPUDevice device, WGPUBool wait, WGPUSubmissionIndex const * submissionIndex)
+            libf.wgpuDevicePoll(self._internal, True, c_index)
+            self._queue._set_done_submission_index(submission_index)
+            return True
+        # wgpuDevicePoll() has no timeout, so we poll repeatedly, backing off gradually
+        deadline = time.perf_counter() + timeout
+        sleep_time = 0.0001
+        while time.perf_counter() < deadline:
+            time.sleep(min(sleep_time, max(0, deadline - time.perf_counter())))
+            sleep_time = min(2 * sleep_time, 0.005)
+            if self.is_done(submission_index):
+                return True
+        return False
+
+    def is_done(self, submission_index: int) -> bool:
+        submission_index = self._check_submission_index(submission_index)
+        queue = self._queue
+        if submission_index > queue._done_submission_index:
+            self._poll()
+        return submission_index <= queue._done_submission_index
+
     def create_buffer(
         self,
         *,
@@ -1459,7 +1552,10 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
         # Note that there is wgpuBufferGetSize and wgpuBufferGetUsage,
         # but we already know these, so they are kindof useless?
         # Return wrapped buffer
-        return GPUBuffer(label, id, self, size, usage, map_state)
+        buffer = GPUBuffer(label, id, self, size, usage, map_state)
+        # Evict other resources if needed, now that the buffer is fully created
+        self._memory.enforce_budget(exclude=buffer)
+        return buffer
 
     def create_texture(
         self,
@@ -1533,7 +1629,9 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
             "format": format,
             "usage": usage,
         }
-        return GPUTexture(label, id, self, tex_info)
+        texture = GPUTexture(label, id, self, tex_info)
+        self._memory.enforce_budget(exclude=texture)
+        return texture
 
     def create_sampler(
         self,
@@ -1574,8 +1672,16 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
     def create_bind_group_layout(
         self, *, label: str = "", entries: Sequence[structs.BindGroupLayoutEntryStruct]
     ) -> GPUBindGroupLayout:
+        # We need to keep some objects alive until the struct is consumed by wgpu-native
+        keep_alive = []
+
         c_entries_list = []
         for entry in entries:
+            # remove the extras so the struct can still be checked
+            count = None
+            if isinstance(entry, dict) and "count" in entry:
+                count = entry["count"]
+                entry = {key: val for key, val in entry.items() if key != "count"}
             check_struct("BindGroupLayoutEntry", entry)
             buffer = entry.get("buffer")
             sampler = entry.get("sampler")
@@ -1649,10 +1755,26 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
             visibility = entry["visibility"]
             if isinstance(visibility, str):
                 visibility = str_flag_to_int(flags.ShaderStage, visibility)
+            c_entry_next_in_chain = ffi.NULL
+            if count is not None:
+                if not isinstance(count, int) or count < 1:
+                    raise ValueError(
+                        f"Bind group layout entry count must be a positive int, not {count!r}"
+                    )
+                # H: chain: WGPUChainedStruct, count: int
+                c_entry_extras = new_struct_p(
+                    "WGPUBindGroupLayoutEntryExtras *",
+                    count=count,
+                    # not used: chain
+                )
+                c_entry_extras.chain.sType = lib.WGPUSType_BindGroupLayoutEntryExtras
+                # Note that the object returned by ffi.cast() does not own the memory, so we must keep a ref to the uncast object, until wgpu-native has consumed it.
+                c_entry_next_in_chain = ffi.cast("WGPUChainedStruct *", c_entry_extras)
+                keep_alive.append(c_entry_extras)
             # H: nextInChain: WGPUChainedStruct *, binding: int, visibility: WGPUShaderStage/int, buffer: WGPUBufferBindingLayout, sampler: WGPUSamplerBindingLayout, texture: WGPUTextureBindingLayout, storageTexture: WGPUStorageTextureBindingLayout
             c_entry = new_struct(
                 "WGPUBindGroupLayoutEntry",
-                # not used: nextInChain
+                nextInChain=c_entry_next_in_chain,
                 binding=int(entry["binding"]),
                 visibility=int(visibility),
                 buffer=buffer,
@@ -1691,12 +1813,30 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
         layout: GPUBindGroupLayout,
         entries: Sequence[structs.BindGroupEntryStruct],
     ) -> GPUBindGroup:
+        # We need to keep some objects alive until the struct is consumed by wgpu-native
+        keep_alive = []
+
         c_entries_list = []
         for entry in entries:
             check_struct("BindGroupEntry", entry)
-            # The resource can be a sampler, texture view, or buffer descriptor
+            # The resource can be a sampler, texture view, or buffer descriptor.
+            # With wgpu-native it can also be a list of these, for binding arrays.
             resource = entry["resource"]
-            if isinstance(resource, GPUSampler):
+            if isinstance(resource, (list, tuple)):
+                c_entry_extras = self._create_bind_group_entry_extras(resource)
+                keep_alive.append(c_entry_extras)
+                # H: nextInChain: WGPUChainedStruct *, binding: int, buffer: WGPUBuffer, offset: int, size: int, sampler: WGPUSampler, textureView: WGPUTextureView
+                c_entry = new_struct(
+                    "WGPUBindGroupEntry",
+                    nextInChain=ffi.cast("WGPUChainedStruct *", c_entry_extras),
+                    binding=int(entry["binding"]),
+                    buffer=ffi.NULL,
+                    offset=0,
+                    size=lib.WGPU_WHOLE_SIZE,
+                    sampler=ffi.NULL,
+                    textureView=ffi.NULL,
+                )
+            elif isinstance(resource, GPUSampler):
                 # H: nextInChain: WGPUChainedStruct *, binding: int, buffer: WGPUBuffer, offset: int, size: int, sampler: WGPUSampler, textureView: WGPUTextureView
                 c_entry = new_struct(
                     "WGPUBindGroupEntry",
@@ -1750,6 +1890,55 @@ class GPUDevice(classes.GPUDevice, GPUObjectBase):
         id = libf.wgpuDeviceCreateBindGroup(self._internal, struct)
         return GPUBindGroup(label, id, self)
 
+    def _create_bind_group_entry_extras(self, resources):
+        if not resources:
+            raise ValueError("Binding array must contain at least one resource.")
+        ids = []
+        if all(isinstance(r, GPUTextureView) for r in resources):
+            kind = "textureViews"
+            ids = [r._internal for r in resources]
+        elif all(isinstance(r, GPUSampler) for r in resources):
+            kind = "samplers"
+            ids = [r._internal for r in resources]
+        else:
+            kind = "buffers"
+            for r in resources:
+                if isinstance(r, (structs.BufferBinding, dict)):
+                    check_struct("BufferBinding", r)
+                    if r.get("offset", 0) != 0 or r.get("size", None) is not None:
+                        raise ValueError(
+                            "Buffers in a binding array cannot have an offset or size."
+                        )
+                    r = r["buffer"]
+                if not isinstance(r, GPUBuffer):
+                    raise TypeError(
+                        "A binding array must contain only texture views, only samplers, or only buffers."
+                    )
+                ids.append(r._internal)
+
+        c_array_types = {
+            "buffers": "WGPUBuffer[]",
+            "samplers": "WGPUSampler[]",
+            "textureViews": "WGPUTextureView[]",
+        }
+        c_ids = {
+            key: new_array(c_array_types[key], ids if key == kind else [])
+            for key in c_array_types
+        }
+        # H: chain: WGPUChainedStruct, buffers: WGPUBuffer *, bufferCount: int, samplers: WGPUSampler *, samplerCount: int, textureViews: WGPUTextureView *, textureViewCount: int
+        c_entry_extras = new_struct_p(
+            "WGPUBindGroupEntryExtras *",
+            buffers=c_ids["buffers"],
+            bufferCount=len(ids) if kind == "buffers" else 0,
+            samplers=c_ids["samplers"],
+            samplerCount=len(ids) if kind == "samplers" else 0,
+            textureViews=c_ids["textureViews"],
+            textureViewCount=len(ids) if kind == "textureViews" else 0,
+            # not used: chain
+        )
+        c_entry_extras.chain.sType = lib.WGPUSType_BindGroupEntryExtras
+        return c_entry_extras
+
     def create_pipeline_layout(
         self, *, label: str = "", bind_group_layouts: Sequence[GPUBindGroupLayout]
     ) -> GPUPipelineLayout:
@@ -2462,6 +2651,7 @@ class GPUBuffer(classes.GPUBuffer, GPUObjectBase):
 
         self._mapped_status = 0, 0, 0
         self._mapped_memoryviews = []
+        self._mapped_view_refs = []
         # If mapped at creation, set to write mode (no point in reading zeros)
         if self._map_state == enums.BufferMapState.mapped:
             self._mapped_status = 0, self.size, flags.MapMode.WRITE
@@ -2566,6 +2756,8 @@ class GPUBuffer(classes.GPUBuffer, GPUObjectBase):
             handler,
             loop=self._device._loop,
             poller=self._device._poll,
+            poll_thread=self._device._get_poll_thread(),
+            poll_task=self._device._get_poll_task(),
             keepalive=buffer_map_callback,
         )
 
@@ -2585,12 +2777,22 @@ class GPUBuffer(classes.GPUBuffer, GPUObjectBase):
     def unmap(self) -> None:
         if self._map_state != enums.BufferMapState.mapped:
             raise RuntimeError("Can only unmap a buffer if its currently mapped.")
+        self._check_no_mapped_views("unmap")
         # H: void f(WGPUBuffer buffer)
         libf.wgpuBufferUnmap(self._internal)
         self._map_state = enums.BufferMapState.unmapped
         self._mapped_status = 0, 0, 0
         self._release_memoryviews()
 
+    def _check_no_mapped_views(self, action):
+        # Views from mapped_view() point into the mapped memory, which becomes
+        # invalid when the buffer is unmapped (which destroy() also does).
+        if any(r() is not None for r in self._mapped_view_refs):
+            raise RuntimeError(
+                f"Cannot {action} a buffer while views obtained with mapped_view() are still alive."
+            )
+        self._mapped_view_refs = []
+
     def _release_memoryviews(self):
         # Release the mapped memoryview objects. These objects
         # themselves become unusable, but any views on them do not.
@@ -2669,6 +2871,54 @@ class GPUBuffer(classes.GPUBuffer, GPUObjectBase):
         # Copy data. If not contiguous, this operation may be slower.
         src_m[:] = data
 
+    @contextlib.contextmanager
+    def mapped_view(
+        self,
+        buffer_offset: int | None = None,
+        size: int | None = None,
+        *,
+        format: str = "B",
+        as_array: bool = False,
+    ) -> ContextManager[ArrayLike]:
+        # Can we even get a view?
+        if self._map_state != enums.BufferMapState.mapped:
+            raise RuntimeError("Can only get a view of a buffer if its mapped.")
+
+        offset, size = self._check_range(buffer_offset, size)
+        if offset < self._mapped_status[0] or (offset + size) > self._mapped_status[1]:
+            raise ValueError(
+                "The range for the view is not contained in the currently mapped range."
+            )
+
+        # Get mapped memory
+        # H: void * f(WGPUBuffer buffer, size_t offset, size_t size)
+        src_ptr = libf.wgpuBufferGetMappedRange(self._internal, offset, size)
+        src_address = int(ffi.cast("intptr_t", src_ptr))
+
+        # All views (and arrays) derived from the view keep a reference to
+        # the ctypes array, so we can use a weakref to detect whether any
+        # views are still alive when the buffer is unmapped.
+        c_array = (ctypes.c_uint8 * size).from_address(src_address)
+        c_array._buffer = self  # the buffer cannot be released while views are alive
+        self._mapped_view_refs.append(weakref_ref(c_array))
+        m = memoryview(c_array).cast("B").cast(format)
+        del c_array
+        if not (self._mapped_status[2] & flags.MapMode.WRITE):
+            m = m.toreadonly()
+
+        view = m
+        if as_array:
+            np = get_numpy()
+            if np is None:
+                raise ImportError("mapped_view(as_array=True) requires numpy.")
+            view = np.asarray(m)
+
+        try:
+            yield view
+        finally:
+            del view
+            m.release()
+
     def _experimental_get_mapped_range(self, buffer_offset=None, size=None):
         """Undocumented and experimental. This API can change or be
         removed without notice. Just here so we can benchmark this
@@ -2697,13 +2947,16 @@ class GPUBuffer(classes.GPUBuffer, GPUObjectBase):
     def destroy(self) -> None:
         # NOTE: destroy means that the wgpu-core object gets into a destroyed state. The wgpu-core object still exists.
         # Therefore we must not set self._internal to None.
+        self._check_no_mapped_views("destroy")
         internal = self._internal
         if internal is not None:
             # H: void f(WGPUBuffer buffer)
             libf.wgpuBufferDestroy(internal)
+        self._device._memory.decrease(self)
 
     def _release(self):
         self._release_memoryviews()
+        self._mapped_view_refs = []
         super()._release()
 
 
@@ -2771,6 +3024,7 @@ class GPUTexture(classes.GPUTexture, GPUObjectBase):
         if internal is not None:
             # H: void f(WGPUTexture texture)
             libf.wgpuTextureDestroy(internal)
+        self._device._memory.decrease(self)
 
 
 class GPUTextureView(classes.GPUTextureView, GPUObjectBase):
@@ -3857,11 +4111,65 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
     # GPUObjectBaseMixin
     _release_function = libf.wgpuQueueRelease
 
-    def submit(self, command_buffers: Sequence[GPUCommandBuffer] | None = None) -> None:
+    # The index of the last submission known to be done
+    _done_submission_index = 0
+
+    def __init__(self, label, internal, device):
+        super().__init__(label, internal, device)
+        # The callback info struct is passed by value, so we can re-use it,
+        # setting the index as userdata. The lock makes this safe when
+        # submitting from multiple threads.
+        self._c_work_done_callback_info = self._create_work_done_callback_info()
+        self._submit_lock = threading.Lock()
+        # A separate lock, because the work-done callback can be called from
+        # within wgpuQueueOnSubmittedWorkDone(), while the submit lock is held.
+        self._done_lock = threading.Lock()
+
+    def submit(self, command_buffers: Sequence[GPUCommandBuffer] | None = None) -> int:
         command_buffer_ids = [cb._internal for cb in command_buffers]
         c_command_buffers = new_array("WGPUCommandBuffer[]", command_buffer_ids)
-        # H: void f(WGPUQueue queue, size_t commandCount, WGPUCommandBuffer const * commands)
-        libf.wgpuQueueSubmit(self._internal, len(command_buffer_ids), c_command_buffers)
+        c_info = self._c_work_done_callback_info
+        with self._submit_lock:
+            # H: WGPUSubmissionIndex f(WGPUQueue queue, size_t commandCount, WGPUCommandBuffer const * commands)
+            index = libf.wgpuQueueSubmitForIndex(
+                self._internal, len(command_buffer_ids), c_command_buffers
+            )
+            self._last_submission_index = index
+            # Get notified when this submission is done
+            c_info.userdata1 = ffi.cast("void *", index)
+            # H: WGPUFuture f(WGPUQueue queue, WGPUQueueWorkDoneCallbackInfo callbackInfo)
+            libf.wgpuQueueOnSubmittedWorkDone(self._internal, c_info)
+        _release_queue.drain()
+        return index
+
+    def _set_done_submission_index(self, index):
+        # Called from the poll thread and from the caller's thread. The
+        # compare-and-set is locked, so that the index never goes down.
+        with self._done_lock:
+            if index > self._done_submission_index:
+                self._done_submission_index = index
+
+    def _create_work_done_callback_info(self):
+        # Use a weakref, because the queue holds a ref to the callback
+        queue_ref = weakref_ref(self)
+
+        @ffi.callback("void(WGPUQueueWorkDoneStatus, void *, void *)")
+        def work_done_callback(_status, userdata1, _userdata2):
+            # On error the work will never complete, so we consider it done as well
+            queue = queue_ref()
+            if queue is not None:
+                index = int(ffi.cast("uintptr_t", userdata1))
+                queue._set_done_submission_index(index)
+
+        # H: nextInChain: WGPUChainedStruct *, mode: WGPUCallbackMode, callback: WGPUQueueWorkDoneCallback, userdata1: void*, userdata2: void*
+        return new_struct(
+            "WGPUQueueWorkDoneCallbackInfo",
+            # not used: nextInChain
+            mode=lib.WGPUCallbackMode_AllowProcessEvents,
+            callback=work_done_callback,
+            # not used: userdata1
+            # not used: userdata2
+        )
 
     def write_buffer(
         self,
@@ -3874,7 +4182,7 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
         # We support anything that memoryview supports, i.e. anything
         # that implements the buffer protocol, including, bytes,
         # bytearray, ctypes arrays, numpy arrays, etc.
-        m, address = get_memoryview_and_address(data)
+        m = memoryview(data)
         nbytes = m.nbytes
 
         # Deal with offset and size
@@ -3896,11 +4204,85 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
 
         # Make the call. Note that this call copies the data - it's ok
         # if we lose our reference to the data once we leave this function.
-        c_data = ffi.cast("uint8_t *", address + data_offset)
-        # H: void f(WGPUQueue queue, WGPUBuffer buffer, uint64_t bufferOffset, void const * data, size_t size)
-        libf.wgpuQueueWriteBuffer(
-            self._internal, buffer._internal, buffer_offset, c_data, data_length
-        )
+        if getattr(m, "contiguous", True):
+            m, address = get_memoryview_and_address(m)
+            c_data = ffi.cast("uint8_t *", address + data_offset)
+            # H: void f(WGPUQueue queue, WGPUBuffer buffer, uint64_t bufferOffset, void const * data, size_t size)
+            libf.wgpuQueueWriteBuffer(
+                self._internal, buffer._internal, buffer_offset, c_data, data_length
+            )
+        else:
+            # For strided data, we gather the data in chunks, so that the
+            # peak memory usage stays small, even for large views.
+            start, end = data_offset, data_offset + data_length
+            for pos, chunk in iter_strided_chunks(
+                m, start, end, self._strided_chunk_size
+            ):
+                c_data = ffi.from_buffer("uint8_t []", chunk)
+                # H: void f(WGPUQueue queue, WGPUBuffer buffer, uint64_t bufferOffset, void const * data, size_t size)
+                libf.wgpuQueueWriteBuffer(
+                    self._internal,
+                    buffer._internal,
+                    buffer_offset + pos - start,
+                    c_data,
+                    chunk.nbytes,
+                )
+
+    _strided_chunk_size = 1024 * 1024
+
+    def write_buffers(self, items: Sequence, data: ArrayLike | None = None) -> None:
+        if data is not None:
+            blob_m, blob_address = get_memoryview_and_address(data)
+            blob_nbytes = blob_m.nbytes
+
+        # Validate all items, and coalesce adjacent writes.
+        # Each write is [buffer, buffer_offset, address, size, memoryviews]
+        writes = []
+        for i, item in enumerate(items):
+            if data is None:
+                buffer, buffer_offset, item_data = item
+                m = memoryview(item_data)
+                if not getattr(m, "contiguous", True):
+                    m = m.tobytes()
+                m, address = get_memoryview_and_address(m)
+                size = m.nbytes
+            else:
+                buffer, buffer_offset, data_offset, size = item
+                data_offset, size, m = int(data_offset), int(size), None
+                if not (0 <= data_offset and data_offset + size <= blob_nbytes):
+                    raise ValueError(f"Invalid data range for item {i}")
+                address = blob_address + data_offset
+            buffer_offset = int(buffer_offset)
+            if not (0 <= buffer_offset and buffer_offset + size <= buffer.size):
+                raise ValueError(f"Invalid buffer range for item {i}")
+            if writes:
+                prev = writes[-1]
+                if prev[0] is buffer and prev[1] + prev[3] == buffer_offset:
+                    if m is not None:
+                        prev[3] += size
+                        prev[4].append(m)
+                        continue
+                    elif prev[2] + prev[3] == address:
+                        prev[3] += size
+                        continue
+            writes.append([buffer, buffer_offset, address, size, [m]])
+
+        # Concatenate the data of coalesced items
+        if data is None:
+            for write in writes:
+                if len(write[4]) > 1:
+                    joined = b"".join(write[4])
+                    write[4] = [joined]
+                    write[2] = get_memoryview_and_address(joined)[1]
+
+        # Issue the native writes in a tight loop
+        queue_id = self._internal
+        for buffer, buffer_offset, address, size, _ in writes:
+            c_data = ffi.cast("uint8_t *", address)
+            # H: void f(WGPUQueue queue, WGPUBuffer buffer, uint64_t bufferOffset, void const * data, size_t size)
+            libf.wgpuQueueWriteBuffer(
+                queue_id, buffer._internal, buffer_offset, c_data, size
+            )
 
     def read_buffer(
         self, buffer: GPUBuffer, buffer_offset: int = 0, size: int | None = None
@@ -3956,10 +4338,31 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
         if isinstance(destination["texture"], GPUTextureView):
             raise ValueError("copy destination texture must be a texture, not a view")
 
-        m, address = get_memoryview_and_address(data)
+        size = _tuple_from_extent3d(size)
+        offset = data_layout.get("offset", 0)
+        bytes_per_row = data_layout["bytes_per_row"]
+        rows_per_image = data_layout.get("rows_per_image", size[1])
+
+        m = memoryview(data)
+        if getattr(m, "contiguous", True):
+            m, address = get_memoryview_and_address(m)
+            data_length = m.nbytes
+        else:
+            # For strided data, we try to map the row strides to bytes_per_row,
+            # so that wgpu-native gathers the rows directly from our data.
+            # Otherwise we make a contiguous copy.
+            layout = None
+            if not offset:
+                layout = get_strided_rows_layout(data, m, bytes_per_row)
+            if layout is not None:
+                address, data_length, bytes_per_row, image_stride = layout
+                if image_stride is not None:
+                    rows_per_image = image_stride // bytes_per_row
+            else:
+                m, address = get_memoryview_and_address(m.tobytes())
+                data_length = m.nbytes
 
         c_data = ffi.cast("uint8_t *", address)
-        data_length = m.nbytes
 
         # We could allow size=None in this method, and derive the size from the data.
         # Or compare size with the data size if it is given. However, the data
@@ -3970,8 +4373,6 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
         # data_size = list(reversed(m.shape)) + [1, 1, 1]
         # data_size = data_size[:3]
 
-        size = _tuple_from_extent3d(size)
-
         ori = _tuple_from_origin3d(destination)
         # H: x: int, y: int, z: int
         c_origin = new_struct(
@@ -3992,9 +4393,9 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
         # H: offset: int, bytesPerRow: int, rowsPerImage: int
         c_data_layout = new_struct_p(
             "WGPUTexelCopyBufferLayout *",
-            offset=data_layout.get("offset", 0),
-            bytesPerRow=data_layout["bytes_per_row"],
-            rowsPerImage=data_layout.get("rows_per_image", size[1]),
+            offset=offset,
+            bytesPerRow=bytes_per_row,
+            rowsPerImage=rows_per_image,
         )
 
         # H: width: int, height: int, depthOrArrayLayers: int
@@ -4010,54 +4411,79 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
             self._internal, c_destination, c_data, data_length, c_data_layout, c_size
         )
 
+    # The copy buffer for reading the present texture is reused. A thread takes
+    # it out while using it, so that other threads cannot use it at the same time.
     _shared_copy_buffer = None, 0
+    _shared_copy_buffer_lock = threading.Lock()
 
     def read_texture(
-        self, source: dict, data_layout: dict, size: tuple[int, int, int]
+        self,
+        source: dict,
+        data_layout: dict,
+        size: tuple[int, int, int],
+        *,
+        as_array: bool = False,
+        convert: str | None = None,
     ) -> ArrayLike:
         # Note that the bytes_per_row restriction does not apply for
         # this function; we have to deal with it.
 
         device = source["texture"]._device
+        size = _tuple_from_extent3d(size)
 
         # Get and calculate striding info
         # Note that full_stride (bytes per row) must be a multiple of 256
-        ori_offset = data_layout.get("offset", 0)
-        ori_stride = data_layout["bytes_per_row"]
+        if as_array:
+            texture_format = source["texture"].format
+            dtype, nchannels, _ = get_texture_array_info(texture_format)
+            np = get_numpy()
+            if np is None:
+                raise ImportError("Reading texture data as an array requires numpy.")
+            ori_offset = 0
+            ori_stride = size[0] * nchannels * np.dtype(dtype).itemsize
+            # The images must be packed, because that's what the array assumes
+            rows_per_image = size[1]
+        else:
+            if convert:
+                raise ValueError("read_texture() convert requires as_array=True.")
+            ori_offset = data_layout.get("offset", 0)
+            ori_stride = data_layout["bytes_per_row"]
+            rows_per_image = data_layout.get("rows_per_image", size[1])
         extra_stride = (256 - ori_stride % 256) % 256
         full_stride = ori_stride + extra_stride
 
-        size = _tuple_from_extent3d(size)
         data_length = full_stride * size[1] * size[2]
 
         # Create temporary buffer
         is_present_texture = source["texture"].label == "present"
         copy_buffer = None
         if is_present_texture:
-            copy_buffer, time_since_size_ok = self._shared_copy_buffer
+            with self._shared_copy_buffer_lock:
+                copy_buffer, time_since_size_ok = self._shared_copy_buffer
+                self._shared_copy_buffer = None, 0
             if copy_buffer is None:
                 pass  # No buffer
             elif copy_buffer.size < data_length:
                 copy_buffer = None  # Buffer too small
             elif copy_buffer.size < data_length * 4:
-                self._shared_copy_buffer = copy_buffer, time.time()  # Bufer size ok
+                time_since_size_ok = time.time()  # Bufer size ok
             elif time.time() - time_since_size_ok > 5.0:
                 copy_buffer = None  # Too large too long
         if copy_buffer is None:
             buffer_size = data_length
             buffer_size += (4096 - buffer_size % 4096) % 4096
             buf_usage = flags.BufferUsage.COPY_DST | flags.BufferUsage.MAP_READ
-            copy_buffer = device._create_buffer(
-                "copy-buffer", buffer_size, buf_usage, False
-            )
-            if is_present_texture:
-                self._shared_copy_buffer = copy_buffer, time.time()
+            with untracked(device):  # the buffer may be re-used
+                copy_buffer = device._create_buffer(
+                    "copy-buffer", buffer_size, buf_usage, False
+                )
+            time_since_size_ok = time.time()
 
         destination = {
             "buffer": copy_buffer,
             "offset": 0,
             "bytes_per_row": full_stride,  # or WGPU_COPY_STRIDE_UNDEFINED ?
-            "rows_per_image": data_layout.get("rows_per_image", size[1]),
+            "rows_per_image": rows_per_image,
         }
 
         # Copy data to temp buffer
@@ -4074,35 +4500,29 @@ class GPUQueue(classes.GPUQueue, GPUObjectBase):
             promise.sync_wait()
         mapped_data = copy_buffer.read_mapped(copy=False)
 
-        data_length2 = ori_stride * size[1] * size[2] + ori_offset
-
         # Copy the data
-        if extra_stride or ori_offset:
-            # Copy per row
-            data = memoryview(bytearray(data_length2)).cast(mapped_data.format)
-            i_start = ori_offset
-            for i in range(size[1] * size[2]):
-                row = mapped_data[i * full_stride : i * full_stride + ori_stride]
-                data[i_start : i_start + ori_stride] = row
-                i_start += ori_stride
-        else:
-            # Copy as a whole
-            data = memoryview(bytearray(mapped_data)).cast(mapped_data.format)
-
-        # Alternative copy solution using Numpy.
-        # I expected this to be faster, but does not really seem to be. Seems not worth it
-        # since we technically don't depend on Numpy. Leaving here for reference.
-        # import numpy as np
-        # mapped_data = np.asarray(mapped_data)[:data_length]
-        # data = np.empty(data_length2, dtype=mapped_data.dtype)
-        # mapped_data.shape = -1, full_stride
-        # data.shape = -1, ori_stride
-        # data[:] = mapped_data[:, :ori_stride]
-        # data.shape = -1
-        # data = memoryview(data)
-
-        # Since we use read_mapped(copy=False), we must unmap it *after* we've copied the data.
-        copy_buffer.unmap()
+        try:
+            if as_array:
+                # Copy (or convert) directly into an array
+                data = strided_texture_data_to_array(
+                    mapped_data, texture_format, size, full_stride, convert
+                )
+            elif extra_stride or ori_offset:
+                # De-stride, using a vectorized copy if numpy is available
+                data = copy_strided_rows(
+                    mapped_data, size[1] * size[2], full_stride, ori_stride, ori_offset
+                ).cast(mapped_data.format)
+            else:
+                # Copy as a whole
+                data = memoryview(bytearray(mapped_data)).cast(mapped_data.format)
+        finally:
+            # Since we use read_mapped(copy=False), we must unmap it *after* we've copied the data.
+            copy_buffer.unmap()
+            # Put the copy buffer back, unless another thread already did
+            if is_present_texture:
+                with self._shared_copy_buffer_lock:
+                    if self._shared_copy_buffer[0] is None:
+                        self._shared_copy_buffer = copy_buffer, time_since_size_ok
 
         return data
 
@@ -1,11 +1,13 @@
 """Utilities used in the wgpu-native backend."""
 
 import sys
+import time
 import types
 import ctypes
 import inspect
 import threading
 from queue import deque
+from weakref import WeakKeyDictionary
 
 from ._ffi import ffi, lib, lib_path
 from ..._diagnostics import DiagnosticsBase
@@ -71,6 +73,80 @@ def get_memoryview_and_address(data):
     return m, address
 
 
+def get_strided_rows_layout(data, m, row_nbytes):
+    """Get the layout of a non-contiguous memoryview that consists of
+    contiguous rows of ``row_nbytes`` bytes, placed at regular strides.
+
+    Returns a tuple (address, nbytes, row_stride, image_stride), where
+    nbytes is the extent of the data in memory, and image_stride is None
+    if there is only one level of rows. Returns None if the data cannot
+    be described this way, or if its address cannot be obtained.
+    """
+    # We need the address of the first element, which we can only get
+    # via the array interface, because the buffer protocol (and thus
+    # cffi) refuses to give the address of non-contiguous data.
+    array_interface = getattr(data, "__array_interface__", None)
+    if not array_interface or m.ndim < 2 or min(m.strides) <= 0:
+        return None
+    # Walk the trailing dimensions that are contiguous, to form a row
+    block = m.itemsize
+    axis = m.ndim - 1
+    while axis >= 0 and block < row_nbytes and m.strides[axis] == block:
+        block *= m.shape[axis]
+        axis -= 1
+    if block != row_nbytes or axis not in (0, 1):
+        return None
+    row_stride = m.strides[axis]
+    image_stride = m.strides[0] if axis == 1 else None
+    if row_stride < row_nbytes:
+        return None
+    if image_stride is not None:
+        if image_stride % row_stride or image_stride < row_stride * m.shape[1]:
+            return None
+    nbytes = m.itemsize + sum(
+        (n - 1) * s for n, s in zip(m.shape, m.strides, strict=True)
+    )
+    return array_interface["data"][0], nbytes, row_stride, image_stride
+
+
+def iter_strided_chunks(m, start, end, chunk_nbytes):
+    """Iterate over the bytes in ``start:end`` of a non-contiguous memoryview
+    (in C order), in chunks of about ``chunk_nbytes``, yielding (offset, chunk)
+    tuples. Only one chunk (plus at most one partial row on each side) is
+    copied at a time, so the memory usage is bounded.
+
+    Rows (along the first axis) that are larger than ``chunk_nbytes`` are split
+    along the next axis, for which numpy is needed. Without numpy, the chunk
+    size is bounded by ``max(chunk_nbytes, row_nbytes)``.
+    """
+    if not m.shape[0]:
+        return
+    row_nbytes = m.nbytes // m.shape[0]
+    if row_nbytes > chunk_nbytes and m.ndim > 1:
+        np = get_numpy()
+        if np is not None:
+            # A memoryview cannot be indexed along one axis, but an array can
+            a = np.asarray(m)  # no copy
+            for row in range(start // row_nbytes, -(-end // row_nbytes)):
+                row_offset = row * row_nbytes
+                for pos, chunk in iter_strided_chunks(
+                    a[row],
+                    max(start, row_offset) - row_offset,
+                    min(end, row_offset + row_nbytes) - row_offset,
+                    chunk_nbytes,
+                ):
+                    yield row_offset + pos, chunk
+            return
+    pos = start
+    while pos < end:
+        stop = min(pos + chunk_nbytes, end)
+        row1 = pos // row_nbytes
+        row2 = -(-stop // row_nbytes)
+        chunk = memoryview(m[row1:row2].tobytes())
+        yield pos, chunk[pos - row1 * row_nbytes : stop - row1 * row_nbytes]
+        pos = stop
+
+
 def get_memoryview_from_address(address, nbytes, format="B"):
     """Get a memoryview from an int memory address and a byte count,"""
     # The default format is "<B", which seems to confuse some memoryview
@@ -79,6 +155,174 @@ def get_memoryview_from_address(address, nbytes, format="B"):
     return memoryview(c_array).cast(format, shape=(nbytes,))
 
 
+def get_numpy():
+    """Get the numpy module if it's available, or None otherwise."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+_numpy = False
+
+
+def copy_strided_rows(src, nrows, src_stride, row_nbytes, offset=0):
+    """Copy rows from a strided memoryview into a new contiguous memoryview.
+
+    The ``nrows`` rows of ``row_nbytes`` bytes each are taken from ``src``
+    at intervals of ``src_stride`` bytes. The result has ``offset`` leading
+    (zero) bytes. Uses numpy if available, because it does the copy in a
+    single vectorized operation. Otherwise falls back to a copy per row.
+    """
+    nbytes = nrows * row_nbytes
+    dst = bytearray(offset + nbytes)
+    np = get_numpy()
+    if np is not None and nrows > 0:
+        src_array = np.frombuffer(src, np.uint8, (nrows - 1) * src_stride + row_nbytes)
+        src_rows = np.lib.stride_tricks.as_strided(
+            src_array, (nrows, row_nbytes), (src_stride, 1), writeable=False
+        )
+        dst_rows = np.frombuffer(dst, np.uint8, nbytes, offset)
+        dst_rows.shape = nrows, row_nbytes
+        dst_rows[:] = src_rows
+    else:
+        src = src.cast("B")
+        dst_m = memoryview(dst)
+        for i in range(nrows):
+            i_src = i * src_stride
+            i_dst = offset + i * row_nbytes
+            dst_m[i_dst : i_dst + row_nbytes] = src[i_src : i_src + row_nbytes]
+    return memoryview(dst)
+
+
+# Map texture format to (numpy dtype, number of channels, kind)
+texture_format_to_array_info = {
+    # 8 bit
+    "r8unorm": ("u1", 1, "unorm"),
+    "r8snorm": ("i1", 1, "snorm"),
+    "r8uint": ("u1", 1, "uint"),
+    "r8sint": ("i1", 1, "sint"),
+    # 16 bit
+    "r16uint": ("<u2", 1, "uint"),
+    "r16sint": ("<i2", 1, "sint"),
+    "r16unorm": ("<u2", 1, "unorm"),
+    "r16snorm": ("<i2", 1, "snorm"),
+    "r16float": ("<f2", 1, "float"),
+    "rg8unorm": ("u1", 2, "unorm"),
+    "rg8snorm": ("i1", 2, "snorm"),
+    "rg8uint": ("u1", 2, "uint"),
+    "rg8sint": ("i1", 2, "sint"),
+    # 32 bit
+    "r32uint": ("<u4", 1, "uint"),
+    "r32sint": ("<i4", 1, "sint"),
+    "r32float": ("<f4", 1, "float"),
+    "rg16uint": ("<u2", 2, "uint"),
+    "rg16sint": ("<i2", 2, "sint"),
+    "rg16unorm": ("<u2", 2, "unorm"),
+    "rg16snorm": ("<i2", 2, "snorm"),
+    "rg16float": ("<f2", 2, "float"),
+    "rgba8unorm": ("u1", 4, "unorm"),
+    "rgba8unorm-srgb": ("u1", 4, "srgb"),
+    "rgba8snorm": ("i1", 4, "snorm"),
+    "rgba8uint": ("u1", 4, "uint"),
+    "rgba8sint": ("i1", 4, "sint"),
+    "bgra8unorm": ("u1", 4, "unorm"),
+    "bgra8unorm-srgb": ("u1", 4, "srgb"),
+    # special fits, these are returned as packed uint32
+    "rgb9e5ufloat": ("<u4", 1, "packed"),
+    "rgb10a2uint": ("<u4", 1, "packed"),
+    "rgb10a2unorm": ("<u4", 1, "packed"),
+    "rg11b10ufloat": ("<u4", 1, "packed"),
+    # 64 bit
+    "rg32uint": ("<u4", 2, "uint"),
+    "rg32sint": ("<i4", 2, "sint"),
+    "rg32float": ("<f4", 2, "float"),
+    "rgba16uint": ("<u2", 4, "uint"),
+    "rgba16sint": ("<i2", 4, "sint"),
+    "rgba16unorm": ("<u2", 4, "unorm"),
+    "rgba16snorm": ("<i2", 4, "snorm"),
+    "rgba16float": ("<f2", 4, "float"),
+    # 128 bit
+    "rgba32uint": ("<u4", 4, "uint"),
+    "rgba32sint": ("<i4", 4, "sint"),
+    "rgba32float": ("<f4", 4, "float"),
+    # depth and stencil
+    "stencil8": ("u1", 1, "uint"),
+    "depth16unorm": ("<u2", 1, "unorm"),
+    "depth32float": ("<f4", 1, "float"),
+}
+
+
+def get_texture_array_info(format):
+    """Get the (dtype, nchannels, kind) for the given texture format.
+    Raises ValueError if the format cannot be represented as an array.
+    """
+    try:
+        return texture_format_to_array_info[format]
+    except KeyError:
+        raise ValueError(
+            f"Cannot represent texture format {format!r} as an array."
+        ) from None
+
+
+def strided_texture_data_to_array(src, format, size, src_stride, convert=None):
+    """Get a new numpy array from the (strided) texture data in ``src``.
+
+    The shape of the result is (height, width, channels), with an extra
+    leading dimension if ``size[2] > 1``. If ``convert`` is "float" or
+    "linear", the data is converted to float32 in the same pass, with normalized
+    formats mapped to the [0, 1] or [-1, 1] range. With "linear", the
+    color channels of sRGB formats are also converted to linear space.
+    """
+    np = get_numpy()
+    if np is None:
+        raise ImportError("Reading texture data as an array requires numpy.")
+    dtype, nchannels, kind = get_texture_array_info(format)
+    if convert not in (None, "float", "linear"):
+        raise ValueError(f"Invalid convert value {convert!r}.")
+    if convert and kind == "packed":
+        raise ValueError(f"Cannot convert packed texture format {format!r}.")
+
+    # Create a strided view on the source data, without copying
+    width, height, depth = size
+    row_nbytes = width * nchannels * np.dtype(dtype).itemsize
+    nrows = height * depth
+    view = np.frombuffer(src, np.uint8, (nrows - 1) * src_stride + row_nbytes)
+    view = np.lib.stride_tricks.as_strided(
+        view, (nrows, row_nbytes), (src_stride, 1), writeable=False
+    )
+    view = view.view(dtype).reshape(depth, height, width, nchannels)
+    if depth == 1:
+        view = view[0]
+
+    # Copy or convert into a new array, in a single pass where possible
+    if not convert:
+        return view.copy()
+    elif kind == "float":
+        return view.astype(np.float32)
+    elif kind in ("uint", "sint"):
+        return view.astype(np.float32)
+    elif dtype == "u1":
+        lut = np.arange(256, dtype=np.float32) / 255
+        luts = np.tile(lut, (nchannels, 1))
+        if kind == "srgb" and convert == "linear":
+            srgb_lut = np.where(
+                lut <= 0.04045, lut / 12.92, ((lut + 0.055) / 1.055) ** 2.4
+            )
+            luts[:3] = srgb_lut  # alpha stays linear
+        return luts[np.arange(nchannels), view]
+    elif kind == "unorm":
+        return np.multiply(view, np.float32(1 / 65535), dtype=np.float32)
+    else:  # snorm
+        scale = np.float32(1 / 127 if dtype == "i1" else 1 / 32767)
+        result = np.multiply(view, scale, dtype=np.float32)
+        return np.maximum(result, -1.0, out=result)
+
+
 _the_instance = None
 
 
@@ -377,6 +621,146 @@ class SafeLibCalls:
         return proxy_func
 
 
+class StructRefs:
+    """Object to be able to bind the lifetime of objects to other objects.
+
+    This is a WeakKeyDictionary, sharded by the hash of the key (i.e. the
+    address of the struct). Structs are created from multiple threads (e.g.
+    when encoding in parallel), and on free-threaded Python a single dict
+    would make these threads contend for it. Since the shard depends on the
+    key and not on the thread, a struct can be used, and deleted, from any thread.
+    Each operation is a single (thread-safe) dict operation.
+    """
+
+    def __init__(self, nshards=16):
+        self._nshards = nshards
+        self._shards = tuple(WeakKeyDictionary() for _ in range(nshards))
+
+    def __setitem__(self, struct, refs):
+        self._shards[hash(struct) % self._nshards][struct] = refs
+
+    def get(self, struct, default=None):
+        return self._shards[hash(struct) % self._nshards].get(struct, default)
+
+
+class ReleaseQueue:
+    """Queue of native objects to release later, in batches.
+
+    When enabled, ``push()`` is used instead of calling the release function
+    directly, e.g. from ``__del__``. Pushing only appends to a deque, which is
+    atomic (also on free-threaded Python), so it can be done from any thread,
+    and during garbage collection. The queue is drained with ``drain()``, at
+    points where the work is expected anyway, or from a background thread.
+    """
+
+    def __init__(self, logger):
+        self._logger = logger
+        self._queue = deque()
+        self._drain_lock = threading.Lock()
+        self._thread = None
+        self._thread_stop_event = None
+        self.enabled = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the metrics."""
+        self.max_depth = 0  # the largest depth observed at a drain
+        self.drains = 0  # the number of drains that released objects
+        self.released = 0  # the total number of released objects
+        self.drain_time = 0.0  # the total time spent draining
+        self.max_drain_time = 0.0
+        self.last_drain_time = 0.0
+
+    @property
+    def depth(self):
+        """The number of objects currently in the queue."""
+        return len(self._queue)
+
+    def push(self, function, internal):
+        """Schedule ``function(internal)`` to be called at the next drain."""
+        # This codepath must be as fast as it can be
+        self._queue.append((function, internal))
+
+    def drain(self):
+        """Release the objects in the queue. Returns the number of released objects.
+
+        Objects that are pushed while draining are left for the next drain.
+        If another thread is already draining, this returns immediately.
+        """
+        queue = self._queue
+        if not queue:
+            return 0
+        if not self._drain_lock.acquire(blocking=False):
+            return 0
+        try:
+            t0 = time.perf_counter()
+            depth = len(queue)
+            popleft = queue.popleft
+            for _ in range(depth):
+                function, internal = popleft()
+                try:
+                    function(internal)
+                except Exception as err:
+                    self._logger.error(f"Error releasing native object: {err}")
+            t1 = time.perf_counter()
+            # Update metrics
+            drain_time = t1 - t0
+            self.max_depth = max(self.max_depth, depth)
+            self.drains += 1
+            self.released += depth
+            self.drain_time += drain_time
+            self.max_drain_time = max(self.max_drain_time, drain_time)
+            self.last_drain_time = drain_time
+        finally:
+            self._drain_lock.release()
+        return depth
+
+    def start_thread(self, interval):
+        """Start a thread that drains the queue every ``interval`` seconds."""
+        self.stop_thread()
+        self._thread_stop_event = stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(float(interval), stop_event),
+            name="wgpu-release",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop_thread(self):
+        """Stop the background thread, if it is running."""
+        if self._thread is not None:
+            self._thread_stop_event.set()
+            self._thread.join()
+            self._thread = self._thread_stop_event = None
+
+    def _run(self, interval, stop_event):
+        while not stop_event.wait(interval):
+            self.drain()
+
+
+class ReleaseQueueDiagnostics(DiagnosticsBase):
+    """Provides metrics for the queue of deferred native releases."""
+
+    def __init__(self, name, release_queue):
+        super().__init__(name)
+        self.release_queue = release_queue
+
+    def get_dict(self):
+        q = self.release_queue
+        return {
+            "enabled": q.enabled,
+            "thread": q._thread is not None,
+            "depth": q.depth,
+            "max_depth": q.max_depth,
+            "drains": q.drains,
+            "released": q.released,
+            "drain_time": f"{q.drain_time * 1000:0.3f} ms",
+            "max_drain_time": f"{q.max_drain_time * 1000:0.3f} ms",
+            "last_drain_time": f"{q.last_drain_time * 1000:0.3f} ms",
+        }
+
+
 def generate_report():
     """Get a report similar to the one produced by wgpuGenerateReport(),
     but in the form of a Python dict.
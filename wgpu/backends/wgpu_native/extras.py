@@ -20,6 +20,7 @@ from ._api import (
     new_struct_p,
     to_c_string_view,
     enum_str2int,
+    _release_queue,
 )
 from ...enums import Enum
 from ._helpers import get_wgpu_instance
@@ -226,6 +227,42 @@ def write_timestamp(
     encoder._write_timestamp(query_set, query_index)
 
 
+def set_deferred_release(enabled: bool = True, *, thread_interval=None):
+    """Enable or disable the deferred release of GPU objects.
+
+    By default, the native object of a GPU object is released when the Python
+    object is deleted, which may happen at any moment, in any thread. With
+    deferred release enabled, the native objects are instead put in a queue,
+    which is drained at ``queue.submit()`` and when a device is polled (e.g.
+    while waiting for a promise). This avoids bursts of release calls
+    during garbage collection, e.g. in the middle of encoding a frame.
+
+    Args:
+        enabled (bool): Whether to defer releasing GPU objects. When disabled,
+            the objects that are still in the queue are released.
+        thread_interval (float, None): If given, also drain the queue from a
+            background thread at this interval (in seconds). Useful when
+            ``submit()`` is not called regularly.
+
+    Metrics on the queue depth and drain time are available via
+    ``wgpu.diagnostics.wgpu_native_release_queue``.
+    """
+    _release_queue.stop_thread()
+    _release_queue.enabled = bool(enabled)
+    if not enabled:
+        _release_queue.drain()
+    elif thread_interval is not None:
+        _release_queue.start_thread(thread_interval)
+
+
+def drain_release_queue() -> int:
+    """Release the GPU objects that are queued for deferred release.
+
+    Returns the number of released objects. See ``set_deferred_release()``.
+    """
+    return _release_queue.drain()
+
+
 def set_instance_extras(
     backends: Sequence[str] = ("All",),
     flags: Sequence[str] = ("Default",),
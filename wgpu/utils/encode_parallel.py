@@ -0,0 +1,84 @@
+"""
+Utilities to encode commands on multiple threads.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="wgpu-encode")
+        return _executor
+
+
+def encode_parallel(device, encode_functions, *, executor=None, label=""):
+    """Encode commands on multiple threads, and return the command buffers.
+
+    Each function is called (in a worker thread) with a new
+    ``GPUCommandEncoder`` to record its commands into, e.g. the render pass
+    for one view. The encoders are finished in the worker threads too. The
+    resulting command buffers are returned in the same order as the
+    functions, so that they can be submitted together:
+
+    .. code-block:: py
+
+        def encode_view(view):
+            def encode(encoder):
+                render_pass = encoder.begin_render_pass(...)
+                ...
+                render_pass.end()
+
+            return encode
+
+        command_buffers = encode_parallel(device, [encode_view(v) for v in views])
+        device.queue.submit(command_buffers)
+
+    A ``GPUCommandEncoder`` and its pass encoders may be used from any thread,
+    and different encoders can be used concurrently. A single encoder should
+    not be used by multiple threads at the same time.
+
+    Note that wgpu-native releases the GIL while encoding, but most of the work
+    of encoding from Python is still done while holding it. How well this scales
+    with the number of threads thus depends on the amount of work per call.
+
+    Arguments:
+        device (GPUDevice): The device to create the command encoders with.
+        encode_functions (list): Functions that accept a ``GPUCommandEncoder``.
+            The return value is ignored.
+        executor (concurrent.futures.Executor, None): The executor to run the
+            functions in. Default uses a shared ``ThreadPoolExecutor``.
+        label (str): The label for the command encoders and command buffers.
+            The index of the function is appended.
+
+    Returns:
+        list: the ``GPUCommandBuffer`` objects.
+
+    If a function raises an error, it is re-raised here, after all functions
+    have finished.
+    """
+    encode_functions = list(encode_functions)
+    if executor is None:
+        executor = _get_executor()
+
+    def encode(index, func):
+        encoder = device.create_command_encoder(label=f"{label}{index}")
+        func(encoder)
+        return encoder.finish(label=f"{label}{index}")
+
+    futures = [
+        executor.submit(encode, index, func)
+        for index, func in enumerate(encode_functions)
+    ]
+    # Wait for all, so that no work is still going on when an error is raised
+    exceptions = [future.exception() for future in futures]
+    for exception in exceptions:
+        if exception is not None:
+            raise exception
+    return [future.result() for future in futures]
@@ -0,0 +1,220 @@
+"""
+A buffer with a host-side copy, that only uploads the parts that changed.
+"""
+
+import wgpu
+from .._resource_scope import untracked
+
+
+class ManagedBuffer:
+    """A `GPUBuffer` with a host-side mirror, that tracks which parts have changed.
+
+    Arguments:
+        device (GPUDevice): The device to create the buffer on.
+        data (buffer-like, None): The initial data. If not given, ``size``
+            must be provided, and the data is initialized with zeros.
+        size (int, None): The size in bytes. Default the size of ``data``.
+        usage (int): The buffer usage. COPY_DST and COPY_SRC are always added.
+            Default STORAGE.
+        format (str): The memoryview format for the ``data`` and for indexing.
+            Default "B".
+        label (str): The label for the buffer.
+
+    Data can be modified by setting items (in units of ``format``), or with
+    ``write()`` (in bytes). The affected ranges are recorded, and uploaded
+    by ``sync()``. If the ``data`` memoryview is modified directly, use
+    ``mark_dirty()``.
+
+    Note that the ``buffer`` is replaced by a larger one when the
+    size grows beyond the capacity, so bind groups that use it must be
+    recreated.
+    """
+
+    def __init__(
+        self, device, data=None, *, size=None, usage=None, format="B", label=""
+    ):
+        self._device = device
+        self._format = format
+        self._label = label
+        if usage is None:
+            usage = wgpu.BufferUsage.STORAGE
+        self._usage = usage | wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.COPY_SRC
+
+        if data is not None:
+            m = memoryview(data).cast("B")
+            if size is None:
+                size = m.nbytes
+        elif size is None:
+            raise ValueError("ManagedBuffer needs data or a size.")
+        self._check_size(size)
+
+        self._nbytes = int(size)
+        self._buffer = self._create_buffer(self._nbytes)
+        self._host = bytearray(self._buffer.size)
+        self._dirty = []
+        self._stats = {
+            "syncs": 0,
+            "writes": 0,
+            "bytes_uploaded": 0,
+            "bytes_saved": 0,
+            "reallocations": 0,
+        }
+        if data is not None:
+            self._host[: m.nbytes] = m
+            self._dirty.append((0, m.nbytes))
+
+    def _check_size(self, size):
+        itemsize = memoryview(b"").cast(self._format).itemsize
+        if size <= 0 or size % itemsize:
+            raise ValueError(
+                f"ManagedBuffer size must be a positive multiple of {itemsize}."
+            )
+
+    def _create_buffer(self, capacity):
+        capacity = (capacity + 3) & ~3
+        # The buffer outlives any resource scope in which it's grown
+        with untracked(self._device):
+            return self._device.create_buffer(
+                label=self._label, size=capacity, usage=self._usage
+            )
+
+    @property
+    def buffer(self):
+        """The `GPUBuffer`. Can be replaced by a larger buffer when the size grows."""
+        return self._buffer
+
+    @property
+    def nbytes(self):
+        """The size of the data in bytes."""
+        return self._nbytes
+
+    @property
+    def capacity(self):
+        """The size of the buffer in bytes."""
+        return self._buffer.size
+
+    @property
+    def data(self):
+        """A memoryview of the host-side data. Use ``mark_dirty()`` after modifying it.
+        The memoryview becomes stale when the size grows beyond the capacity.
+        """
+        return memoryview(self._host).cast("B")[: self._nbytes].cast(self._format)
+
+    @property
+    def stats(self):
+        """A dict with statistics: the number of syncs and writes, the number of
+        bytes uploaded, the number of bytes saved by not uploading the
+        full data on each sync, and the number of reallocations.
+        """
+        return dict(self._stats)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        data = self.data
+        data[index] = value
+        itemsize = data.itemsize
+        if isinstance(index, slice):
+            indices = range(*index.indices(len(data)))
+            if not indices:
+                return
+            # Get the bounds without iterating over the range
+            if indices.step > 0:
+                start, stop = indices.start, indices[-1] + 1
+            else:
+                start, stop = indices[-1], indices.start + 1
+            self._dirty.append((start * itemsize, stop * itemsize))
+        else:
+            index = index if index >= 0 else len(data) + index
+            self._dirty.append((index * itemsize, (index + 1) * itemsize))
+
+    def write(self, data, offset=0):
+        """Write data (buffer-like) at the given byte offset."""
+        m = memoryview(data).cast("B")
+        offset = int(offset)
+        if offset < 0 or offset + m.nbytes > self._nbytes:
+            raise ValueError("Data to write does not fit in the ManagedBuffer.")
+        self._host[offset : offset + m.nbytes] = m
+        self._dirty.append((offset, offset + m.nbytes))
+
+    def mark_dirty(self, start=0, end=None):
+        """Mark the given byte range as changed. By default the full data."""
+        end = self._nbytes if end is None else min(int(end), self._nbytes)
+        start = max(0, int(start))
+        if start < end:
+            self._dirty.append((start, end))
+
+    def resize(self, size):
+        """Resize the data to the given size in bytes.
+
+        New data is zero-initialized. When the size exceeds the capacity, a
+        new buffer is created with (at least) double the capacity, and the
+        current contents are copied on the GPU, so the amortized cost of
+        growing is small.
+        """
+        size = int(size)
+        self._check_size(size)
+
+        if size > self._buffer.size:
+            old_buffer = self._buffer
+            self._buffer = self._create_buffer(max(size, 2 * old_buffer.size))
+            encoder = self._device.create_command_encoder()
+            encoder.copy_buffer_to_buffer(
+                old_buffer, 0, self._buffer, 0, old_buffer.size
+            )
+            self._device.queue.submit([encoder.finish()])
+            old_buffer.destroy()
+            host = bytearray(self._buffer.size)
+            host[: self._nbytes] = memoryview(self._host)[: self._nbytes]
+            self._host = host
+            self._stats["reallocations"] += 1
+        elif size > self._nbytes:
+            self._host[self._nbytes : size] = bytes(size - self._nbytes)
+
+        # The grown part is zeroed on the host, so it must be uploaded too
+        if size > self._nbytes:
+            self._dirty.append((self._nbytes, size))
+        self._dirty = [(start, min(end, size)) for start, end in self._dirty]
+        self._nbytes = size
+
+    def sync(self, queue=None):
+        """Upload the changed parts of the data to the buffer.
+
+        Overlapping and adjacent ranges are merged, as well as ranges that
+        are separated by less than 256 bytes, because each write has overhead.
+        Returns the number of bytes uploaded.
+        """
+        queue = queue or self._device.queue
+        self._stats["syncs"] += 1
+        if not self._dirty:
+            self._stats["bytes_saved"] += self._nbytes
+            return 0
+
+        # Merge ranges, aligned to 4 bytes
+        max_gap = 256
+        capacity = self._buffer.size
+        ranges = []
+        for start, end in sorted(self._dirty):
+            start, end = start & ~3, min((end + 3) & ~3, capacity)
+            if start >= end:
+                continue
+            if ranges and start <= ranges[-1][1] + max_gap:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                ranges.append([start, end])
+        self._dirty = []
+
+        # Upload in one call, directly from the host data
+        buffer = self._buffer
+        items = [(buffer, start, start, end - start) for start, end in ranges]
+        queue.write_buffers(items, self._host)
+
+        nbytes = sum(end - start for start, end in ranges)
+        self._stats["writes"] += len(ranges)
+        self._stats["bytes_uploaded"] += nbytes
+        self._stats["bytes_saved"] += max(0, self._nbytes - nbytes)
+        return nbytes
@@ -0,0 +1,186 @@
+"""
+Utility to generate the mip levels of a texture on the GPU.
+"""
+
+import wgpu
+from .._resource_scope import untracked
+
+
+shader_source = """
+struct Varyings {
+    @builtin(position) position: vec4<f32>,
+    @location(0) texcoord: vec2<f32>,
+    @location(1) @interpolate(flat) layer: u32,
+};
+
+@group(0) @binding(0) var src_texture: TEXTURE_TYPE<f32>;
+@group(0) @binding(1) var src_sampler: sampler;
+
+@vertex
+fn vs_main(@builtin(vertex_index) index: u32) -> Varyings {
+    // A triangle that covers the full viewport. The array layer is
+    // derived from the first vertex, which is 3 * layer.
+    let i = index % 3u;
+    let texcoord = vec2<f32>(f32((i << 1u) & 2u), f32(i & 2u));
+    var out: Varyings;
+    out.position = vec4<f32>(texcoord * vec2<f32>(2.0, -2.0) + vec2<f32>(-1.0, 1.0), 0.0, 1.0);
+    out.texcoord = texcoord;
+    out.layer = index / 3u;
+    return out;
+}
+
+@fragment
+fn fs_main(in: Varyings) -> @location(0) vec4<f32> {
+    return SAMPLE_EXPRESSION;
+}
+"""
+
+sample_expressions = {
+    "2d": "textureSample(src_texture, src_sampler, in.texcoord)",
+    "2d-array": "textureSample(src_texture, src_sampler, in.texcoord, in.layer)",
+}
+
+
+def generate_mipmaps(device, texture):
+    """Generate the mip levels of a texture from its first level, on the GPU.
+
+    Each level is rendered from the previous level with linear filtering.
+    All levels (and all array layers) are encoded in a single command
+    encoder, and submitted at once. The pipelines and sampler are cached
+    per device and per format, so calling this repeatedly is cheap.
+
+    Arguments:
+        device (GPUDevice): The device that the texture belongs to.
+        texture (GPUTexture): The texture. Must be 2D (array layers are
+            supported), have a filterable color format (including sRGB formats),
+            and have TEXTURE_BINDING and RENDER_ATTACHMENT usage.
+    """
+    if texture.dimension != "2d":
+        raise ValueError("generate_mipmaps() only supports 2D textures.")
+    if texture.sample_count != 1:
+        raise ValueError("generate_mipmaps() does not support multisampled textures.")
+    format = texture.format
+    if format.endswith(("uint", "sint")) or format.startswith(
+        ("depth", "stencil", "bc", "etc2", "eac", "astc")
+    ):
+        raise ValueError(f"Cannot generate mipmaps for texture format {format!r}.")
+    required_usage = (
+        wgpu.TextureUsage.TEXTURE_BINDING | wgpu.TextureUsage.RENDER_ATTACHMENT
+    )
+    if (texture.usage & required_usage) != required_usage:
+        raise ValueError(
+            "generate_mipmaps() needs a texture with TEXTURE_BINDING and RENDER_ATTACHMENT usage."
+        )
+
+    level_count = texture.mip_level_count
+    if level_count <= 1:
+        return
+
+    # Array textures are sampled via a 2d-array view, because some backends
+    # cannot create a 2d view of a single layer for sampling.
+    layer_count = texture.depth_or_array_layers
+    view_dimension = "2d-array" if layer_count > 1 else "2d"
+    with untracked(device):  # the cached objects outlive any resource scope
+        cache = _get_device_cache(device, view_dimension)
+        pipeline = _get_pipeline(device, cache, format)
+
+    encoder = device.create_command_encoder(label="generate_mipmaps")
+    for level in range(1, level_count):
+        src_view = texture.create_view(
+            dimension=view_dimension, base_mip_level=level - 1, mip_level_count=1
+        )
+        bind_group = device.create_bind_group(
+            layout=cache["bind_group_layout"],
+            entries=[
+                {"binding": 0, "resource": src_view},
+                {"binding": 1, "resource": cache["sampler"]},
+            ],
+        )
+        for layer in range(layer_count):
+            dst_view = texture.create_view(
+                dimension="2d",
+                base_mip_level=level,
+                mip_level_count=1,
+                base_array_layer=layer,
+                array_layer_count=1,
+            )
+            render_pass = encoder.begin_render_pass(
+                color_attachments=[
+                    {
+                        "view": dst_view,
+                        "load_op": "clear",
+                        "store_op": "store",
+                        "clear_value": (0, 0, 0, 0),
+                    }
+                ]
+            )
+            render_pass.set_pipeline(pipeline)
+            render_pass.set_bind_group(0, bind_group)
+            render_pass.draw(3, 1, 3 * layer, 0)
+            render_pass.end()
+    device.queue.submit([encoder.finish()])
+
+
+def _get_device_cache(device, view_dimension):
+    # The cache holds the sampler, and per view dimension the shader, layouts
+    # and per-format pipelines. It is stored on the device (rather than in a
+    # global dict), because the cached objects reference the device.
+    device_cache = getattr(device, "_mipmaps_cache", None)
+    if device_cache is None:
+        device_cache = device._mipmaps_cache = {
+            "sampler": device.create_sampler(
+                label="generate_mipmaps", min_filter="linear", mag_filter="linear"
+            ),
+        }
+    cache = device_cache.get(view_dimension)
+    if cache is None:
+        bind_group_layout = device.create_bind_group_layout(
+            label="generate_mipmaps",
+            entries=[
+                {
+                    "binding": 0,
+                    "visibility": wgpu.ShaderStage.FRAGMENT,
+                    "texture": {
+                        "sample_type": "float",
+                        "view_dimension": view_dimension,
+                    },
+                },
+                {
+                    "binding": 1,
+                    "visibility": wgpu.ShaderStage.FRAGMENT,
+                    "sampler": {"type": "filtering"},
+                },
+            ],
+        )
+        texture_type = "texture_" + view_dimension.replace("-", "_")
+        code = shader_source.replace("TEXTURE_TYPE", texture_type)
+        code = code.replace("SAMPLE_EXPRESSION", sample_expressions[view_dimension])
+        cache = device_cache[view_dimension] = {
+            "shader": device.create_shader_module(label="generate_mipmaps", code=code),
+            "sampler": device_cache["sampler"],
+            "bind_group_layout": bind_group_layout,
+            "pipeline_layout": device.create_pipeline_layout(
+                label="generate_mipmaps", bind_group_layouts=[bind_group_layout]
+            ),
+            "pipelines": {},
+        }
+    return cache
+
+
+def _get_pipeline(device, cache, format):
+    pipeline = cache["pipelines"].get(format)
+    if pipeline is None:
+        shader = cache["shader"]
+        pipeline = device.create_render_pipeline(
+            label=f"generate_mipmaps {format}",
+            layout=cache["pipeline_layout"],
+            vertex={"module": shader, "entry_point": "vs_main"},
+            primitive={"topology": "triangle-list"},
+            fragment={
+                "module": shader,
+                "entry_point": "fs_main",
+                "targets": [{"format": format}],
+            },
+        )
+        cache["pipelines"][format] = pipeline
+    return pipeline
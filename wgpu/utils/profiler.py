@@ -0,0 +1,259 @@
+"""
+A profiler that measures the GPU time of passes, using timestamp queries.
+"""
+
+import contextlib
+from collections import deque
+
+import wgpu
+from .._resource_scope import untracked
+from .trace import get_active_tracer
+
+
+class _ProfilerSlot:
+    """The query set and buffers for one frame, which are re-used."""
+
+    __slots__ = [
+        "count",
+        "entries",
+        "promise",
+        "query_set",
+        "readback_buffer",
+        "resolve_buffer",
+        "submission_index",
+    ]
+
+    def __init__(self, device, max_queries):
+        with untracked(device):
+            self.query_set = device.create_query_set(
+                label="profiler", type="timestamp", count=max_queries
+            )
+            self.resolve_buffer = device.create_buffer(
+                label="profiler-resolve",
+                size=8 * max_queries,
+                usage=wgpu.BufferUsage.QUERY_RESOLVE | wgpu.BufferUsage.COPY_SRC,
+            )
+            self.readback_buffer = device.create_buffer(
+                label="profiler-readback",
+                size=8 * max_queries,
+                usage=wgpu.BufferUsage.MAP_READ | wgpu.BufferUsage.COPY_DST,
+            )
+        self.reset()
+
+    def reset(self):
+        self.count = 0  # number of queries used
+        self.entries = []  # (name, query_index)
+        self.promise = None
+        self.submission_index = None
+
+
+class GpuProfiler:
+    """Measure the GPU time of compute and render passes, using timestamp queries.
+
+    Arguments:
+        device (GPUDevice): The device. Must have the "timestamp-query" feature.
+        max_queries (int): The maximum number of timestamps per frame, i.e. twice
+            the number of passes and scopes that can be timed. Default 64.
+        max_frames_in_flight (int): The maximum number of frames for which the
+            results are pending. Default 4.
+
+    Use the profiler's ``begin_compute_pass()`` and ``begin_render_pass()``
+    instead of those of the command encoder, to inject timestamp writes. Call
+    ``resolve()`` on the (last) encoder of the frame, and ``end_frame()`` with
+    the submission index:
+
+    .. code-block:: py
+
+        profiler = GpuProfiler(device)
+
+        def draw_frame():
+            encoder = device.create_command_encoder()
+            render_pass = profiler.begin_render_pass(encoder, label="scene", ...)
+            ...
+            render_pass.end()
+            profiler.resolve(encoder)
+            index = device.queue.submit([encoder.finish()])
+            profiler.end_frame(index)
+
+            for frame_results in profiler.get_results():
+                for name, duration in frame_results:
+                    print(f"{name}: {duration * 1000:0.3f} ms")
+
+    The timestamps are resolved into buffers that are re-used, and read a few
+    frames later, when the GPU is done with them, so the profiler does
+    not stall the GPU or the CPU. When results are not collected fast enough,
+    all slots are in use, and frames are not measured. The ``dropped``
+    attribute counts the passes and scopes that were not measured.
+
+    With ``scope()``, a part of an encoder or pass can be measured too.
+    Passes and scopes inside a scope are named "scope/name".
+
+    When a `Tracer <wgpu.utils.trace.Tracer>` is active, the results are also
+    added to its "GPU" track.
+    """
+
+    def __init__(self, device, *, max_queries=64, max_frames_in_flight=4):
+        if "timestamp-query" not in device.features:
+            raise RuntimeError("GpuProfiler needs the 'timestamp-query' feature.")
+        self._device = device
+        self._max_queries = max(2, int(max_queries) // 2 * 2)
+        self._max_slots = max(1, int(max_frames_in_flight))
+        self._nslots = 0
+        self._free_slots = []
+        self._slot = None  # the slot for the current frame
+        self._resolved = []  # slots resolved, but not yet submitted
+        self._pending = deque()  # slots submitted, waiting for results
+        self._scope_names = []
+        self.dropped = 0  # the number of passes/scopes that were not measured
+
+    def _get_slot(self):
+        slot = self._slot
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            elif self._nslots < self._max_slots:
+                slot = _ProfilerSlot(self._device, self._max_queries)
+                self._nslots += 1
+            else:
+                return None
+            self._slot = slot
+        return slot
+
+    def _allocate(self, name):
+        # Allocate two queries, returning the slot and the index of the first
+        slot = self._get_slot()
+        if slot is None or slot.count + 2 > self._max_queries:
+            self.dropped += 1
+            return None, 0
+        index = slot.count
+        slot.count += 2
+        slot.entries.append(("/".join([*self._scope_names, name]), index))
+        return slot, index
+
+    def begin_compute_pass(self, encoder, **kwargs):
+        """Call ``encoder.begin_compute_pass(**kwargs)`` with timestamp writes.
+
+        The pass is named after its label, or "compute" if it has none.
+        """
+        if kwargs.get("timestamp_writes") is None:
+            slot, index = self._allocate(kwargs.get("label") or "compute")
+            if slot is not None:
+                kwargs["timestamp_writes"] = {
+                    "query_set": slot.query_set,
+                    "beginning_of_pass_write_index": index,
+                    "end_of_pass_write_index": index + 1,
+                }
+        return encoder.begin_compute_pass(**kwargs)
+
+    def begin_render_pass(self, encoder, **kwargs):
+        """Call ``encoder.begin_render_pass(**kwargs)`` with timestamp writes.
+
+        The pass is named after its label, or "render" if it has none.
+        """
+        if kwargs.get("timestamp_writes") is None:
+            slot, index = self._allocate(kwargs.get("label") or "render")
+            if slot is not None:
+                kwargs["timestamp_writes"] = {
+                    "query_set": slot.query_set,
+                    "beginning_of_pass_write_index": index,
+                    "end_of_pass_write_index": index + 1,
+                }
+        return encoder.begin_render_pass(**kwargs)
+
+    @contextlib.contextmanager
+    def scope(self, encoder, name):
+        """Context manager to measure the commands recorded in the with-block.
+
+        The ``encoder`` can be a command encoder or a pass encoder. This uses
+        ``write_timestamp()`` from the wgpu-native extras, which needs the
+        "timestamp-query-inside-encoders" or "timestamp-query-inside-passes"
+        feature. Without it, the scope is only used to name the passes in it.
+        """
+        from ..backends.wgpu_native.extras import write_timestamp
+
+        if isinstance(encoder, wgpu.GPUCommandEncoder):
+            feature = "timestamp-query-inside-encoders"
+        else:
+            feature = "timestamp-query-inside-passes"
+        slot = None
+        if feature in self._device.features:
+            slot, index = self._allocate(name)
+            if slot is not None:
+                write_timestamp(encoder, slot.query_set, index)
+        self._scope_names.append(name)
+        try:
+            yield
+        finally:
+            self._scope_names.pop()
+            if slot is not None:
+                write_timestamp(encoder, slot.query_set, index + 1)
+
+    def resolve(self, encoder):
+        """Resolve the timestamps of the current frame, using the given command encoder.
+
+        Call this on the last encoder of the frame, before finishing it.
+        """
+        slot, self._slot = self._slot, None
+        if slot is None:
+            return
+        if slot.count:
+            nbytes = 8 * slot.count
+            encoder.resolve_query_set(
+                slot.query_set, 0, slot.count, slot.resolve_buffer, 0
+            )
+            encoder.copy_buffer_to_buffer(
+                slot.resolve_buffer, 0, slot.readback_buffer, 0, nbytes
+            )
+        self._resolved.append(slot)
+
+    def end_frame(self, submission_index):
+        """Mark the frame as submitted.
+
+        The ``submission_index`` is the value returned by ``queue.submit()``,
+        for the command buffer of the encoder that was passed to ``resolve()``.
+        """
+        resolved, self._resolved = self._resolved, []
+        for slot in resolved:
+            if slot.count:
+                slot.submission_index = int(submission_index)
+                slot.promise = slot.readback_buffer.map_async("READ", 0, 8 * slot.count)
+                self._pending.append(slot)
+            else:
+                self._free_slots.append(slot)
+
+    def get_results(self):
+        """Get the results of the frames for which the GPU has finished.
+
+        Does not block. Returns a list with a list for each frame (oldest first),
+        containing (name, duration) tuples, with the duration in seconds.
+        """
+        device = self._device
+        results = []
+        while self._pending and device.is_done(self._pending[0].submission_index):
+            slot = self._pending.popleft()
+            try:
+                slot.promise.sync_wait()
+                data = slot.readback_buffer.read_mapped(0, 8 * slot.count)
+                slot.readback_buffer.unmap()
+            except Exception:
+                self.dropped += len(slot.entries)
+            else:
+                timestamps = data.cast("Q")
+                tracer = get_active_tracer()
+                if tracer is not None:
+                    tracer.add_gpu_timestamps(
+                        slot.submission_index,
+                        [
+                            (name, timestamps[i], timestamps[i + 1])
+                            for name, i in slot.entries
+                        ],
+                    )
+                results.append(
+                    [
+                        (name, max(0, timestamps[i + 1] - timestamps[i]) / 1e9)
+                        for name, i in slot.entries
+                    ]
+                )
+            slot.reset()
+            self._free_slots.append(slot)
+        return results
@@ -0,0 +1,207 @@
+"""
+A utility to spread data that is too large for a single buffer over multiple buffers.
+"""
+
+import math
+
+import wgpu
+
+
+class ShardedBuffer:
+    """Spread (large) data over multiple buffers that each respect the device limits.
+
+    Arguments:
+        device (GPUDevice): The device to create the buffers on.
+        data (buffer-like, None): The (contiguous) data to upload. If not given,
+            ``size`` must be provided, and the buffers are zero-initialized.
+        size (int, None): The total size in bytes. Default the size of ``data``.
+        usage (int): The buffer usage. COPY_SRC and COPY_DST are always added.
+            Default STORAGE.
+        item_size (int, None): The size in bytes of the elements in the data. Shards
+            never split an element. Default the itemsize of the data, or 4.
+        max_shard_size (int, None): The maximum size of each shard. By default this is
+            derived from the device's "max-buffer-size" limit, and the
+            "max-storage-buffer-binding-size" or "max-uniform-buffer-binding-size"
+            limit if the usage includes STORAGE or UNIFORM, respectively.
+        label (str): The label for the buffers.
+
+    Each shard is bound as a separate buffer, so shaders operating on the
+    data must use one binding per shard. Use ``offsets`` and ``sizes`` to
+    find what part of the data is in which shard.
+    """
+
+    def __init__(
+        self,
+        device,
+        data=None,
+        *,
+        size=None,
+        usage=None,
+        item_size=None,
+        max_shard_size=None,
+        label="",
+    ):
+        self._device = device
+
+        # Get data and size
+        m = None
+        if data is not None:
+            m = memoryview(data)
+            if item_size is None:
+                item_size = m.itemsize
+            m = m.cast("B")
+            if size is None:
+                size = m.nbytes
+            elif size != m.nbytes:
+                raise ValueError("Given size does not match the size of the data.")
+        elif size is None:
+            raise ValueError("ShardedBuffer needs data or a size.")
+        size = int(size)
+        if size <= 0:
+            raise ValueError("ShardedBuffer size must be larger than zero.")
+        item_size = int(item_size or 4)
+
+        # Get usage
+        if usage is None:
+            usage = wgpu.BufferUsage.STORAGE
+        usage = usage | wgpu.BufferUsage.COPY_SRC | wgpu.BufferUsage.COPY_DST
+
+        # Determine shard size. It must be a multiple of the item size, as
+        # well as a multiple of 4 (for copying).
+        limits = device.limits
+        limit = limits["max-buffer-size"]
+        if usage & wgpu.BufferUsage.STORAGE:
+            limit = min(limit, limits["max-storage-buffer-binding-size"])
+        if usage & wgpu.BufferUsage.UNIFORM:
+            limit = min(limit, limits["max-uniform-buffer-binding-size"])
+        if max_shard_size is not None:
+            limit = min(limit, int(max_shard_size))
+        granularity = math.lcm(item_size, 4)
+        shard_size = limit // granularity * granularity
+        if shard_size <= 0:
+            raise ValueError(
+                f"Item size {item_size} is too large for a maximum shard size of {limit}."
+            )
+
+        # Create the shards
+        self._nbytes = size
+        self._item_size = item_size
+        self._shards = []
+        self._offsets = []
+        self._sizes = []
+        for i, offset in enumerate(range(0, size, shard_size)):
+            shard_nbytes = min(shard_size, size - offset)
+            shard_label = f"{label}[{i}]"
+            if m is not None:
+                buffer = device.create_buffer_with_data(
+                    label=shard_label,
+                    data=m[offset : offset + shard_nbytes],
+                    usage=usage,
+                )
+            else:
+                buffer = device.create_buffer(
+                    label=shard_label, size=(shard_nbytes + 3) & ~3, usage=usage
+                )
+            self._shards.append(buffer)
+            self._offsets.append(offset)
+            self._sizes.append(shard_nbytes)
+
+    @property
+    def nbytes(self):
+        """The total size of the data in bytes."""
+        return self._nbytes
+
+    @property
+    def item_size(self):
+        """The size in bytes of the elements. Shards never split an element."""
+        return self._item_size
+
+    @property
+    def shards(self):
+        """The list of `GPUBuffer` objects."""
+        return list(self._shards)
+
+    @property
+    def offsets(self):
+        """The list of byte offsets of each shard in the total data."""
+        return list(self._offsets)
+
+    @property
+    def sizes(self):
+        """The list of sizes in bytes of the data in each shard. A shard's
+        buffer size may be larger, because it is rounded up to a multiple of 4.
+        """
+        return list(self._sizes)
+
+    def get_bind_group_entries(self, first_binding=0):
+        """Get a list of bind group entries (dicts) for the shards, with
+        consecutive binding slots starting at ``first_binding``.
+        """
+        return [
+            {
+                "binding": first_binding + i,
+                "resource": {"buffer": buffer, "offset": 0, "size": buffer.size},
+            }
+            for i, buffer in enumerate(self._shards)
+        ]
+
+    def write(self, data, offset=0):
+        """Write data to the shards, starting at the given byte offset in
+        the total data. The offset and the data size must be multiples of 4.
+        """
+        m = memoryview(data).cast("B")
+        offset = int(offset)
+        if offset < 0 or offset + m.nbytes > self._nbytes:
+            raise ValueError("Data to write does not fit in the ShardedBuffer.")
+        queue = self._device.queue
+        end = offset + m.nbytes
+        for buffer, shard_offset, shard_nbytes in zip(
+            self._shards, self._offsets, self._sizes, strict=True
+        ):
+            i1 = max(offset, shard_offset)
+            i2 = min(end, shard_offset + shard_nbytes)
+            if i1 < i2:
+                queue.write_buffer(
+                    buffer, i1 - shard_offset, m[i1 - offset : i2 - offset]
+                )
+
+    def read(self, out=None):
+        """Read the data from all shards into a single contiguous output.
+
+        The data is copied directly from the mapped memory into the output,
+        without an intermediate copy. If ``out`` is given, it must be a
+        writable contiguous object that supports the buffer protocol
+        (e.g. a numpy array) of at least ``nbytes`` bytes. Otherwise a new
+        memoryview is returned.
+        """
+        device = self._device
+        if out is None:
+            out = memoryview(bytearray(self._nbytes))
+        out_m = memoryview(out).cast("B")
+        if out_m.readonly:
+            raise ValueError("The output for ShardedBuffer.read() must be writable.")
+        if out_m.nbytes < self._nbytes:
+            raise ValueError("The output for ShardedBuffer.read() is too small.")
+
+        # Copy all shards to mappable buffers, in a single submit
+        tmp_usage = wgpu.BufferUsage.COPY_DST | wgpu.BufferUsage.MAP_READ
+        encoder = device.create_command_encoder()
+        tmp_buffers = []
+        for buffer in self._shards:
+            tmp_buffer = device.create_buffer(size=buffer.size, usage=tmp_usage)
+            encoder.copy_buffer_to_buffer(buffer, 0, tmp_buffer, 0, buffer.size)
+            tmp_buffers.append(tmp_buffer)
+        device.queue.submit([encoder.finish()])
+
+        # Map all buffers at once, then copy the data into the output
+        promises = [tmp_buffer.map_async("READ") for tmp_buffer in tmp_buffers]
+        for tmp_buffer, promise, shard_offset, shard_nbytes in zip(
+            tmp_buffers, promises, self._offsets, self._sizes, strict=True
+        ):
+            promise.sync_wait()
+            with tmp_buffer.mapped_view(0, tmp_buffer.size) as view:
+                out_m[shard_offset : shard_offset + shard_nbytes] = view[:shard_nbytes]
+            tmp_buffer.unmap()
+            tmp_buffer.destroy()
+
+        return out
@@ -0,0 +1,291 @@
+"""
+A texture atlas to pack many small images into a few large array textures.
+"""
+
+import wgpu
+from .._diagnostics import texture_format_to_bpp
+from .._resource_scope import untracked
+
+
+class AtlasRegion:
+    """A region in a `TextureAtlas`. The position of a region changes when the
+    atlas is defragmented, so look up its attributes when they are needed.
+    """
+
+    __slots__ = ["_atlas", "height", "layer", "width", "x", "y"]
+
+    def __init__(self, atlas, layer, x, y, width, height):
+        self._atlas = atlas
+        self.layer = layer
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"<AtlasRegion layer={self.layer} x={self.x} y={self.y} size={self.width}x{self.height}>"
+
+    @property
+    def uv_rect(self):
+        """The texture coordinates of the region, as (u0, v0, u1, v1)."""
+        size = self._atlas.size
+        return (
+            self.x / size,
+            self.y / size,
+            (self.x + self.width) / size,
+            (self.y + self.height) / size,
+        )
+
+
+class TextureAtlas:
+    """Pack many small images into the layers of a 2D array texture.
+
+    Arguments:
+        device (GPUDevice): The device to create the texture on.
+        format (str): The texture format. Default "rgba8unorm".
+        size (int): The width and height of each layer. Default 1024.
+        layers (int): The initial number of layers. Default 1.
+        max_layers (int, None): The maximum number of layers. Default the
+            device's "max-texture-array-layers" limit.
+        usage (int): The texture usage. TEXTURE_BINDING, COPY_SRC and COPY_DST
+            are always added.
+        padding (int): The number of texels to keep free around each region, to
+            avoid bleeding when sampling with linear filtering. Default 1.
+        label (str): The label for the texture.
+
+    Regions are allocated with a shelf packer: each layer is divided into
+    horizontal shelves, and regions are placed next to each other on the
+    shelf that fits best. When there is no room, the number of layers is
+    doubled, copying the existing layers on the GPU.
+
+    Note that the ``texture`` is replaced when the atlas grows or is
+    defragmented, so bind groups that use it must be recreated. The
+    ``version`` is incremented when this happens.
+    """
+
+    def __init__(
+        self,
+        device,
+        format="rgba8unorm",
+        *,
+        size=1024,
+        layers=1,
+        max_layers=None,
+        usage=0,
+        padding=1,
+        label="",
+    ):
+        bpp = texture_format_to_bpp.get(format, 0)
+        unsupported_prefixes = "depth", "stencil", "bc", "etc2", "eac", "astc"
+        if not bpp or bpp % 8 or format.startswith(unsupported_prefixes):
+            raise ValueError(f"TextureAtlas does not support format {format!r}.")
+        limits = device.limits
+        size = int(size)
+        if not 0 < size <= limits["max-texture-dimension-2d"]:
+            raise ValueError(f"Invalid TextureAtlas size {size}.")
+        if max_layers is None:
+            max_layers = limits["max-texture-array-layers"]
+
+        self._device = device
+        self._format = format
+        self._bytes_per_texel = bpp // 8
+        self._size = size
+        self._max_layers = int(max_layers)
+        self._usage = (
+            usage
+            | wgpu.TextureUsage.TEXTURE_BINDING
+            | wgpu.TextureUsage.COPY_SRC
+            | wgpu.TextureUsage.COPY_DST
+        )
+        self._padding = int(padding)
+        self._label = label
+        self._version = 0
+
+        # Per layer, a list of shelves. Each shelf is a list [y, height, x, nregions].
+        self._shelves = []
+        self._regions = set()
+        self._texture = None
+        self._set_layer_count(max(1, int(layers)))
+
+    @property
+    def texture(self):
+        """The `GPUTexture` (a 2D array texture). Is replaced when the atlas grows
+        or is defragmented.
+        """
+        return self._texture
+
+    @property
+    def version(self):
+        """An integer that is incremented each time the texture is replaced."""
+        return self._version
+
+    @property
+    def size(self):
+        """The width and height of each layer."""
+        return self._size
+
+    @property
+    def layers(self):
+        """The number of layers."""
+        return len(self._shelves)
+
+    @property
+    def regions(self):
+        """The list of allocated regions."""
+        return list(self._regions)
+
+    def allocate(self, width, height):
+        """Allocate a region of the given size, and return an `AtlasRegion`."""
+        width, height = int(width), int(height)
+        pad = self._padding
+        if not (0 < width and 0 < height):
+            raise ValueError("Atlas region size must be larger than zero.")
+        if width + 2 * pad > self._size or height + 2 * pad > self._size:
+            raise ValueError(
+                f"Atlas region {width}x{height} does not fit in layers of {self._size}x{self._size}."
+            )
+        pos = self._find_space(width + 2 * pad, height + 2 * pad)
+        while pos is None:
+            layer_count = self.layers
+            if layer_count >= self._max_layers:
+                raise RuntimeError("The TextureAtlas is full.")
+            self._set_layer_count(min(2 * layer_count, self._max_layers))
+            pos = self._find_space(width + 2 * pad, height + 2 * pad)
+        layer, x, y = pos
+        region = AtlasRegion(self, layer, x + pad, y + pad, width, height)
+        self._regions.add(region)
+        return region
+
+    def add(self, data, width=None, height=None):
+        """Allocate a region and upload the given data to it.
+
+        The data must be contiguous texels in the atlas' format. If the data
+        is a numpy array with at least 2 dimensions, the width and height are
+        obtained from its shape. Otherwise they must be given.
+        Returns an `AtlasRegion`.
+        """
+        if width is None or height is None:
+            shape = getattr(data, "shape", None)
+            if shape is None or len(shape) < 2:
+                raise ValueError("TextureAtlas.add() needs a width and height.")
+            height, width = shape[:2]
+        region = self.allocate(width, height)
+        self.write(region, data)
+        return region
+
+    def write(self, region, data):
+        """Upload data to the given region, using ``queue.write_texture()``."""
+        if region not in self._regions:
+            raise ValueError("Region does not belong to this TextureAtlas.")
+        nbytes = region.width * region.height * self._bytes_per_texel
+        if memoryview(data).nbytes != nbytes:
+            raise ValueError(
+                f"Data for a {region.width}x{region.height} atlas region must be {nbytes} bytes."
+            )
+        self._device.queue.write_texture(
+            {"texture": self._texture, "origin": (region.x, region.y, region.layer)},
+            data,
+            {"bytes_per_row": region.width * self._bytes_per_texel},
+            (region.width, region.height, 1),
+        )
+
+    def free(self, region):
+        """Free the given region. Space is reclaimed when a shelf becomes
+        empty, or by calling ``defragment()``.
+        """
+        if region not in self._regions:
+            raise ValueError("Region does not belong to this TextureAtlas.")
+        self._regions.discard(region)
+        pad = self._padding
+        for shelf in self._shelves[region.layer]:
+            if shelf[0] == region.y - pad:
+                shelf[3] -= 1
+                if shelf[3] == 0:
+                    shelf[2] = 0
+                break
+
+    def defragment(self):
+        """Repack all regions into a new texture, copying them on the GPU.
+
+        Regions are updated in place. This reclaims the space of freed regions,
+        and the number of layers may decrease.
+        """
+        regions = sorted(self._regions, key=lambda r: (r.height, r.width), reverse=True)
+        old_texture = self._texture
+        old_positions = [(r.layer, r.x, r.y) for r in regions]
+
+        # Pack into an empty atlas, growing as needed
+        self._regions = set()
+        self._shelves = [[]]
+        pad = self._padding
+        for region in regions:
+            pos = self._find_space(region.width + 2 * pad, region.height + 2 * pad)
+            if pos is None:
+                self._shelves.append([])
+                pos = self._find_space(region.width + 2 * pad, region.height + 2 * pad)
+            region.layer, region.x, region.y = pos[0], pos[1] + pad, pos[2] + pad
+            self._regions.add(region)
+        self._texture = self._create_texture(len(self._shelves))
+
+        encoder = self._device.create_command_encoder()
+        for region, (layer, x, y) in zip(regions, old_positions, strict=True):
+            encoder.copy_texture_to_texture(
+                {"texture": old_texture, "origin": (x, y, layer)},
+                {
+                    "texture": self._texture,
+                    "origin": (region.x, region.y, region.layer),
+                },
+                (region.width, region.height, 1),
+            )
+        self._device.queue.submit([encoder.finish()])
+        old_texture.destroy()
+
+    def _find_space(self, width, height):
+        # Best fit: the existing shelf with the least wasted height
+        size = self._size
+        best = None
+        for layer, shelves in enumerate(self._shelves):
+            for shelf in shelves:
+                y, shelf_height, x, _ = shelf
+                if height <= shelf_height and x + width <= size:
+                    if best is None or shelf_height < best[1]:
+                        best = shelf, shelf_height, layer
+        if best is not None:
+            shelf, _, layer = best
+            x = shelf[2]
+            shelf[2] += width
+            shelf[3] += 1
+            return layer, x, shelf[0]
+        # Otherwise, a new shelf in the first layer that has room
+        for layer, shelves in enumerate(self._shelves):
+            y = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if y + height <= size:
+                shelves.append([y, height, width, 1])
+                return layer, 0, y
+        return None
+
+    def _create_texture(self, layer_count):
+        self._version += 1
+        # The texture outlives any resource scope in which it's grown
+        with untracked(self._device):
+            return self._device.create_texture(
+                label=self._label,
+                size=(self._size, self._size, layer_count),
+                format=self._format,
+                usage=self._usage,
+            )
+
+    def _set_layer_count(self, layer_count):
+        old_texture = self._texture
+        old_layer_count = len(self._shelves)
+        self._texture = self._create_texture(layer_count)
+        self._shelves.extend([] for _ in range(layer_count - old_layer_count))
+        if old_texture is not None:
+            encoder = self._device.create_command_encoder()
+            encoder.copy_texture_to_texture(
+                {"texture": old_texture},
+                {"texture": self._texture},
+                (self._size, self._size, old_layer_count),
+            )
+            self._device.queue.submit([encoder.finish()])
+            old_texture.destroy()
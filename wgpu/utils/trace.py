@@ -0,0 +1,331 @@
+"""
+A tracer that records wgpu API calls and GPU pass timings on one timeline,
+and exports them in the Chrome Trace Event format.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+
+
+# The tracer that is currently recording, or None
+_active_tracer = None
+_patch_lock = threading.Lock()
+
+GPU_TID = 0  # the thread id used for the GPU track
+
+
+def get_active_tracer():
+    """Get the `Tracer` that is currently recording, or None."""
+    return _active_tracer
+
+
+def _thread_name_event(pid, tid, name):
+    return {
+        "name": "thread_name",
+        "ph": "M",
+        "pid": pid,
+        "tid": tid,
+        "args": {"name": name},
+    }
+
+
+class Tracer:
+    """Record spans for wgpu API calls, and export them as a Chrome trace.
+
+    While the tracer is active, it records spans for the ``create_*()`` methods,
+    the encoding of compute and render passes (from ``begin_*_pass()`` to
+    ``end()``), ``queue.submit()``, and for waiting on promises (e.g. via
+    ``buffer.map_sync()``, ``promise.sync_wait()`` or ``await promise``). The
+    span of an awaited promise covers the time until the awaiting code resumes,
+    which includes the time spent in other tasks. The results of a
+    `GpuProfiler <wgpu.utils.profiler.GpuProfiler>` are added to a separate
+    "GPU" track.
+
+    .. code-block:: py
+
+        tracer = Tracer()
+
+        with tracer:  # or tracer.start() ... tracer.stop()
+            for i in range(100):
+                draw_frame()
+
+        tracer.save("trace.json")
+
+    The file can be loaded in https://ui.perfetto.dev or ``chrome://tracing``.
+
+    Tracing works by wrapping the methods of the backend's classes when the
+    tracer is started, and restoring them when it is stopped. Therefore it has
+    no overhead when it is not active. Only one tracer can be active at a time.
+
+    The GPU timestamps are in a different time domain than the CPU clock. They
+    are aligned by assuming that the GPU does not start executing a submission
+    before ``queue.submit()`` is called.
+    """
+
+    def __init__(self):
+        self._events = []  # (name, cat, tid, t0_ns, t1_ns, args)
+        self._gpu_frames = []  # (submission_index, [(name, t0_ns, t1_ns), ...])
+        self._submit_times = {}  # submission_index -> perf_counter_ns
+        self._thread_names = {}
+        self._open_passes = {}  # id(pass) -> (name, cat, t0_ns, args)
+        self._patches = []  # (cls, name, original_in_class_dict)
+        self._t_start = time.perf_counter_ns()
+
+    def __repr__(self):
+        status = "active" if self.active else "inactive"
+        return f"<Tracer ({status}) with {len(self._events)} events at {hex(id(self))}>"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.stop()
+
+    @property
+    def active(self):
+        """Whether this tracer is currently recording."""
+        return _active_tracer is self
+
+    def start(self):
+        """Start recording. Raises RuntimeError if another tracer is active."""
+        global _active_tracer
+        from ..backends.auto import gpu
+
+        with _patch_lock:
+            if _active_tracer is self:
+                return
+            elif _active_tracer is not None:
+                raise RuntimeError("Another Tracer is already active.")
+            self._patch(sys.modules[type(gpu).__module__])
+            _active_tracer = self
+
+    def stop(self):
+        """Stop recording. The recorded events are kept."""
+        global _active_tracer
+        with _patch_lock:
+            if _active_tracer is not self:
+                return
+            _active_tracer = None
+            patches, self._patches = self._patches, []
+            for cls, name, original in reversed(patches):
+                if original is None:
+                    delattr(cls, name)
+                else:
+                    setattr(cls, name, original)
+            self._open_passes.clear()
+
+    def clear(self):
+        """Remove all recorded events."""
+        self._events.clear()
+        self._gpu_frames.clear()
+        self._submit_times.clear()
+        self._thread_names.clear()
+        self._t_start = time.perf_counter_ns()
+
+    # %% Recording
+
+    def _patch(self, m):
+        self._patch_methods(
+            m.GPUDevice, [n for n in dir(m.GPUDevice) if n.startswith("create_")]
+        )
+        self._patch_methods(m.GPUTexture, ["create_view"])
+        self._patch_methods(m.GPUCommandEncoder, ["begin_compute_pass"], "compute_pass")
+        self._patch_methods(m.GPUCommandEncoder, ["begin_render_pass"], "render_pass")
+        self._patch_methods(m.GPUComputePassEncoder, ["end"], "end")
+        self._patch_methods(m.GPURenderPassEncoder, ["end"], "end")
+        self._patch_methods(m.GPUQueue, ["submit"], "submit")
+        self._patch_methods(m.GPUPromise, ["sync_wait"], "wait")
+        self._patch_methods(m.GPUPromise, ["__await__"], "await")
+
+    def _patch_methods(self, cls, names, kind="call"):
+        wrappers = {
+            "call": self._wrap_call,
+            "compute_pass": self._wrap_begin_pass,
+            "render_pass": self._wrap_begin_pass,
+            "end": self._wrap_end_pass,
+            "submit": self._wrap_submit,
+            "wait": self._wrap_wait,
+            "await": self._wrap_await,
+        }
+        for name in names:
+            func = getattr(cls, name)
+            if not callable(func):
+                continue
+            original = cls.__dict__.get(name, None)
+            wrapper = wrappers[kind](func, name if kind == "call" else kind)
+            functools.update_wrapper(wrapper, func)
+            setattr(cls, name, wrapper)
+            self._patches.append((cls, name, original))
+
+    def _record(self, name, cat, t0, t1, args=None):
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            self._thread_names[tid] = threading.current_thread().name
+        self._events.append((name, cat, tid, t0, t1, args))
+
+    def _wrap_call(self, func, name):
+        record = self._record
+
+        def wrapper(ob, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            try:
+                return func(ob, *args, **kwargs)
+            finally:
+                label = kwargs.get("label", None)
+                info = {"label": label} if label else None
+                record(name, "create", t0, time.perf_counter_ns(), info)
+
+        return wrapper
+
+    def _wrap_begin_pass(self, func, kind):
+        open_passes = self._open_passes
+
+        def wrapper(ob, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            pass_encoder = func(ob, *args, **kwargs)
+            label = kwargs.get("label", None)
+            info = {"label": label} if label else None
+            open_passes[id(pass_encoder)] = (label or kind, kind, t0, info)
+            return pass_encoder
+
+        return wrapper
+
+    def _wrap_end_pass(self, func, kind):
+        open_passes = self._open_passes
+        record = self._record
+
+        def wrapper(ob, *args, **kwargs):
+            try:
+                return func(ob, *args, **kwargs)
+            finally:
+                pass_info = open_passes.pop(id(ob), None)
+                if pass_info is not None:
+                    name, cat, t0, info = pass_info
+                    record(name, cat, t0, time.perf_counter_ns(), info)
+
+        return wrapper
+
+    def _wrap_submit(self, func, kind):
+        submit_times = self._submit_times
+        record = self._record
+
+        def wrapper(ob, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            index = None
+            try:
+                index = func(ob, *args, **kwargs)
+                return index
+            finally:
+                if index is not None:
+                    submit_times[index] = t0
+                info = {"submission_index": index}
+                record("submit", "queue", t0, time.perf_counter_ns(), info)
+
+        return wrapper
+
+    def _wrap_wait(self, func, kind):
+        record = self._record
+
+        def wrapper(ob, *args, **kwargs):
+            t0 = time.perf_counter_ns()
+            try:
+                return func(ob, *args, **kwargs)
+            finally:
+                record(f"wait {ob._title}", "wait", t0, time.perf_counter_ns())
+
+        return wrapper
+
+    def _wrap_await(self, func, kind):
+        record = self._record
+
+        def wrapper(ob):
+            t0 = time.perf_counter_ns()
+            try:
+                return (yield from func(ob))
+            finally:
+                record(f"await {ob._title}", "wait", t0, time.perf_counter_ns())
+
+        return wrapper
+
+    def add_gpu_timestamps(self, submission_index, timestamps):
+        """Add GPU timings to the "GPU" track.
+
+        The ``submission_index`` is the value returned by the ``queue.submit()``
+        for the commands that were measured. The ``timestamps`` is a list
+        of (name, begin, end) tuples, with the raw timestamps in nanoseconds.
+        This is called automatically by the `GpuProfiler
+        <wgpu.utils.profiler.GpuProfiler>`.
+        """
+        timestamps = [(name, int(t0), int(t1)) for name, t0, t1 in timestamps]
+        if timestamps:
+            self._gpu_frames.append((int(submission_index), timestamps))
+
+    # %% Export
+
+    def _get_gpu_offset(self):
+        # The offset to convert GPU timestamps to perf_counter_ns. Each frame
+        # starts after its submit, which gives a lower bound for the offset.
+        # The tightest lower bound is used.
+        offset = None
+        for index, timestamps in self._gpu_frames:
+            t_submit = self._submit_times.get(index, None)
+            if t_submit is not None:
+                first = min(t0 for _, t0, _ in timestamps)
+                frame_offset = t_submit - first
+                if offset is None or frame_offset > offset:
+                    offset = frame_offset
+        return offset
+
+    def get_events(self):
+        """Get the recorded events, as a list of dicts in the Chrome Trace Event format."""
+        pid = os.getpid()
+        t_start = self._t_start
+        events = []
+
+        for tid, name in list(self._thread_names.items()):
+            events.append(_thread_name_event(pid, tid, name))
+
+        for name, cat, tid, t0, t1, args in list(self._events):
+            event = {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (t0 - t_start) / 1000,
+                "dur": (t1 - t0) / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+
+        offset = self._get_gpu_offset()
+        if offset is not None:
+            events.append(_thread_name_event(pid, GPU_TID, "GPU"))
+            for index, timestamps in list(self._gpu_frames):
+                for name, t0, t1 in timestamps:
+                    events.append(
+                        {
+                            "name": name,
+                            "cat": "gpu",
+                            "ph": "X",
+                            "ts": (t0 + offset - t_start) / 1000,
+                            "dur": max(0, t1 - t0) / 1000,
+                            "pid": pid,
+                            "tid": GPU_TID,
+                            "args": {"submission_index": index},
+                        }
+                    )
+
+        return events
+
+    def save(self, filename):
+        """Write the recorded events to a JSON file in the Chrome Trace Event format."""
+        data = {"traceEvents": self.get_events(), "displayTimeUnit": "ms"}
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f)
@@ -0,0 +1,228 @@
+"""
+Utilities to stream data from files to the GPU.
+"""
+
+import os
+import mmap
+import queue
+import threading
+
+import wgpu
+from .._diagnostics import texture_format_to_bpp
+
+
+def upload_file(
+    device,
+    path,
+    *,
+    offset=0,
+    size=None,
+    texture=None,
+    usage=None,
+    max_buffer_size=None,
+    chunk_size=16 * 2**20,
+    threaded=False,
+    label="",
+):
+    """Upload the contents of a file to one or more GPU buffers, or to a texture.
+
+    The file is streamed to the GPU in chunks, so that the host memory
+    usage stays bounded, even for files that are (much) larger than
+    the available RAM. Each chunk is written with ``queue.write_buffer()``
+    or ``queue.write_texture()``, and the GPU is periodically waited for,
+    so that the staging memory for the writes does not pile up.
+
+    Arguments:
+        device (GPUDevice): The device to upload the data to.
+        path (str, pathlib.Path): The file to read.
+        offset (int): The byte offset in the file to start reading at. Default 0.
+        size (int, None): The number of bytes to read. Default until the end of the file.
+        texture (GPUTexture, None): If given, the data is written to this texture,
+            starting at its origin. The file data must be tightly packed texels
+            (of the texture's format) in row-major order, and the texture usage
+            must include COPY_DST. Otherwise, buffers are created.
+        usage (int, None): The usage for the created buffers. COPY_DST is always
+            added. Default STORAGE.
+        max_buffer_size (int, None): The maximum size of each buffer. If the data
+            is larger, it is spread over multiple buffers. Default is the device's
+            "max-buffer-size" limit.
+        chunk_size (int): The maximum number of bytes to write at once. Default 16 MiB.
+        threaded (bool): If True, the file is read in a separate thread, so that
+            disk reads overlap with writing the data to the GPU. The data is then
+            read into a small pool of chunk-sized buffers. Otherwise the file is
+            memory mapped. Default False.
+        label (str): The label for the created buffers.
+
+    Returns:
+        A list of `GPUBuffer` objects, or the given texture.
+    """
+    path = os.fspath(path)
+    file_size = os.path.getsize(path)
+    offset = int(offset)
+    if size is None:
+        size = file_size - offset
+    size = int(size)
+    if not (0 <= offset and 0 < size and offset + size <= file_size):
+        raise ValueError("Invalid offset and/or size to upload from file.")
+    chunk_size = max(4, int(chunk_size) // 4 * 4)
+
+    # Collect the writes to do, as (func, args, start, end) tuples
+    if texture is not None:
+        jobs = _get_texture_jobs(device, texture, size, chunk_size)
+        result = texture
+    else:
+        jobs, result = _get_buffer_jobs(
+            device, size, usage, max_buffer_size, chunk_size, label
+        )
+
+    # Do the writes, waiting for the GPU every few chunks to bound the staging memory
+    reader = _read_threaded if threaded else _read_mmap
+    for i, (func, args, data) in enumerate(reader(path, offset, jobs)):
+        func(*args, data)
+        device.queue.submit([])
+        if i % 4 == 3:
+            device.queue.on_submitted_work_done_sync()
+    device.queue.on_submitted_work_done_sync()
+
+    return result
+
+
+def _get_buffer_jobs(device, size, usage, max_buffer_size, chunk_size, label):
+    if usage is None:
+        usage = wgpu.BufferUsage.STORAGE
+    usage = usage | wgpu.BufferUsage.COPY_DST
+    if max_buffer_size is None:
+        max_buffer_size = device.limits["max-buffer-size"]
+    max_buffer_size = int(max_buffer_size) // 4 * 4
+
+    def write_buffer(buffer, buffer_offset, data):
+        nbytes = data.nbytes
+        if nbytes % 4:
+            data = bytes(data) + bytes(4 - nbytes % 4)
+        device.queue.write_buffer(buffer, buffer_offset, data)
+
+    jobs = []
+    buffers = []
+    for buffer_start in range(0, size, max_buffer_size):
+        buffer_nbytes = min(max_buffer_size, size - buffer_start)
+        buffer = device.create_buffer(
+            label=label, size=(buffer_nbytes + 3) // 4 * 4, usage=usage
+        )
+        buffers.append(buffer)
+        for i in range(0, buffer_nbytes, chunk_size):
+            start = buffer_start + i
+            end = min(start + chunk_size, buffer_start + buffer_nbytes)
+            jobs.append((write_buffer, (buffer, i), start, end))
+    return jobs, buffers
+
+
+def _get_texture_jobs(device, texture, size, chunk_size):
+    width, height, depth = texture.size
+    bpp = texture_format_to_bpp.get(texture.format, 0)
+    unsupported_prefixes = "depth", "stencil", "bc", "etc2", "eac", "astc"
+    if not bpp or bpp % 8 or texture.format.startswith(unsupported_prefixes):
+        raise ValueError(f"Cannot upload to texture format {texture.format!r}.")
+    row_nbytes = width * bpp // 8
+    image_nbytes = row_nbytes * height
+    if size != image_nbytes * depth:
+        raise ValueError(
+            f"The data size ({size}) does not match the texture size ({image_nbytes * depth})."
+        )
+
+    def write_texture(origin, extent, data):
+        device.queue.write_texture(
+            {"texture": texture, "origin": origin},
+            data,
+            {"bytes_per_row": row_nbytes, "rows_per_image": extent[1]},
+            extent,
+        )
+
+    # Write multiple images at once, or multiple rows of one image
+    jobs = []
+    if image_nbytes <= chunk_size:
+        nimages = chunk_size // image_nbytes
+        for z in range(0, depth, nimages):
+            n = min(nimages, depth - z)
+            start = z * image_nbytes
+            extent = width, height, n
+            jobs.append(
+                (write_texture, ((0, 0, z), extent), start, start + n * image_nbytes)
+            )
+    else:
+        nrows = max(1, chunk_size // row_nbytes)
+        for z in range(depth):
+            for y in range(0, height, nrows):
+                n = min(nrows, height - y)
+                start = z * image_nbytes + y * row_nbytes
+                extent = width, n, 1
+                jobs.append(
+                    (write_texture, ((0, y, z), extent), start, start + n * row_nbytes)
+                )
+    return jobs
+
+
+def _read_mmap(path, offset, jobs):
+    """Yield (func, args, data) for each job, with data a view on the memory-mapped file."""
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            mv = memoryview(m)
+            try:
+                for func, args, start, end in jobs:
+                    data = mv[offset + start : offset + end]
+                    try:
+                        yield func, args, data
+                    finally:
+                        data.release()
+                    # Tell the OS we no longer need these pages, to keep our RSS small
+                    if hasattr(m, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+                        page_start = (offset + start) // mmap.PAGESIZE * mmap.PAGESIZE
+                        m.madvise(
+                            mmap.MADV_DONTNEED, page_start, offset + end - page_start
+                        )
+            finally:
+                mv.release()
+
+
+def _read_threaded(path, offset, jobs):
+    """Yield (func, args, data) for each job, reading the data in a separate thread."""
+    npool = 3
+    pool_nbytes = max(end - start for _, _, start, end in jobs)
+    pool = queue.Queue()
+    for _ in range(npool):
+        pool.put(bytearray(pool_nbytes))
+    ready = queue.Queue()
+    stop = threading.Event()
+
+    def reader():
+        try:
+            with open(path, "rb", buffering=0) as f:
+                for func, args, start, end in jobs:
+                    buf = pool.get()
+                    if stop.is_set():
+                        return
+                    f.seek(offset + start)
+                    data = memoryview(buf)[: end - start]
+                    nread = 0
+                    while nread < data.nbytes:
+                        n = f.readinto(data[nread:])
+                        if not n:
+                            raise EOFError(f"Unexpected end of file {path!r}.")
+                        nread += n
+                    ready.put((func, args, data, buf))
+        except Exception as err:
+            ready.put(err)
+
+    thread = threading.Thread(target=reader, name="wgpu-upload-reader", daemon=True)
+    thread.start()
+    try:
+        for _ in range(len(jobs)):
+            item = ready.get()
+            if isinstance(item, Exception):
+                raise item
+            func, args, data, buf = item
+            yield func, args, data
+            pool.put(buf)
+    finally:
+        stop.set()
+        pool.put(bytearray(0))  # unblock the reader if needed
+        thread.join()